@@ -0,0 +1,149 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import lazy_ass_timer as lat
+from lazy_ass_timer_control import ControlClient, ControlServer
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else float('nan')
+
+
+def start_timer(home, probe_interval):
+    # Headless controller on fakes, its loop on a thread of its own like the real daemon.
+    # Nothing counts down (no target is focused), so an edit's remaining time is exact.
+    with open(os.path.join(home, 'pycharm_timer_settings.json'), 'w') as f:
+        json.dump({'enable_sounds': False, 'record_activity': False, 'control_server': False}, f)
+    loop = lat.HeadlessLoop()
+    controller = lat.TimerController(loop, home=home,
+                                     focus_provider=lat.ScriptedFocusProvider(['explorer.exe']),
+                                     input_backend=lat.ReplayInputBackend(),
+                                     audio_sink=lat.NullAudioSink(),
+                                     process_table=lat.FakeProcessTable())
+    controller.control_server = ControlServer(controller)
+    controller.control_server.start()
+    controller.start()
+    controller.toggle_timer()
+    
+    # Gaps between runs of a fast periodic job show whether clients ever hold up the timer's loop
+    probe_times = []
+    controller.scheduler.call_every(probe_interval, lambda: probe_times.append(time.perf_counter()), name='probe')
+    thread = threading.Thread(target=loop.run, daemon=True)
+    thread.start()
+    controller.control_server.wait_ready()
+    return loop, controller, thread, probe_times
+
+
+async def run_load(address, args):
+    healthy = [await ControlClient.connect(address) for _ in range(args.subscribers)]
+    # Slow clients subscribe and then never read again
+    slow = [await ControlClient.connect(address, limit=4096) for _ in range(args.slow)]
+    for client in healthy + slow:
+        await client.request('subscribe')
+    for client in slow:
+        client._receiver.cancel()
+    
+    sent_at = {}
+    request_latencies = []
+    
+    async def script(index):
+        client = await ControlClient.connect(address)
+        for n in range(args.requests):
+            # Unique remaining times, so every edit is one state event to match up
+            seconds = 1000 + index * args.requests + n
+            started = time.perf_counter()
+            sent_at[float(seconds)] = started
+            reply = await client.request('edit', remaining_seconds=seconds)
+            request_latencies.append(time.perf_counter() - started)
+            assert reply['ok'], reply
+        await client.close()
+    
+    started = time.perf_counter()
+    await asyncio.gather(*(script(index) for index in range(args.scripts)))
+    elapsed = time.perf_counter() - started
+    await asyncio.sleep(0.5)  # let the last events arrive
+    
+    fanout_latencies = []
+    delivered = []
+    for client in healthy:
+        # A status change right after an edit repeats its remaining time, count the first one
+        received = set()
+        while not client.states.empty():
+            item = client.states.get_nowait()
+            if item is None:
+                break
+            received_at, state = item
+            seconds = state['remaining_seconds']
+            if seconds in sent_at and seconds not in received:
+                received.add(seconds)
+                fanout_latencies.append(received_at - sent_at[seconds])
+        delivered.append(len(received))
+    for client in healthy + slow:
+        await client.close()
+    return elapsed, request_latencies, fanout_latencies, delivered
+
+
+def load_process(address, args, results):
+    # The clients run in a process of their own, like the scripts and plugins they stand
+    # in for. In the timer's process their JSON decoding held the GIL for hundreds of
+    # milliseconds at a time, which showed up as gaps in the timer loop that no server
+    # or timer code caused.
+    results.put(asyncio.run(run_load(address, args)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the control server with in-process clients")
+    parser.add_argument('--subscribers', type=int, default=200)
+    parser.add_argument('--slow', type=int, default=10)
+    parser.add_argument('--scripts', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--probe-interval', type=float, default=0.01)
+    parser.add_argument('--max-gap', type=float, default=0.1,
+                        help="longest the timer loop may go without running the probe, in seconds")
+    args = parser.parse_args()
+    
+    home = tempfile.mkdtemp(prefix='lazy_ass_timer_bench_')
+    loop, controller, thread, probe_times = start_timer(home, args.probe_interval)
+    server = controller.control_server
+    try:
+        results = multiprocessing.Queue()
+        clients = multiprocessing.Process(target=load_process, args=(server.address, args, results))
+        clients.start()
+        elapsed, request_latencies, fanout_latencies, delivered = results.get()
+        clients.join()
+    finally:
+        loop.post(loop.stop)
+        thread.join()
+        controller.close()
+        shutil.rmtree(home, ignore_errors=True)
+    
+    edits = args.scripts * args.requests
+    gaps = [later - earlier for earlier, later in zip(probe_times, probe_times[1:])]
+    print(f"{edits} edits from {args.scripts} scripts in {elapsed:.2f}s ({edits / elapsed:,.0f}/s), "
+          f"{args.subscribers} subscribers, {args.slow} slow")
+    print(f"request latency   p50 {percentile(request_latencies, 0.5) * 1000:7.2f}ms  "
+          f"p99 {percentile(request_latencies, 0.99) * 1000:7.2f}ms")
+    print(f"fan-out latency   p50 {percentile(fanout_latencies, 0.5) * 1000:7.2f}ms  "
+          f"p99 {percentile(fanout_latencies, 0.99) * 1000:7.2f}ms")
+    print(f"delivered to healthy subscribers: min {min(delivered, default=0)}/{edits}, "
+          f"evicted {server.evicted} (slow clients: {args.slow})")
+    print(f"timer loop probe every {args.probe_interval * 1000:.0f}ms, "
+          f"gap p99 {percentile(gaps, 0.99) * 1000:.1f}ms, largest {max(gaps) * 1000:.1f}ms over {len(gaps)} runs")
+    if max(gaps) > args.max_gap:
+        print(f"FAIL the timer loop went {max(gaps) * 1000:.1f}ms without running, allowed {args.max_gap * 1000:.0f}ms")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,110 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import lazy_ass_timer as lat
+import lazy_ass_timer_sim as sim
+from bench_suite import TARGET, flood_keys, make_controller
+
+
+class SimulatedOSHook(lat.Win32KeyHookBackend):
+    # The real backend's per-key path, virtual-key names and then the monitor, with
+    # Windows simulated: events reach handle() only while the hook is installed, as
+    # Windows calls nothing in a process without one. Windows' own dispatch to the
+    # hook can't be measured off Windows and isn't in the numbers.
+    
+    def _install(self):
+        pass
+    
+    def _remove(self):
+        pass
+
+
+def key_events(keys):
+    # Each key down and up, chords holding left ctrl around the key, as the hook reports them
+    codes = {}
+    for code, name in enumerate(lat.win32_key_names()):
+        codes.setdefault(name, code)
+    codes['ctrl'] = codes['left ctrl']
+    events = []
+    for name in keys:
+        *modifiers, name = name.split('+')
+        events += [(codes[modifier], True) for modifier in modifiers]
+        events += [(codes[name], True), (codes[name], False)]
+        events += [(codes[modifier], False) for modifier in modifiers]
+    return events
+
+
+def run(gated, process_name, keys, chunk):
+    # Typing into process_name with the key hook gated on focus or always on. The OS
+    # idle time sees every chunk; virtual time moves a quarter second per chunk, so
+    # the input flushes and the idle deadline run as they would.
+    loop = sim.VirtualLoop()
+    hook = SimulatedOSHook()
+    controller = make_controller(loop, loop.clock, settings={'hook_keys_only_in_targets': gated,
+                                                             'reward_rules': [{'keys': 'ctrl+s', 'seconds': 5}],
+                                                             'idle_timeout_seconds': 5},
+                                 focus=lat.ScriptedFocusProvider([process_name]), input_backend=hook)
+    controller.toggle_timer()
+    chunks = [key_events(keys[start:start + chunk]) for start in range(0, len(keys), chunk)]
+    calls = 0
+    
+    started = time.process_time()
+    for events in chunks:
+        controller.idle_backend.input()
+        if hook.installed:
+            calls += len(events)
+            for code, down in events:
+                hook.handle(code, down)
+        loop.advance(loop.now + 0.25)
+    cpu = time.process_time() - started
+    
+    result = (cpu, calls, controller.idle_detector.idle)
+    controller.close()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CPU time per keystroke with the key hook gated on focus and not")
+    parser.add_argument('--keys', type=int, default=10_000)
+    parser.add_argument('--chunk', type=int, default=250, help="keys typed per quarter second")
+    parser.add_argument('--max-ratio', type=float, default=0.2,
+                        help="allowed CPU time outside the targets with gating, as a share of the time without")
+    args = parser.parse_args()
+    keys = flood_keys(args.keys)
+    
+    # Best of five, alternating so drift on the machine hits every case alike
+    cases = [('outside the targets, gated', True, 'chrome.exe'),
+             ('outside the targets, ungated', False, 'chrome.exe'),
+             ('in a target', True, TARGET)]
+    best = {}
+    for _ in range(5):
+        for label, gated, process_name in cases:
+            result = run(gated, process_name, keys, args.chunk)
+            best[label] = min(best.get(label, result), result)
+    per_10k = {}
+    for label, _, _ in cases:
+        cpu, calls, idle = best[label]
+        per_10k[label] = cpu * 10_000 / args.keys
+        print(f"{label:<30} {per_10k[label] * 1000:8.2f}ms CPU per 10k keys, {calls:,} hook calls, "
+              f"{'idle' if idle else 'active'}")
+    
+    gated, ungated = per_10k['outside the targets, gated'], per_10k['outside the targets, ungated']
+    print(f"gated/ungated outside the targets: {gated / ungated:.2f}")
+    failed = False
+    if best['outside the targets, gated'][1] or not best['outside the targets, ungated'][1]:
+        print("FAIL the key hook was not gated on focus")
+        failed = True
+    if any(idle for _, _, idle in best.values()):
+        print("FAIL went idle while typing, the OS idle time was not used")
+        failed = True
+    if gated > ungated * args.max_ratio:
+        print(f"FAIL gating left {gated / ungated:.2f} of the CPU time, allowed {args.max_ratio:.2f}")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
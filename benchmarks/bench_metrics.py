@@ -0,0 +1,61 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import lazy_ass_timer as lat
+
+
+def dispatch_cost(metrics, jobs, rounds):
+    # run_due over a heap of due jobs, on a fake clock so every job is due every round
+    now = [0.0]
+    scheduler = lat.Scheduler(lambda delay: None, lambda: now[0])
+    scheduler.metrics = metrics
+    for index in range(jobs):
+        scheduler.call_every(1, lambda: None, name=f"job{index % 8}")
+    started = time.perf_counter()
+    for _ in range(rounds):
+        now[0] += 1
+        scheduler.run_due()
+    return (time.perf_counter() - started) / (jobs * rounds)
+
+
+def observe_cost(count):
+    histogram = lat.Histogram()
+    values = [(index % 1000) * 1e-5 for index in range(count)]
+    started = time.perf_counter()
+    for value in values:
+        histogram.observe(value)
+    return (time.perf_counter() - started) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark instrumentation overhead with metrics off and on")
+    parser.add_argument('--jobs', type=int, default=50)
+    parser.add_argument('--rounds', type=int, default=2000)
+    parser.add_argument('--budget-us', type=float, default=5.0, help="microseconds allowed per measured job run")
+    args = parser.parse_args()
+    
+    # Best of three, alternating so drift on the machine hits both alike
+    off, on = [], []
+    for _ in range(3):
+        off.append(dispatch_cost(None, args.jobs, args.rounds))
+        on.append(dispatch_cost(lat.Metrics(), args.jobs, args.rounds))
+    off, on = min(off), min(on)
+    observe = min(observe_cost(200_000) for _ in range(3))
+    print(f"job dispatch, metrics off {off * 1e6:6.2f}us, on {on * 1e6:6.2f}us "
+          f"(+{(on - off) * 1e6:.2f}us for two observations and the timing)")
+    print(f"Histogram.observe        {observe * 1e6:6.2f}us")
+    
+    metrics = lat.Metrics()
+    dispatch_cost(metrics, 8, 100)
+    print(f"prometheus text for {len(metrics.histograms)} histograms: {len(metrics.prometheus_text()):,} bytes")
+    if on - off > args.budget_us / 1e6:
+        print(f"FAIL measuring a job costs {(on - off) * 1e6:.2f}us, budget {args.budget_us:.2f}us")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
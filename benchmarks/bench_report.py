@@ -0,0 +1,71 @@
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import lazy_ass_timer as lat
+
+
+PROCESSES = ['', 'pycharm64.exe', 'chrome.exe', 'WindowsTerminal.exe', 'Discord.exe', 'explorer.exe']
+
+
+def write_synthetic_year(directory, days, events_per_day, seed=0):
+    # A year of plausible activity: focus switches, keystroke batches, rewards and
+    # idle periods spread over a 09:00-18:00 working day
+    rng = np.random.default_rng(seed)
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, 'strings.txt'), 'w') as f:
+        f.write('\n'.join(PROCESSES) + '\n')
+    
+    log = lat.ActivityLog(directory)
+    first_day = date.today() - timedelta(days=days)
+    for offset in range(days):
+        day = first_day + timedelta(days=offset)
+        start = datetime(day.year, day.month, day.day, 9).timestamp()
+        records = np.zeros(events_per_day, lat.activity_dtype())
+        records['timestamp'] = np.sort(start + rng.uniform(0, 9 * 3600, events_per_day))
+        events = rng.choice([lat.ACTIVITY_KEYS, lat.ACTIVITY_FOCUS, lat.ACTIVITY_REWARD,
+                             lat.ACTIVITY_IDLE, lat.ACTIVITY_ACTIVE],
+                            size=events_per_day, p=[0.9, 0.05, 0.03, 0.01, 0.01])
+        records['event'] = events
+        processes = rng.integers(1, len(PROCESSES), events_per_day)
+        records['process'] = np.where(events == lat.ACTIVITY_FOCUS, processes, 0)
+        records['value'] = np.select(
+            [events == lat.ACTIVITY_KEYS, events == lat.ACTIVITY_FOCUS, events == lat.ACTIVITY_REWARD],
+            [rng.integers(1, 12, events_per_day), processes == 1, 20], 0)
+        records.tofile(log.day_path(day))
+    return log
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the activity report over a synthetic year")
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--events-per-day', type=int, default=20000)
+    parser.add_argument('--chunk-size', type=int, default=1 << 16)
+    args = parser.parse_args()
+    
+    directory = tempfile.mkdtemp(prefix='lazy_ass_timer_bench_')
+    try:
+        started = time.perf_counter()
+        log = write_synthetic_year(directory, args.days, args.events_per_day)
+        print(f"generated {args.days * args.events_per_day:,} events in {time.perf_counter() - started:.2f}s")
+        
+        report = lat.ActivityReport(log, chunk_size=args.chunk_size)
+        for label in ('cold', 'cached'):
+            started = time.perf_counter()
+            totals = report.totals(report.rollups())
+            elapsed = time.perf_counter() - started
+            print(f"{label:>7}: {elapsed:.3f}s ({args.days * args.events_per_day / elapsed / 1e6:.1f}M events/s), "
+                  f"focused {lat.format_duration(totals['focused_seconds'])}")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import argparse
+import os
+import random
+import sys
+import time
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import lazy_ass_timer as lat
+
+
+def make_rules(count, targets, rng):
+    # Distinct chords spread over the targets, some with cooldowns or caps. Modifiers cycle
+    # with the index, so any count from 5 up presses the same mix of chords.
+    modifiers = ['', 'ctrl+', 'alt+', 'ctrl+shift+', 'ctrl+alt+']
+    rules = []
+    for index in range(count):
+        rules.append(lat.RewardRule(f"{modifiers[index % len(modifiers)]}k{index}", rng.choice([-5, 1, 5, 20]),
+                                    rng.choice(['*'] + [target.pattern for target in targets]),
+                                    rng.choice([0, 0, 0.5]), rng.choice([0, 0, 30])))
+    return rules
+
+
+def keystrokes(rules, count, rng):
+    # Mostly plain typing, with every tenth key a bound chord
+    bound = [rule.keys for rule in rules] + ['enter']
+    plain = [chr(ord('a') + index) for index in range(26)] + ['space', 'backspace']
+    return [rng.choice(bound) if index % 10 == 0 else rng.choice(plain) for index in range(count)]
+
+
+def run(rule_count, key_count, rng):
+    targets = [lat.TargetRule(f"app{index}.exe", 'exact', 0, 1.0) for index in range(8)]
+    table = lat.RewardTable(make_rules(rule_count, targets, rng), targets, 20)
+    backend = lat.ReplayInputBackend()
+    pending = deque()
+    fired = []
+    target = [0]
+    monitor = lat.KeyboardMonitor(backend, post=pending.append, bound_keys=table.keys,
+                                  on_chord=lambda chord, pressed_at: fired.append(table.fire(chord, target[0])))
+    monitor.start_monitoring()
+    keys = keystrokes(table.rules, key_count, rng)
+    
+    # Hook thread side (ring push, one set lookup) and loop side (one dict lookup) together
+    started = time.perf_counter()
+    for start in range(0, len(keys), 1000):
+        target[0] = (start // 1000) % (len(targets) + 1) or None
+        backend.replay(keys[start:start + 1000])
+        while pending:
+            pending.popleft()()
+        monitor.ring.drain()
+    elapsed = time.perf_counter() - started
+    return elapsed / key_count, len(fired), table.fired
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-keystroke reward rule dispatch against rule count")
+    parser.add_argument('--keys', type=int, default=200_000)
+    parser.add_argument('--rules', default='10,100,1000,10000')
+    parser.add_argument('--budget-us', type=float, default=5.0, help="microseconds allowed per keystroke")
+    parser.add_argument('--max-growth', type=float, default=1.5,
+                        help="allowed slowdown from the fewest to the most rules")
+    args = parser.parse_args()
+    
+    # Best of five per rule count, taken in rounds so drift on the machine hits every count alike.
+    # The rules and keys for a count are the same each round.
+    rule_counts = [int(value) for value in args.rules.split(',')]
+    best = {}
+    for _ in range(5):
+        for rule_count in rule_counts:
+            result = run(rule_count, args.keys, random.Random(rule_count))
+            best[rule_count] = min(best.get(rule_count, result), result)
+    costs = []
+    for rule_count in rule_counts:
+        per_key, forwarded, fired = best[rule_count]
+        costs.append(per_key)
+        print(f"{rule_count:>6} rules: {per_key * 1e9:7.0f}ns per keystroke, {forwarded:,} chords forwarded, "
+              f"{fired:,} fired")
+    
+    growth = max(costs) / min(costs)
+    print(f"slowest/fastest: {growth:.2f}x")
+    failed = False
+    if max(costs) * 1e6 > args.budget_us:
+        print(f"FAIL {max(costs) * 1e6:.2f}us per keystroke, budget {args.budget_us:.2f}us")
+        failed = True
+    if growth > args.max_growth:
+        print(f"FAIL cost grew {growth:.2f}x with the rule count, allowed {args.max_growth:.2f}x")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,40 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import lazy_ass_timer_sim as sim
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark replaying a synthetic week and a parameter sweep")
+    parser.add_argument('--days', type=int, default=7)
+    parser.add_argument('--budget', type=float, default=0.5, help="seconds allowed for one simulated week")
+    args = parser.parse_args()
+    
+    events = sim.synthetic_events(args.days)
+    runs = []
+    for _ in range(5):
+        started = time.perf_counter()
+        days = sim.simulate(events)
+        runs.append(time.perf_counter() - started)
+    best = min(runs)
+    print(f"{args.days} days, {len(events):,} events: {best * 1000:.1f}ms per run "
+          f"({len(events) / best / 1e6:.2f}M events/s), {sum(day.time_to_zero is not None for day in days)} expired")
+    
+    grid = {'idle_timeout_seconds': [60, 120, 180, 300, 600], 'enter_shortcut_seconds': [10, 20, 30, 60]}
+    timings = {}
+    for workers in (1, None):
+        started = time.perf_counter()
+        sim.sweep(events, grid, workers)
+        timings[workers] = time.perf_counter() - started
+    print(f"sweep of 20 combinations: {timings[1]:.2f}s serial, {timings[None]:.2f}s on {os.cpu_count()} cores")
+    if best > args.budget:
+        print(f"FAIL one week took {best:.2f}s, budget {args.budget:.2f}s")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
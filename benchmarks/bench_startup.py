@@ -0,0 +1,101 @@
+import argparse
+import compileall
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules --headless must not load before its first tick, also checked by tests/test_startup.py
+HEAVY_MODULES = ('PyQt5', 'numpy', 'pygame', 'psutil', 'keyboard', 'mouse', 'win32gui', 'win32process')
+IMPORT_BUDGET_MS = 60
+FIRST_TICK_BUDGET_MS = 150
+
+# Runs in a fresh interpreter: import the core, start a headless controller on fakes and
+# stop once its first update_timer tick has run. The tick is made due right away; left
+# alone it waits for the countdown's next whole second, which is no part of startup.
+CHILD = '''
+import json, sys, time
+started = time.perf_counter()
+repo, home = sys.argv[1], sys.argv[2]
+sys.path.insert(0, repo)
+import lazy_ass_timer as lat
+imported = time.perf_counter()
+
+loop = lat.HeadlessLoop()
+controller = lat.TimerController(loop, home=home,
+                                 focus_provider=lat.ScriptedFocusProvider(['pycharm64.exe'], loop=True),
+                                 input_backend=lat.ReplayInputBackend(),
+                                 audio_sink=lat.NullAudioSink(),
+                                 process_table=lat.FakeProcessTable())
+controller.start()
+controller.toggle_timer()
+ready = time.perf_counter()
+first_tick = []
+update_timer = controller.tick_job.callback
+
+def on_first_tick():
+    update_timer()
+    first_tick.append(time.perf_counter())
+    loop.stop()
+
+controller.tick_job.callback = on_first_tick
+controller.scheduler.schedule(controller.tick_job, 0)
+loop.run()
+controller.close()
+print(json.dumps({'import_ms': (imported - started) * 1000, 'ready_ms': (ready - started) * 1000,
+                  'first_tick_ms': (first_tick[0] - started) * 1000,
+                  'heavy_modules': sorted({name.split('.')[0] for name in sys.modules} & set(sys.argv[3:]))}))
+'''
+
+
+def run_once(home):
+    # From compiled bytecode like any installed copy, even where the environment has
+    # PYTHONDONTWRITEBYTECODE set
+    compileall.compile_file(os.path.join(REPO, 'lazy_ass_timer.py'), quiet=1)
+    output = subprocess.run([sys.executable, '-c', CHILD, REPO, home, *HEAVY_MODULES],
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark --headless startup: import time and time to first tick")
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--import-budget-ms', type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument('--first-tick-budget-ms', type=float, default=FIRST_TICK_BUDGET_MS)
+    args = parser.parse_args()
+    
+    home = tempfile.mkdtemp(prefix='lazy_ass_timer_bench_')
+    try:
+        # Sounds off, so nothing decodes audio in the background while we measure
+        with open(os.path.join(home, 'pycharm_timer_settings.json'), 'w') as f:
+            json.dump({'enable_sounds': False, 'record_activity': False}, f)
+        results = [run_once(home) for _ in range(args.runs)]
+    finally:
+        shutil.rmtree(home, ignore_errors=True)
+    
+    # Medians, the first run also pays for a cold disk cache
+    for key in ('import_ms', 'ready_ms', 'first_tick_ms'):
+        values = sorted(result[key] for result in results)
+        print(f"{key:<15}{values[len(values) // 2]:>8.1f}  (min {values[0]:.1f}, max {values[-1]:.1f})")
+    
+    failures = []
+    import_ms = sorted(result['import_ms'] for result in results)[args.runs // 2]
+    first_tick_ms = sorted(result['first_tick_ms'] for result in results)[args.runs // 2]
+    if import_ms > args.import_budget_ms:
+        failures.append(f"import took {import_ms:.1f}ms, budget {args.import_budget_ms:.0f}ms")
+    if first_tick_ms > args.first_tick_budget_ms:
+        failures.append(f"first tick after {first_tick_ms:.1f}ms, budget {args.first_tick_budget_ms:.0f}ms")
+    heavy_modules = sorted({name for result in results for name in result['heavy_modules']})
+    if heavy_modules:
+        failures.append(f"loaded before the first tick: {', '.join(heavy_modules)}")
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,363 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import lazy_ass_timer as lat
+import lazy_ass_timer_sim as sim
+from bench_startup import run_once
+
+# Hot paths on in-memory fakes for the window, process, keyboard and audio backends, so
+# the whole suite runs on a headless box. Every result is lower-is-better and is checked
+# against the saved baselines: a result more than --threshold above its baseline (and
+# more than the metric's noise floor) fails the run. Each case runs --samples times;
+# the best sample is compared, while --save records the median of at least five, so
+# a baseline is a typical run rather than a lucky one. CPU-bound results are scaled by
+# a calibration loop timed next to each sample, see calibrate. Baselines only mean
+# something on the machine that recorded them, re-record with --save after moving.
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines.json')
+
+# name: (unit, noise floor in that unit, scaled by the calibration); the floors are what
+# calibrated runs of the same commit on a shared single-core box spread over
+RESULTS = {
+    'tick_us': ('us', 1.0, True),
+    'focus_poll_us': ('us', 1.5, True),
+    'idle_cycle_us': ('us', 5.0, True),
+    'enter_us': ('us', 1.5, True),
+    'play_sound_us': ('us', 20.0, True),
+    'sound_latency_ms': ('ms', 0.5, False),
+    'flood_ns_per_key': ('ns', 200.0, True),
+    'memory_growth_kb': ('KB', 64.0, False),
+    'import_ms': ('ms', 10.0, True),
+    'first_tick_ms': ('ms', 15.0, True)
+}
+
+TARGET = 'pycharm64.exe'
+
+
+def fake_decoder(sound_path):
+    # Half a second of stereo tone in place of an mp3, like decode_sound returns
+    import numpy as np
+    tone = (np.sin(np.arange(22050) * 0.05) * 8000).astype(np.int16)
+    return np.stack([tone, tone], axis=1)
+
+
+def make_controller(loop, clock, settings=None, focus=None, input_backend=None):
+    # Headless controller on fakes only, with no files and no control socket. Sounds are
+    # off unless asked for, so the mixing thread doesn't land in other paths' timings.
+    # The OS idle time is a fake on the same clock, fed through controller.idle_backend.
+    config = lat.SettingsSnapshot({**lat.DEFAULT_SETTINGS, 'enable_sounds': False, 'record_activity': False,
+                                   'control_server': False, **(settings or {})})
+    sound_player = lat.SoundPlayer(lat.SampleCache(decoder=fake_decoder), lat.NullAudioSink())
+    controller = lat.TimerController(loop, config=config, clock=clock, persist=False,
+                                     focus_provider=focus or lat.ScriptedFocusProvider(),
+                                     input_backend=input_backend or lat.ReplayInputBackend(),
+                                     process_table=lat.FakeProcessTable(), sound_player=sound_player,
+                                     activity=sim.ActivityTally(clock), idle_backend=lat.FakeIdleBackend(clock))
+    controller.start()
+    return controller
+
+
+def per_call(function, calls, repeat, setup=None):
+    # Best of repeat, in seconds per call
+    best = None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        for _ in range(calls):
+            function()
+        elapsed = (time.perf_counter() - started) / calls
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_latency(args):
+    # update_timer, check_target_focus, the idle transition and on_enter_pressed, one call at a time
+    loop = sim.VirtualLoop()
+    focus = lat.ScriptedFocusProvider([TARGET] * 49 + ['chrome.exe'], loop=True)
+    controller = make_controller(loop, loop.clock, focus=focus)
+    controller.set_view_visible(True)
+    controller.toggle_timer()
+    focus.set_focus(TARGET)
+    results = {'tick_us': per_call(controller.update_timer, args.calls, args.repeat) * 1e6,
+               # One focus change every 50 polls
+               'focus_poll_us': per_call(controller.check_target_focus, args.calls, args.repeat) * 1e6}
+    
+    # Rewards in chunks, a full countdown would run out after a few hundred presses
+    def reset():
+        controller.engine.reset(controller.config.default_timer_seconds)
+    
+    focus.set_focus(TARGET)
+    presses = controller.config.default_timer_seconds // controller.config.enter_shortcut_seconds // 2
+    results['enter_us'] = min(per_call(controller.on_enter_pressed, presses, 1, reset)
+                              for _ in range(max(1, args.calls // presses) * args.repeat)) * 1e6
+    
+    # Idle away from the target: idle sound and auto-pause, then activity resumes the timer
+    focus.set_focus('chrome.exe')
+    detector = controller.idle_detector
+    
+    def idle_cycle():
+        loop.now += detector.timeout + 1
+        detector.on_deadline()
+        detector.on_activity()
+    
+    results['idle_cycle_us'] = per_call(idle_cycle, args.calls // 10, args.repeat) * 1e6
+    if controller.auto_paused or not controller.engine.running:
+        raise AssertionError("the idle cycle didn't resume the timer")
+    controller.close()
+    return results
+
+
+def bench_sound(args):
+    # The caller's side of play_sound (a queue put) and trigger to first block, spaced
+    # out so every trigger starts a voice of its own
+    sound_player = lat.SoundPlayer(lat.SampleCache(decoder=fake_decoder), lat.NullAudioSink())
+    sound_player.preload(['pop.mp3'])
+    sound_player.cache.get_bank('pop.mp3')
+    calls = []
+    for _ in range(args.sounds):
+        started = time.perf_counter()
+        sound_player.play_sound('pop.mp3')
+        calls.append(time.perf_counter() - started)
+        time.sleep(0.04)
+    stats = sound_player.worker.latency_stats()
+    sound_player.close()
+    calls.sort()
+    return {'play_sound_us': calls[len(calls) // 2] * 1e6, 'sound_latency_ms': stats['p50_ms']}
+
+
+def flood_keys(count=2000):
+    # Plain typing with every 25th key Enter or a ctrl+s reward
+    plain = [chr(ord('a') + index) for index in range(26)]
+    return [('ctrl+s' if index % 50 == 49 else 'enter') if index % 25 == 24 else plain[index % 26]
+            for index in range(count)]
+
+
+def bench_flood(args):
+    # Keystrokes through the real hook callback, ring, batch flush and chord dispatch.
+    # Every 25th key is Enter or a ctrl+s reward, so bound chords are in the mix.
+    loop = sim.VirtualLoop()
+    controller = make_controller(loop, time.monotonic,
+                                 settings={'reward_rules': [{'keys': 'ctrl+s', 'seconds': 5}]},
+                                 focus=lat.ScriptedFocusProvider([TARGET]))
+    controller.toggle_timer()
+    backend = controller.keyboard_monitor.backend
+    keys = flood_keys()
+    
+    def flood():
+        backend.replay(keys)
+        controller.keyboard_monitor.flush()
+        loop.advance(loop.now)  # runs the posted chords
+        controller.engine.reset(controller.config.default_timer_seconds)
+    
+    per_key = per_call(flood, args.keys // len(keys), args.repeat) / len(keys)
+    controller.close()
+    return {'flood_ns_per_key': per_key * 1e9}
+
+
+def bench_memory(args):
+    # A whole day on the virtual clock with every periodic job running and the window
+    # showing: a synthetic working day of focus changes, typing and Enter presses, then
+    # the night. Growth is traced memory at the end against the first hour of work.
+    events = sim.synthetic_events(1, args.seed)
+    midnight = datetime.fromtimestamp(events[0][0]).replace(hour=0, minute=0, second=0, microsecond=0)
+    origin = midnight.timestamp()
+    end = (midnight + timedelta(days=1)).timestamp() - origin
+    
+    loop = sim.VirtualLoop()
+    focus = lat.ScriptedFocusProvider()
+    controller = make_controller(loop, loop.clock, settings={'enable_sounds': True}, focus=focus)
+    # Decoded sounds stay cached for good, they aren't growth
+    controller.sound_player.cache.preload(getattr(controller.config, key) for key in lat.SOUND_PATH_KEYS)
+    tracemalloc.start()
+    controller.set_view_visible(True)
+    controller.toggle_timer()
+    warm = events[0][0] - origin + 3600
+    baseline = None
+    for timestamp, kind, value in events:
+        now = timestamp - origin
+        loop.advance(now)
+        if baseline is None and now >= warm:
+            baseline = tracemalloc.get_traced_memory()[0]
+        if kind == sim.SIM_FOCUS:
+            focus.set_focus(value)
+            continue
+        # As in sim.simulate, the controller only gets keys typed while its hook is on
+        controller.idle_backend.input(now)
+        if not controller.keyboard_monitor.key_hook_active:
+            controller.idle_detector.poll()
+        elif kind == sim.SIM_KEYS:
+            controller.on_input_batch(lat.InputBatch(value, 0, 0, now, now, 0))
+        else:
+            controller.on_enter_pressed()
+    loop.advance(end)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    runs = sum(job.runs for job in (controller.input_job, controller.focus_job, controller.tick_job))
+    controller.close()
+    print(f"  24h session: {len(events):,} events, {runs:,} job runs, peak {peak / 1024:,.0f}KB")
+    return {'memory_growth_kb': (current - baseline) / 1024}
+
+
+def bench_startup(args):
+    home = tempfile.mkdtemp(prefix='lazy_ass_timer_bench_')
+    try:
+        with open(os.path.join(home, 'pycharm_timer_settings.json'), 'w') as f:
+            json.dump({'enable_sounds': False, 'record_activity': False}, f)
+        runs = [run_once(home) for _ in range(args.startup_runs)]
+    finally:
+        shutil.rmtree(home, ignore_errors=True)
+    return {key: sorted(run[key] for run in runs)[len(runs) // 2] for key in ('import_ms', 'first_tick_ms')}
+
+
+CASES = {
+    'latency': bench_latency,
+    'sound': bench_sound,
+    'flood': bench_flood,
+    'memory': bench_memory,
+    'startup': bench_startup
+}
+
+
+def calibrate(repeat=15):
+    # A fixed pure-Python workload. A box that runs slower across the board for a while
+    # (a busy neighbour, a lower clock) runs this slower too, so results scaled by it
+    # only move when the code does.
+    table = {index: index for index in range(64)}
+    
+    def work():
+        total = 0
+        for index in range(2000):
+            total += table[index & 63]
+        return total
+    
+    return per_call(work, 20, repeat) * 1e6
+
+
+def scaled(results, calibration, reference):
+    if not reference:
+        return results
+    return {name: value * reference / calibration if RESULTS[name][2] else value
+            for name, value in results.items()}
+
+
+def machine():
+    return f"{platform.machine()} {platform.system()} {platform.python_implementation()} {platform.python_version()}"
+
+
+def load_baselines(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'machine': None, 'results': {}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the hot paths on fake backends against saved baselines")
+    parser.add_argument('--cases', default=','.join(CASES), help="comma-separated, from " + ', '.join(CASES))
+    parser.add_argument('--threshold', type=float, default=0.5, help="allowed slowdown over a baseline, 0.5 is 50%%")
+    parser.add_argument('--baselines', default=BASELINE_FILE)
+    parser.add_argument('--save', action='store_true', help="record these results as the new baselines")
+    parser.add_argument('--samples', type=int, default=3, help="runs of each case, the best one is compared")
+    parser.add_argument('--retries', type=int, default=2, help="extra runs of a case that regressed before failing")
+    parser.add_argument('--calls', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=15)
+    parser.add_argument('--keys', type=int, default=400_000)
+    parser.add_argument('--sounds', type=int, default=40)
+    parser.add_argument('--startup-runs', type=int, default=7)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    
+    saved = load_baselines(args.baselines)
+    if saved['results'] and saved['machine'] != machine():
+        print(f"baselines were recorded on {saved['machine']}, this is {machine()}")
+    reference = None if args.save else saved.get('calibration_us')
+    
+    def regressed(name, value):
+        baseline = saved['results'].get(name)
+        return (baseline is not None and value > baseline * (1 + args.threshold)
+                and value - baseline > RESULTS[name][1])
+    
+    def sample(case):
+        calibration = calibrate()
+        return calibration, case(args)
+    
+    def best(runs):
+        results = [scaled(run, calibration, reference) for calibration, run in runs]
+        return {key: min(run[key] for run in results) for key in results[0]}
+    
+    # A case with a regression is run again before failing, a one-off hiccup on the machine
+    # shouldn't fail the suite; each result keeps its best run
+    case_runs = []
+    samples = max(args.samples, 5) if args.save else max(1, args.samples)
+    for name in args.cases.split(','):
+        case = CASES[name.strip()]
+        started = time.perf_counter()
+        runs = [sample(case) for _ in range(samples)]
+        for _ in range(args.retries):
+            if args.save or not any(regressed(key, value) for key, value in best(runs).items()):
+                break
+            print(f"{name.strip()} looks slower, running it again")
+            runs.append(sample(case))
+        case_runs.append(runs)
+        print(f"{name.strip()} done in {time.perf_counter() - started:.1f}s")
+    
+    # Saved baselines are medians, scaled to the median calibration of the whole session
+    results = {}
+    if args.save:
+        calibrations = sorted(calibration for runs in case_runs for calibration, _ in runs)
+        reference = calibrations[len(calibrations) // 2]
+        for runs in case_runs:
+            runs = [scaled(run, calibration, reference) for calibration, run in runs]
+            results.update({key: sorted(run[key] for run in runs)[len(runs) // 2] for key in runs[0]})
+    else:
+        for runs in case_runs:
+            results.update(best(runs))
+        if reference:
+            speed = reference / min(calibration for runs in case_runs for calibration, _ in runs)
+            print(f"machine speed against the baselines: {speed:.2f}x")
+    
+    print()
+    print(f"{'Result':<18}{'Now':>12}{'Baseline':>12}{'Change':>9}")
+    failures = []
+    for name, value in results.items():
+        unit, noise, _ = RESULTS[name]
+        baseline = saved['results'].get(name)
+        if baseline is None:
+            print(f"{name:<18}{value:>10.2f}{unit:<2}{'-':>12}")
+            continue
+        # Results that hover around zero, like memory growth, have no meaningful percentage
+        change = f"{(value - baseline) / baseline:+.0%}" if abs(baseline) > noise else '-'
+        print(f"{name:<18}{value:>10.2f}{unit:<2}{baseline:>10.2f}{unit:<2}{change:>9}"
+              f"{'  REGRESSED' if regressed(name, value) else ''}")
+        if regressed(name, value):
+            failures.append(f"{name} {value:.2f}{unit}, baseline {baseline:.2f}{unit}")
+    
+    if args.save:
+        if saved['results'] and saved.get('calibration_us') and set(results) != set(saved['results']):
+            # Results kept from an earlier save are rescaled to this session's calibration
+            old = scaled(saved['results'], saved['calibration_us'], reference)
+        else:
+            old = {}
+        saved = {'machine': machine(), 'recorded': datetime.now().strftime('%Y-%m-%d'),
+                 'calibration_us': round(reference, 3),
+                 'results': {**old, **{name: round(value, 3) for name, value in results.items()}}}
+        lat.write_atomic(args.baselines, json.dumps(saved, indent=2) + '\n')
+        print(f"saved baselines to {args.baselines}")
+        return 0
+    for failure in failures:
+        print(f"FAIL {failure} (threshold {args.threshold:.0%})")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,91 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import lazy_ass_timer as lat
+import lazy_ass_timer_sim as sim
+
+
+def make_timers(count):
+    # A mix of the three kinds, long enough that none runs out during a run
+    kinds = ['focused', 'away', 'always']
+    return [{'name': f"timer {index}", 'seconds': 10 * 3600 + index, 'count': kinds[index % 3]}
+            for index in range(count)]
+
+
+def run(timer_count, ticks, hours):
+    loop = sim.VirtualLoop()
+    focus = lat.ScriptedFocusProvider()
+    config = lat.SettingsSnapshot({**lat.DEFAULT_SETTINGS, 'timers': make_timers(timer_count),
+                                   'default_timer_seconds': 20 * 3600, 'enable_sounds': False,
+                                   'record_activity': False, 'control_server': False})
+    controller = lat.TimerController(loop, config=config, clock=loop.clock, persist=False, focus_provider=focus,
+                                     input_backend=lat.ReplayInputBackend(), process_table=lat.FakeProcessTable(),
+                                     sound_player=sim.SilentSoundPlayer(), activity=sim.ActivityTally(loop.clock))
+    controller.start()
+    controller.set_view_visible(True)
+    focus.set_focus('pycharm64.exe')
+    controller.toggle_timer()
+    
+    # The visible once-a-second tick
+    started = time.perf_counter()
+    for _ in range(ticks):
+        controller.update_timer()
+    tick = (time.perf_counter() - started) / ticks
+    
+    # A focus change re-targets every timer, so it does grow with the count
+    started = time.perf_counter()
+    for index in range(ticks // 100):
+        focus.set_focus('chrome.exe' if index % 2 else 'pycharm64.exe')
+    switch = (time.perf_counter() - started) / (ticks // 100)
+    
+    # Hours on the virtual clock, switching focus every few minutes and typing enough
+    # to stay clear of the idle timeout; all timers keep counting and nothing runs out
+    wakeups = controller.scheduler.wakeups
+    for minute in range(hours * 60):
+        if minute % 7 == 0:
+            focus.set_focus('chrome.exe' if minute % 2 else 'pycharm64.exe')
+        loop.advance(loop.now + 60)
+        controller.on_input_batch(lat.InputBatch(20, 0, 0, loop.now, loop.now, 0))
+    wakeups = controller.scheduler.wakeups - wakeups
+    controller.close()
+    return tick, switch, wakeups
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the tick and wakeups against the number of named timers")
+    parser.add_argument('--timers', default='0,10,100,1000')
+    parser.add_argument('--ticks', type=int, default=20000)
+    parser.add_argument('--hours', type=int, default=2)
+    parser.add_argument('--max-growth', type=float, default=1.5,
+                        help="allowed slowdown of the tick from the fewest to the most timers")
+    args = parser.parse_args()
+    
+    # Best of three per count, in rounds so drift on the machine hits every count alike
+    counts = [int(value) for value in args.timers.split(',')]
+    best = {}
+    for _ in range(3):
+        for count in counts:
+            result = run(count, args.ticks, args.hours)
+            best[count] = min(best.get(count, result), result)
+    for count in counts:
+        tick, switch, wakeups = best[count]
+        print(f"{count:>5} timers: tick {tick * 1e6:6.2f}us, focus change {switch * 1e6:9.2f}us, "
+              f"{wakeups} wakeups in {args.hours}h")
+    
+    ticks = [best[count][0] for count in counts]
+    wakeups = [best[count][2] for count in counts]
+    failed = False
+    if max(ticks) / min(ticks) > args.max_growth:
+        print(f"FAIL the tick grew {max(ticks) / min(ticks):.2f}x with the timer count, allowed {args.max_growth:.2f}x")
+        failed = True
+    if max(wakeups) != min(wakeups):
+        print(f"FAIL wakeups went from {min(wakeups)} to {max(wakeups)} with the timer count")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
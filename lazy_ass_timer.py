@@ -1,587 +1,3375 @@
-import sys
-import time
-import json
-import os
-from datetime import timedelta
-import keyboard
-import win32gui
-import win32process
-import psutil
-import threading
-from pygame import mixer
-from PyQt5.QtWidgets import (QApplication, QMainWindow, QLCDNumber, QPushButton,
-                           QVBoxLayout, QHBoxLayout, QWidget, QLabel,
-                           QInputDialog, QSpinBox, QDialog, QFormLayout,
-                           QDialogButtonBox, QFileDialog, QLineEdit, QColorDialog, QCheckBox)
-from PyQt5.QtCore import QTimer, Qt, pyqtSignal, QObject
-from PyQt5.QtGui import QFont, QColor, QPalette
-
-import kenenet
-def get_focused_window_info():
-    hwnd = win32gui.GetForegroundWindow()
-    if not hwnd: return None
-    _, pid = win32process.GetWindowThreadProcessId(hwnd)
-    process_name = psutil.Process(pid).name()
-    return process_name
-
-
-class SoundPlayer:
-    
-    def play_sound(self, sound_path, enable_sounds=True):
-        try:
-            if not enable_sounds:
-                return
-            kenenet.play_audio.play(sound_path,speed=(0.9,1.15))
-            
-        except Exception as e:
-            print(f"Error playing sound: {e}")
-
-
-class KeyboardMonitor(QObject):
-    key_pressed = pyqtSignal()
-    enter_pressed = pyqtSignal()
-    
-    def __init__(self):
-        super().__init__()
-        self.last_activity_time = time.time()
-        self.running = False
-        self.thread = None
-    
-    def start_monitoring(self):
-        self.running = True
-        self.thread = threading.Thread(target=self._monitor_keyboard, daemon=True)
-        self.thread.start()
-    
-    def stop_monitoring(self):
-        self.running = False
-        if self.thread:
-            self.thread.join(timeout=1)
-    
-    def _monitor_keyboard(self):
-        keyboard.on_press(self._on_key_press)
-        while self.running:
-            time.sleep(0.1)
-    
-    def _on_key_press(self, event):
-        self.last_activity_time = time.time()
-        self.key_pressed.emit()
-        if event.name == 'enter':
-            self.enter_pressed.emit()
-    
-    def get_idle_time(self):
-        return time.time() - self.last_activity_time
-
-
-class EditTimeDialog(QDialog):
-    def __init__(self, hours, minutes, seconds, parent=None):
-        super().__init__(parent)
-        self.setWindowTitle("Edit Time")
-        
-        layout = QFormLayout(self)
-        
-        # Hours spinner
-        self.hours_spin = QSpinBox()
-        self.hours_spin.setRange(0, 99)
-        self.hours_spin.setValue(hours)
-        layout.addRow("Hours:", self.hours_spin)
-        
-        # Minutes spinner
-        self.minutes_spin = QSpinBox()
-        self.minutes_spin.setRange(0, 59)
-        self.minutes_spin.setValue(minutes)
-        layout.addRow("Minutes:", self.minutes_spin)
-        
-        # Seconds spinner
-        self.seconds_spin = QSpinBox()
-        self.seconds_spin.setRange(0, 59)
-        self.seconds_spin.setValue(seconds)
-        layout.addRow("Seconds:", self.seconds_spin)
-        
-        # Buttons
-        button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
-        button_box.accepted.connect(self.accept)
-        button_box.rejected.connect(self.reject)
-        layout.addRow(button_box)
-    
-    def get_time(self):
-        return {
-            'hours': self.hours_spin.value(),
-            'minutes': self.minutes_spin.value(),
-            'seconds': self.seconds_spin.value()
-        }
-
-
-class ColorButton(QPushButton):
-    def __init__(self, color, parent=None):
-        super().__init__(parent)
-        self.setFixedSize(30, 30)
-        self.color = color
-        self.setStyleSheet(f"background-color: {color.name()}; border: 1px solid #000;")
-    
-    def set_color(self, color):
-        self.color = color
-        self.setStyleSheet(f"background-color: {color.name()}; border: 1px solid #000;")
-
-
-class SettingsDialog(QDialog):
-    def __init__(self, settings, parent=None):
-        super().__init__(parent)
-        self.setWindowTitle("Settings")
-        self.resize(500, 400)
-        
-        self.settings = settings
-        
-        # Create form layout
-        layout = QFormLayout(self)
-        
-        # Process name setting
-        self.process_name = QLineEdit(self.settings['target_process_name'])
-        layout.addRow("Target Process Name:", self.process_name)
-        
-        # Default timer setting
-        self.timer_hours = QSpinBox()
-        self.timer_hours.setRange(0, 24)
-        self.timer_hours.setValue(self.settings['default_timer_seconds'] // 3600)
-        layout.addRow("Default Time (hours):", self.timer_hours)
-        
-        # Add minutes setting
-        self.timer_mins = QSpinBox()
-        self.timer_mins.setRange(0, 59)  # Minutes should be 0-59
-        self.timer_mins.setValue((self.settings['default_timer_seconds'] % 3600) // 60)  # Get remaining minutes
-        layout.addRow("Default Time (minutes):", self.timer_mins)
-        
-        # Enter shortcut seconds
-        self.shortcut_seconds = QSpinBox()
-        self.shortcut_seconds.setRange(1, 300)
-        self.shortcut_seconds.setValue(self.settings['enter_shortcut_seconds'])
-        layout.addRow("Reward Button:", self.shortcut_seconds)
-        
-        # Idle timeout
-        self.idle_minutes = QSpinBox()
-        self.idle_minutes.setRange(1, 30)
-        self.idle_minutes.setValue(self.settings['idle_timeout_seconds'] // 60)
-        layout.addRow("Auto-pause when idle (minutes):", self.idle_minutes)
-        
-        # UI Color setting
-        layout.addRow(QLabel("UI Color Settings:"))
-        
-        # Timer display color
-        self.color_button = ColorButton(QColor(self.settings['display_color']))
-        color_button_layout = QHBoxLayout()
-        color_button_layout.addWidget(self.color_button)
-        color_button_layout.addWidget(QLabel("Change color"))
-        color_button_layout.addStretch()
-        layout.addRow("Timer Display Color:", color_button_layout)
-        
-        # Connect color button click
-        self.color_button.clicked.connect(self.choose_color)
-        
-        # Sound settings
-        layout.addRow(QLabel("Sound Settings:"))
-        
-        # Enter key sound
-        self.enable_sounds = QCheckBox("Enable Sound Effects")
-        self.enable_sounds.setChecked(self.settings.get('enable_sounds', True))  # Default to enabled
-        layout.addRow("", self.enable_sounds)  # Add to layout before the sound settings
-        
-        self.enter_sound_path = QLabel(self.settings['enter_sound_path'])
-        enter_sound_button = QPushButton("Browse...")
-        enter_sound_button.clicked.connect(self.browse_enter_sound)
-        
-        enter_sound_layout = QHBoxLayout()
-        enter_sound_layout.addWidget(self.enter_sound_path)
-        enter_sound_layout.addWidget(enter_sound_button)
-        layout.addRow("Reward Key Sound:", enter_sound_layout)
-        
-        # Idle timeout sound
-        self.idle_sound_path = QLabel(self.settings['idle_sound_path'])
-        idle_sound_button = QPushButton("Browse...")
-        idle_sound_button.clicked.connect(self.browse_idle_sound)
-        
-        idle_sound_layout = QHBoxLayout()
-        idle_sound_layout.addWidget(self.idle_sound_path)
-        idle_sound_layout.addWidget(idle_sound_button)
-        layout.addRow("Idle Timeout Sound:", idle_sound_layout)
-        
-        # Time up sound
-        self.time_up_sound_path = QLabel(self.settings['time_up_sound_path'])
-        time_up_sound_button = QPushButton("Browse...")
-        time_up_sound_button.clicked.connect(self.browse_time_up_sound)
-        
-        time_up_sound_layout = QHBoxLayout()
-        time_up_sound_layout.addWidget(self.time_up_sound_path)
-        time_up_sound_layout.addWidget(time_up_sound_button)
-        layout.addRow("Time's Up Sound:", time_up_sound_layout)
-        
-        # Save button
-        button_box = QDialogButtonBox(QDialogButtonBox.Save | QDialogButtonBox.Cancel)
-        button_box.accepted.connect(self.accept)
-        button_box.rejected.connect(self.reject)
-        layout.addRow(button_box)
-    
-    def choose_color(self):
-        color = QColorDialog.getColor(self.color_button.color, self, "Choose Timer Display Color")
-        if color.isValid():
-            self.color_button.set_color(color)
-    
-    def browse_enter_sound(self):
-        file_path, _ = QFileDialog.getOpenFileName(self, "Select Enter Key Sound", "", "Audio Files (*.mp3 *.wav)")
-        if file_path:
-            self.enter_sound_path.setText(file_path)
-    
-    def browse_idle_sound(self):
-        file_path, _ = QFileDialog.getOpenFileName(self, "Select Idle Timeout Sound", "", "Audio Files (*.mp3 *.wav)")
-        if file_path:
-            self.idle_sound_path.setText(file_path)
-    
-    def browse_time_up_sound(self):
-        file_path, _ = QFileDialog.getOpenFileName(self, "Select Time's Up Sound", "", "Audio Files (*.mp3 *.wav)")
-        if file_path:
-            self.time_up_sound_path.setText(file_path)
-    
-    def get_settings(self):
-        return {
-            'target_process_name': self.process_name.text(),
-            'default_timer_seconds': (self.timer_hours.value() * 3600) + (self.timer_mins.value() * 60),
-            'enter_shortcut_seconds': self.shortcut_seconds.value(),
-            'idle_timeout_seconds': self.idle_minutes.value() * 60,
-            'display_color': self.color_button.color.name(),
-            'enable_sounds': self.enable_sounds.isChecked(),
-            'enter_sound_path': self.enter_sound_path.text(),
-            'idle_sound_path': self.idle_sound_path.text(),
-            'time_up_sound_path': self.time_up_sound_path.text()
-        }
-
-
-class TimerWindow(QMainWindow):
-    def __init__(self):
-        super().__init__()
-        
-        # Default settings
-        self.default_settings = {
-            'target_process_name': 'pycharm64.exe',
-            'default_timer_seconds': 3 * 60 * 60,  # 3 hours
-            'enter_shortcut_seconds': 20,  # 20 seconds
-            'idle_timeout_seconds': 3 * 60,  # 3 minutes
-            'enable_sounds': True,
-            'display_color': '#0078d7',  # Default blue color
-            'enter_sound_path': r"assets\pop noise.mp3",
-            'idle_sound_path': r"assets\keh noise.mp3",
-            'time_up_sound_path': r"assets\fnaf.mp3"
-        }
-        
-        # Load settings from file
-        self.settings_file = os.path.join(os.path.expanduser("~"), "pycharm_timer_settings.json")
-        self.settings = self.load_settings()
-        
-        # Sound player
-        self.sound_player = SoundPlayer()
-        
-        # Timer state
-        self.time_left = self.settings['default_timer_seconds']
-        self.timer_running = False
-        self.is_target_focused = False
-        
-        # Keyboard monitor
-        self.keyboard_monitor = KeyboardMonitor()
-        self.keyboard_monitor.enter_pressed.connect(self.on_enter_pressed)
-        self.keyboard_monitor.start_monitoring()
-        
-        # Window focus checker
-        self.focus_timer = QTimer(self)
-        self.focus_timer.timeout.connect(self.check_target_focus)
-        self.focus_timer.start(1000)  # Check every second
-        
-        # Idle checker
-        self.idle_timer_reset = 0
-        self.idle_timer = QTimer(self)
-        self.idle_timer.timeout.connect(self.check_idle)
-        self.idle_timer.start(5000)  # Check every 5 seconds
-        
-        # Main timer
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_timer)
-        
-        self.init_ui()
-    
-    def load_settings(self):
-        try:
-            if os.path.exists(self.settings_file):
-                with open(self.settings_file, 'r') as f:
-                    loaded_settings = json.load(f)
-                # Make sure all default settings exist, add any missing ones
-                for key, value in self.default_settings.items():
-                    if key not in loaded_settings:
-                        loaded_settings[key] = value
-                return loaded_settings
-            else:
-                return self.default_settings.copy()
-        except Exception as e:
-            print(f"Error loading settings: {e}")
-            return self.default_settings.copy()
-    
-    def save_settings(self):
-        try:
-            with open(self.settings_file, 'w') as f:
-                json.dump(self.settings, f, indent=4)
-        except Exception as e:
-            print(f"Error saving settings: {e}")
-    
-    def init_ui(self):
-        self.setWindowTitle('Process Time Tracker')
-        self.setGeometry(100, 100, 500, 300)
-        
-        # Set up the central widget
-        central_widget = QWidget()
-        self.setCentralWidget(central_widget)
-        
-        # Create main layout
-        main_layout = QVBoxLayout(central_widget)
-        
-        # Status label
-        self.status_label = QLabel(f"{self.settings['target_process_name']} isn't focused")
-        self.status_label.setAlignment(Qt.AlignCenter)
-        self.status_label.setFont(QFont('Arial', 12))
-        main_layout.addWidget(self.status_label)
-        
-        # Timer display
-        self.time_display = QLCDNumber()
-        self.time_display.setDigitCount(8)  # HH:MM:SS
-        self.time_display.setSegmentStyle(QLCDNumber.Filled)
-        
-        # Set display color based on settings
-        self.update_display_color()
-        
-        self.time_display.setMinimumHeight(100)
-        main_layout.addWidget(self.time_display)
-        
-        # Button layout
-        button_layout = QHBoxLayout()
-        
-        # Start/Pause button
-        self.start_pause_button = QPushButton("Start")
-        self.start_pause_button.clicked.connect(self.toggle_timer)
-        button_layout.addWidget(self.start_pause_button)
-        
-        # Reset button
-        reset_button = QPushButton("Reset")
-        reset_button.clicked.connect(self.reset_timer)
-        button_layout.addWidget(reset_button)
-        
-        # Edit time button
-        edit_button = QPushButton("Edit Time")
-        edit_button.clicked.connect(self.edit_time)
-        button_layout.addWidget(edit_button)
-        
-        # Settings button
-        settings_button = QPushButton("Settings")
-        settings_button.clicked.connect(self.open_settings)
-        button_layout.addWidget(settings_button)
-        
-        main_layout.addLayout(button_layout)
-        
-        # Add keyboard shortcut information
-        shortcut_label = QLabel(f"Press Enter to subtract {self.settings['enter_shortcut_seconds']} seconds")
-        shortcut_label.setAlignment(Qt.AlignCenter)
-        main_layout.addWidget(shortcut_label)
-        
-        # Update the display initially
-        self.update_display()
-    
-    def update_display_color(self):
-        # Set color based on settings
-        color = QColor(self.settings['display_color'])
-        palette = self.time_display.palette()
-        palette.setColor(palette.WindowText, color)
-        palette.setColor(palette.Light, color)
-        palette.setColor(palette.Dark, color)
-        self.time_display.setPalette(palette)
-    
-    def update_display(self):
-        hours, remainder = divmod(self.time_left, 3600)
-        minutes, seconds = divmod(remainder, 60)
-        time_str = f"{int(hours):02}:{int(minutes):02}:{int(seconds):02}"
-        self.time_display.display(time_str)
-    
-    def toggle_timer(self):
-        if self.timer_running:
-            self.timer.stop()
-            self.timer_running = False
-            self.start_pause_button.setText("Start")
-            self.status_label.setText("Timer paused")
-        else:
-            self.timer.start(1000)
-            self.timer_running = True
-            self.start_pause_button.setText("Pause")
-            if self.is_target_focused:
-                self.status_label.setText(f"Timing {self.settings['target_process_name']} usage")
-            else:
-                self.status_label.setText(f"{self.settings['target_process_name']} not in focus - Timer paused")
-    
-    def reset_timer(self):
-        self.time_left = self.settings['default_timer_seconds']
-        self.update_display()
-        if not self.timer_running:
-            self.status_label.setText("Timer reset")
-    
-    def edit_time(self):
-        was_running = self.timer_running
-        if was_running:
-            self.toggle_timer()  # Pause the timer
-        
-        # Convert current time to hours, minutes, seconds for easier editing
-        hours = int(self.time_left // 3600)
-        minutes = int((self.time_left % 3600) // 60)
-        seconds = int(self.time_left % 60)
-        
-        # Open the edit time dialog
-        dialog = EditTimeDialog(hours, minutes, seconds, self)
-        if dialog.exec_():
-            time_values = dialog.get_time()
-            self.time_left = (time_values['hours'] * 3600 +
-                              time_values['minutes'] * 60 +
-                              time_values['seconds'])
-            self.update_display()
-        
-        if was_running:
-            self.toggle_timer()  # Resume the timer
-    
-    def open_settings(self):
-        dialog = SettingsDialog(self.settings, self)
-        
-        # Set color from settings
-        dialog.color_button.set_color(QColor(self.settings['display_color']))
-        
-        if dialog.exec_():
-            old_settings = self.settings.copy()
-            self.settings = dialog.get_settings()
-            
-            # Update display color if changed
-            if old_settings['display_color'] != self.settings['display_color']:
-                self.update_display_color()
-            
-            # Update the process name in status label if changed
-            if old_settings['target_process_name'] != self.settings['target_process_name']:
-                self.status_label.setText(f"Waiting for {self.settings['target_process_name']} to be focused")
-            
-            # Update the shortcut label if the shortcut seconds changed
-            if old_settings['enter_shortcut_seconds'] != self.settings['enter_shortcut_seconds']:
-                for i in range(self.centralWidget().layout().count()):
-                    widget = self.centralWidget().layout().itemAt(i).widget()
-                    if isinstance(widget, QLabel) and "Press Enter" in widget.text():
-                        widget.setText(f"Press Enter to subtract {self.settings['enter_shortcut_seconds']} seconds")
-                        break
-            
-            # Save settings to file
-            self.save_settings()
-    
-    def update_timer(self):
-        if self.timer_running and self.is_target_focused:
-            self.time_left = max(0, self.time_left - 1)
-            self.update_display()
-            
-            if self.time_left <= 0:
-                self.timer.stop()
-                self.timer_running = False
-                self.start_pause_button.setText("Start")
-                self.status_label.setText("Time's up!")
-                self.toggle_timer()
-                self.sound_player.play_sound(self.settings['time_up_sound_path'])
-    
-    def check_target_focus(self):
-        process_name = get_focused_window_info()
-        
-        # Check if target process is the focused window
-        self.is_target_focused = process_name == self.settings['target_process_name']
-        
-        # Calculate percentage complete
-        total_time = self.settings['default_timer_seconds']
-        time_elapsed = total_time - self.time_left
-        percentage_complete = (time_elapsed / total_time) * 100 if total_time > 0 else 0
-        
-        if self.timer_running:
-            if self.is_target_focused:
-                self.status_label.setText(f"Timing {self.settings['target_process_name']} usage, {percentage_complete:.1f}% complete")
-            else:
-                self.status_label.setText(f"{self.settings['target_process_name']} not focused - Timer paused, {percentage_complete:.1f}% complete")
-    
-    def check_idle(self):
-        idle_time = self.keyboard_monitor.get_idle_time()
-        process_name = get_focused_window_info()
-        if idle_time > self.settings['idle_timeout_seconds'] and self.idle_timer_reset < time.time() and process_name != self.settings['target_process_name']:
-            # Play idle sound regardless of timer state or target process focus
-            self.sound_player.play_sound(
-                self.settings['idle_sound_path'],
-                self.settings.get('enable_sounds', True)  # Default to enabled if setting doesn't exist
-            )
-            self.idle_timer_reset = time.time() + 600
-            # If timer is running, auto-pause it
-            if self.timer_running:
-                self.toggle_timer()  # Auto-pause
-                self.status_label.setText(f"Auto-paused after {self.settings['idle_timeout_seconds'] // 60} minutes of inactivity")
-        else:
-            if not self.timer_running:
-                self.toggle_timer()  # Auto-pause
-                self.status_label.setText(f"Auto-paused after {self.settings['idle_timeout_seconds'] // 60} minutes of inactivity")
-    
-    def on_enter_pressed(self):
-        process_name = get_focused_window_info()
-        if process_name == self.settings['target_process_name'] and self.timer_running:
-            self.time_left = max(0, self.time_left - self.settings['enter_shortcut_seconds'])
-            self.update_display()
-            self.status_label.setText(f"Subtracted {self.settings['enter_shortcut_seconds']} seconds")
-            
-            # Play enter sound if PyCharm is focused and sounds are enabled
-            self.sound_player.play_sound(
-                self.settings['enter_sound_path'],
-                self.settings.get('enable_sounds', True)  # Default to enabled if setting doesn't exist
-            )
-            
-            # Reset temporary message after 2 seconds
-            QTimer.singleShot(2000, self.restore_status_message)
-    
-    def restore_status_message(self):
-        if self.timer_running:
-            if self.is_target_focused:
-                self.status_label.setText(f"Timing {self.settings['target_process_name']} usage")
-            else:
-                self.status_label.setText(f"{self.settings['target_process_name']} not in focus - Timer paused")
-        else:
-            self.status_label.setText("Timer paused")
-    
-    def closeEvent(self, event):
-        # Save settings before closing
-        self.save_settings()
-        self.keyboard_monitor.stop_monitoring()
-        mixer.quit()
-        super().closeEvent(event)
-
-
-def main():
-    app = QApplication(sys.argv)
-    app.setStyle('Fusion')  # Use Fusion style for a modern look
-    
-    # Set application-wide dark palette
-    dark_palette = QPalette()
-    dark_palette.setColor(QPalette.Window, QColor(53, 53, 53))
-    dark_palette.setColor(QPalette.WindowText, Qt.white)
-    dark_palette.setColor(QPalette.Base, QColor(25, 25, 25))
-    dark_palette.setColor(QPalette.AlternateBase, QColor(53, 53, 53))
-    dark_palette.setColor(QPalette.ToolTipBase, Qt.white)
-    dark_palette.setColor(QPalette.ToolTipText, Qt.white)
-    dark_palette.setColor(QPalette.Text, Qt.white)
-    dark_palette.setColor(QPalette.Button, QColor(53, 53, 53))
-    dark_palette.setColor(QPalette.ButtonText, Qt.white)
-    dark_palette.setColor(QPalette.BrightText, Qt.red)
-    dark_palette.setColor(QPalette.Link, QColor(42, 130, 218))
-    dark_palette.setColor(QPalette.Highlight, QColor(42, 130, 218))
-    dark_palette.setColor(QPalette.HighlightedText, Qt.black)
-    app.setPalette(dark_palette)
-    
-    window = TimerWindow()
-    window.show()
-    sys.exit(app.exec_())
-
-
-if __name__ == "__main__":
-    main()
\ No newline at end of file
+# Only the standard library is imported up front. PyQt5 (lazy_ass_timer_gui), numpy,
+# pygame, psutil, keyboard and pywin32 are imported by the code that needs them,
+# so --headless and report start without paying for the ones they don't use.
+import sys
+import time
+import heapq
+import itertools
+import json
+import math
+import os
+import queue
+import random
+import re
+import struct
+import zlib
+from datetime import date, datetime, timedelta
+import threading
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict, deque, namedtuple
+from fnmatch import translate
+from functools import lru_cache
+
+
+FocusSnapshot = namedtuple('FocusSnapshot', ['hwnd', 'pid', 'process_name', 'timestamp'])
+NO_FOCUS = FocusSnapshot(0, 0, None, 0.0)
+
+
+class ProcessNameCache:
+    # Bounded pid -> process name cache. Each entry remembers the process create time,
+    # so a recycled pid gets re-resolved instead of returning the old process name.
+    
+    def __init__(self, table=None, max_entries=256):
+        self.table = table or PsutilProcessTable()
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, pid):
+        try:
+            create_time = self.table.create_time_of(pid)
+            entry = self._entries.get(pid)
+            if entry is not None and entry[0] == create_time:
+                self._entries.move_to_end(pid)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            name = self.table.name_of(pid)
+        except self.table.errors:
+            self._entries.pop(pid, None)
+            return None
+        self._entries[pid] = (create_time, name)
+        self._entries.move_to_end(pid)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return name
+    
+    def clear(self):
+        self._entries.clear()
+
+
+class PsutilProcessTable:
+    
+    def __init__(self):
+        import psutil
+        self.psutil = psutil
+        self.errors = (psutil.Error, OSError)
+    
+    def parent_of(self, pid):
+        process = self.psutil.Process(pid)
+        return process.ppid(), process.create_time()
+    
+    def create_time_of(self, pid):
+        return self.psutil.Process(pid).create_time()
+    
+    def name_of(self, pid):
+        return self.psutil.Process(pid).name()
+    
+    def snapshot(self):
+        return {process.info['pid']: (process.info['ppid'], process.info['create_time'])
+                for process in self.psutil.process_iter(['pid', 'ppid', 'create_time'])}
+
+
+class FakeProcessTable:
+    # In-memory process table for tests, pid -> (ppid, create_time, name)
+    errors = (OSError,)
+    
+    def __init__(self):
+        self.processes = {}
+        self._clock = itertools.count(1)
+    
+    def spawn(self, pid, ppid, name, create_time=None):
+        self.processes[pid] = (ppid, next(self._clock) if create_time is None else create_time, name)
+    
+    def exit(self, pid):
+        self.processes.pop(pid, None)
+    
+    def _get(self, pid):
+        try:
+            return self.processes[pid]
+        except KeyError:
+            raise ProcessLookupError(pid) from None
+    
+    def parent_of(self, pid):
+        ppid, create_time, _ = self._get(pid)
+        return ppid, create_time
+    
+    def create_time_of(self, pid):
+        return self._get(pid)[1]
+    
+    def name_of(self, pid):
+        return self._get(pid)[2]
+    
+    def snapshot(self):
+        return {pid: (ppid, create_time) for pid, (ppid, create_time, _) in self.processes.items()}
+
+
+class AncestryCache:
+    # Bounded pid -> (ppid, create_time) cache used to walk a process's ancestors
+    # without a psutil call per step. Entries are filled lazily and kept current by
+    # process_started()/process_exited(), which sync() derives from a process table
+    # snapshot. A parent that is younger than its child has reused the real
+    # parent's pid, so the walk stops there.
+    
+    def __init__(self, table, max_entries=4096):
+        self.table = table
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+    
+    def _entry(self, pid):
+        entry = self._entries.get(pid)
+        if entry is None:
+            try:
+                entry = self.table.parent_of(pid)
+            except self.table.errors:
+                return None
+            self._store(pid, entry)
+        else:
+            self._entries.move_to_end(pid)
+        return entry
+    
+    def _store(self, pid, entry):
+        self._entries[pid] = entry
+        self._entries.move_to_end(pid)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def ancestors(self, pid, max_depth=32):
+        entry = self._entry(pid)
+        for _ in range(max_depth):
+            if entry is None:
+                return
+            ppid, create_time = entry
+            if not ppid or ppid == pid:
+                return
+            parent = self._entry(ppid)
+            if parent is None or parent[1] > create_time:
+                return
+            yield ppid
+            pid, entry = ppid, parent
+    
+    def process_started(self, pid, ppid, create_time):
+        self._store(pid, (ppid, create_time))
+    
+    def process_exited(self, pid):
+        self._entries.pop(pid, None)
+    
+    def sync(self):
+        snapshot = self.table.snapshot()
+        for pid, entry in list(self._entries.items()):
+            current = snapshot.get(pid)
+            if current is None or current[1] != entry[1]:
+                self.process_exited(pid)
+        for pid, entry in snapshot.items():
+            if pid not in self._entries:
+                self.process_started(pid, *entry)
+
+
+class ProcessTreeMatcher:
+    # Target matching that also accepts descendants of a target process, so helper
+    # windows, consoles and terminals spawned by the IDE count as the IDE
+    
+    def __init__(self, matcher, ancestry, name_cache):
+        self.matcher = matcher
+        self.ancestry = ancestry
+        self.name_cache = name_cache
+    
+    def match(self, pid, process_name):
+        index = self.matcher.match(process_name)
+        if index is not None or not pid:
+            return index
+        for ancestor in self.ancestry.ancestors(pid):
+            index = self.matcher.match(self.name_cache.get(ancestor))
+            if index is not None:
+                return index
+        return None
+
+
+class FocusProvider:
+    # Holds the one shared focus snapshot and pushes a new one to subscribers
+    # whenever the focused process changes. Subclasses implement poll().
+    
+    def __init__(self):
+        self.current = NO_FOCUS
+        self._subscribers = []
+    
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+    
+    def unsubscribe(self, callback):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+    
+    def poll(self):
+        raise NotImplementedError
+    
+    def _update(self, hwnd, pid, process_name):
+        changed = pid != self.current.pid or process_name != self.current.process_name
+        self.current = FocusSnapshot(hwnd, pid, process_name, time.monotonic())
+        if changed:
+            for callback in list(self._subscribers):
+                callback(self.current)
+        return self.current
+
+
+class Win32FocusProvider(FocusProvider):
+    # GetForegroundWindow is cheap; the pid and process name are only resolved
+    # when the foreground window actually changes.
+    
+    def __init__(self, name_cache=None):
+        super().__init__()
+        import win32gui
+        import win32process
+        self.win32gui = win32gui
+        self.win32process = win32process
+        self.name_cache = name_cache or ProcessNameCache()
+        self._last_hwnd = None
+    
+    def poll(self):
+        hwnd = self.win32gui.GetForegroundWindow()
+        if hwnd == self._last_hwnd:
+            return self.current
+        self._last_hwnd = hwnd
+        if not hwnd:
+            return self._update(0, 0, None)
+        _, pid = self.win32process.GetWindowThreadProcessId(hwnd)
+        return self._update(hwnd, pid, self.name_cache.get(pid))
+
+
+class ScriptedFocusProvider(FocusProvider):
+    # Fake provider for headless tests and benchmarks. Each poll() advances one
+    # step through the script (process names, None for no window); set_focus()
+    # pushes a change directly.
+    
+    def __init__(self, script=(), loop=False):
+        super().__init__()
+        self.script = list(script)
+        self.loop = loop
+        self.position = 0
+        self._pids = {}
+    
+    def set_focus(self, process_name, pid=None):
+        if process_name is None:
+            return self._update(0, 0, None)
+        if pid is None:
+            pid = self._pids.setdefault(process_name, 1000 + len(self._pids))
+        return self._update(pid, pid, process_name)
+    
+    def poll(self):
+        if self.position >= len(self.script):
+            if not self.loop or not self.script:
+                return self.current
+            self.position = 0
+        process_name = self.script[self.position]
+        self.position += 1
+        return self.set_focus(process_name)
+
+
+TargetRule = namedtuple('TargetRule', ['pattern', 'kind', 'budget_seconds', 'weight'])
+ANY_TARGET = TargetRule('*', 'glob', 0, 1.0)
+
+
+def parse_target_rule(line):
+    # "pattern [budget minutes] [weight]", with "re:" marking a regex and *?[ a glob
+    parts = line.split()
+    pattern = parts[0]
+    if pattern.startswith('re:'):
+        kind, pattern = 'regex', pattern[3:]
+        re.compile(pattern)
+    elif any(char in pattern for char in '*?['):
+        kind = 'glob'
+    else:
+        kind = 'exact'
+    budget_minutes = float(parts[1]) if len(parts) > 1 else 0
+    weight = float(parts[2]) if len(parts) > 2 else 1.0
+    return TargetRule(pattern, kind, int(budget_minutes * 60), weight)
+
+
+def format_target_rule(rule):
+    pattern = 're:' + rule.pattern if rule.kind == 'regex' else rule.pattern
+    if rule.weight != 1.0:
+        return f"{pattern} {rule.budget_seconds / 60:g} {rule.weight:g}"
+    if rule.budget_seconds:
+        return f"{pattern} {rule.budget_seconds / 60:g}"
+    return pattern
+
+
+# An extra named timer next to the main countdown (a work block, a break, a daily
+# budget). It counts down while one of its targets is focused ('focused'), while none
+# of them is ('away') or whenever the timers run ('always'); without targets of its
+# own it goes by the main ones. With repeat it starts over when it runs out.
+TimerSpec = namedtuple('TimerSpec', ['name', 'seconds', 'count', 'targets', 'time_up_sound_path', 'repeat'],
+                       defaults=('focused', None, None, False))
+TIMER_COUNT_MODES = ('focused', 'away', 'always')
+
+
+def parse_timer_spec(line):
+    # "name minutes [focused|away|always] [repeat]", the name may contain spaces
+    parts = line.split()
+    repeat = parts[-1] == 'repeat'
+    if repeat:
+        parts.pop()
+    count = parts.pop() if parts and parts[-1] in TIMER_COUNT_MODES else 'focused'
+    if len(parts) < 2:
+        raise ValueError(f"expected a name and minutes, got {line.strip()!r}")
+    return TimerSpec(' '.join(parts[:-1]), int(float(parts[-1]) * 60), count, repeat=repeat)
+
+
+def format_timer_spec(spec):
+    line = f"{spec.name} {spec.seconds / 60:g}"
+    if spec.count != 'focused':
+        line += f" {spec.count}"
+    return line + " repeat" if spec.repeat else line
+
+
+class TargetMatcher:
+    # Maps a process name to the index of the first target rule it matches (or None).
+    # Exact names are a dict lookup; globs and regexes are compiled into one
+    # alternation with a named group per rule. Results are memoized per name.
+    # Process names are matched case-insensitively, like Windows treats them.
+    
+    def __init__(self, rules, memo_size=1024):
+        self.rules = list(rules)
+        self.memo_size = memo_size
+        self._exact = {}
+        alternatives = []
+        for index, rule in enumerate(self.rules):
+            if rule.kind == 'exact':
+                self._exact.setdefault(rule.pattern.casefold(), index)
+            else:
+                pattern = translate(rule.pattern) if rule.kind == 'glob' else rf"(?:{rule.pattern})\Z"
+                alternatives.append(f"(?P<r{index}>{pattern})")
+        self._patterns = re.compile('|'.join(alternatives), re.IGNORECASE) if alternatives else None
+        self._memo = {}
+    
+    def match(self, process_name):
+        try:
+            return self._memo[process_name]
+        except KeyError:
+            pass
+        index = None
+        if process_name:
+            index = self._exact.get(process_name.casefold())
+            if self._patterns is not None:
+                found = self._patterns.match(process_name)
+                if found is not None:
+                    pattern_index = int(found.lastgroup[1:])
+                    if index is None or pattern_index < index:
+                        index = pattern_index
+        if len(self._memo) >= self.memo_size:
+            self._memo.clear()
+        self._memo[process_name] = index
+        return index
+
+
+class TimerEngine:
+    # Qt-free countdown. Time is only consumed while the timer is running and one of
+    # the targets is focused, and is accounted per target from monotonic clock deltas
+    # taken at those state transitions, so late or merged UI ticks can never make it
+    # drift. Each target's time counts toward the countdown times its weight, up to
+    # its budget (0 means no budget). The UI just samples remaining() for display.
+    # All bookkeeping is in integer nanoseconds.
+    
+    def __init__(self, duration_seconds, targets=(ANY_TARGET,), clock=time.monotonic_ns):
+        self.clock = clock
+        self.duration_ns = int(duration_seconds * 1_000_000_000)
+        self.running = False
+        self.target = None
+        self.targets = list(targets)
+        self._target_ns = [0] * len(self.targets)
+        self._offset_ns = 0  # rewards and edits
+        self._counting_since = None
+        self.gated = False  # held by the owner, e.g. while typing too slowly
+    
+    @property
+    def focused(self):
+        return self.target is not None
+    
+    @property
+    def counting(self):
+        if self._counting_since is None:
+            return False
+        budget = self.targets[self.target].budget_seconds
+        return not budget or self.target_ns(self.target) < budget * 1_000_000_000
+    
+    def _transition(self, running, target):
+        now = self.clock()
+        if self._counting_since is not None:
+            self._target_ns[self.target] += now - self._counting_since
+            self._counting_since = None
+        self.running = running
+        self.target = target
+        if running and target is not None and not self.gated:
+            self._counting_since = now
+    
+    def start(self):
+        self._transition(True, self.target)
+    
+    def pause(self):
+        self._transition(False, self.target)
+    
+    def set_target(self, target):
+        if target != self.target:
+            self._transition(self.running, target)
+    
+    def set_focused(self, focused):
+        self.set_target(0 if focused else None)
+    
+    def set_gated(self, gated):
+        if gated != self.gated:
+            self.gated = gated
+            self._transition(self.running, self.target)
+    
+    def set_targets(self, targets):
+        # Per-target time starts over, the remaining time carries across
+        remaining = self.remaining()
+        self._transition(self.running, None)
+        self.targets = list(targets)
+        self._target_ns = [0] * len(self.targets)
+        self.set_remaining(remaining)
+    
+    def target_ns(self, index, now=None):
+        elapsed = self._target_ns[index]
+        if index == self.target and self._counting_since is not None:
+            elapsed += (self.clock() if now is None else now) - self._counting_since
+        return elapsed
+    
+    def target_seconds(self, index, now=None):
+        return self.target_ns(index, now) / 1_000_000_000
+    
+    def consumed_ns(self, now=None):
+        if now is None:
+            now = self.clock()
+        consumed = self._offset_ns
+        for index, rule in enumerate(self.targets):
+            elapsed = self.target_ns(index, now)
+            if rule.budget_seconds:
+                elapsed = min(elapsed, rule.budget_seconds * 1_000_000_000)
+            consumed += int(elapsed * rule.weight)
+        return consumed
+    
+    def remaining_us(self, now=None):
+        return max(0, self.duration_ns - self.consumed_ns(now)) // 1000
+    
+    def remaining(self, now=None):
+        return max(0, self.duration_ns - self.consumed_ns(now)) / 1_000_000_000
+    
+    def is_expired(self, now=None):
+        return self.consumed_ns(now) >= self.duration_ns
+    
+    def time_to_expiry(self):
+        # Seconds until zero at the current rate; None while not counting, or when the
+        # focused target's budget runs out first
+        if not self.counting:
+            return None
+        now = self.clock()
+        left_ns = self.duration_ns - self.consumed_ns(now)
+        rule = self.targets[self.target]
+        if rule.budget_seconds:
+            budget_left_ns = rule.budget_seconds * 1_000_000_000 - self.target_ns(self.target, now)
+            if budget_left_ns * rule.weight < left_ns:
+                return None
+        return max(0, math.ceil(left_ns / rule.weight)) / 1_000_000_000
+    
+    def set_remaining(self, seconds):
+        # Re-base the counting segment so the new value applies from now on
+        self._transition(self.running, self.target)
+        self._offset_ns += self.duration_ns - int(max(0, seconds) * 1_000_000_000) - self.consumed_ns()
+    
+    def subtract(self, seconds):
+        self.set_remaining(max(0.0, self.remaining() - seconds))
+    
+    def reset(self, duration_seconds):
+        self.duration_ns = int(duration_seconds * 1_000_000_000)
+        self._transition(self.running, self.target)
+        self._target_ns = [0] * len(self.targets)
+        self._offset_ns = 0
+
+
+class NamedTimer:
+    # One extra timer: an engine of its own fed from the shared focus snapshot, and a
+    # scheduler job armed for the moment it runs out. The jobs of all the timers sit in
+    # the scheduler's one heap, so nothing scans the timers to find the next expiry.
+    
+    def __init__(self, spec, matcher, engine, job=None):
+        self.spec = spec
+        self.matcher = matcher  # a ProcessTreeMatcher, None to go by the main timer's targets
+        self.engine = engine
+        self.job = job
+    
+    def update_target(self, pid, process_name, main_target):
+        # pid 0 matches by name only, as when child processes don't count
+        if self.spec.count == 'always':
+            target = 0
+        else:
+            target = main_target if self.matcher is None else self.matcher.match(pid, process_name)
+            if self.spec.count == 'away':
+                target = 0 if target is None else None
+        self.engine.set_target(target)
+
+
+def decode_sound(sound_path):
+    # Decode with the pygame mixer so the buffer already matches its output format
+    from pygame import mixer, sndarray
+    if not mixer.get_init():
+        mixer.init()
+    return sndarray.array(mixer.Sound(sound_path))
+
+
+def build_pitch_bank(samples, speeds):
+    # Linear-interpolation resampling, one vectorized pass per speed. Played back at
+    # the mixer rate each variant shifts pitch and tempo together, like speed= did.
+    import numpy as np
+    source = samples.astype(np.float32)
+    bank = []
+    for speed in speeds:
+        positions = np.arange(0, len(source) - 1, speed)
+        index = positions.astype(np.intp)
+        frac = (positions - index).astype(np.float32)
+        if source.ndim > 1:
+            frac = frac[:, None]
+        variant = source[index] * (1 - frac) + source[index + 1] * frac
+        bank.append(np.ascontiguousarray(variant.astype(samples.dtype)))
+    return bank
+
+
+class SampleCache:
+    # Decodes each sound once and keeps a bank of pitch-shifted PCM variants, so a
+    # trigger is just a buffer lookup. Least recently used sounds are evicted once
+    # the banks grow past max_bytes.
+    
+    def __init__(self, max_bytes=64 * 1024 * 1024, variants=8, speed_range=(0.9, 1.15), decoder=decode_sound):
+        self.max_bytes = max_bytes
+        low, high = speed_range
+        self.speeds = [low + (high - low) * i / max(1, variants - 1) for i in range(variants)]
+        self.decoder = decoder
+        self.total_bytes = 0
+        self._banks = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get_bank(self, sound_path):
+        with self._lock:
+            bank = self._banks.get(sound_path)
+            if bank is not None:
+                self._banks.move_to_end(sound_path)
+                return bank
+        
+        # Decode outside the lock so a slow file doesn't hold up cached sounds
+        bank = build_pitch_bank(self.decoder(sound_path), self.speeds)
+        with self._lock:
+            if sound_path not in self._banks:
+                self._banks[sound_path] = bank
+                self.total_bytes += sum(variant.nbytes for variant in bank)
+                while self.total_bytes > self.max_bytes and len(self._banks) > 1:
+                    _, evicted = self._banks.popitem(last=False)
+                    self.total_bytes -= sum(variant.nbytes for variant in evicted)
+            return self._banks[sound_path]
+    
+    def variant(self, sound_path):
+        return random.choice(self.get_bank(sound_path))
+    
+    def invalidate(self, sound_path=None):
+        with self._lock:
+            if sound_path is None:
+                self._banks.clear()
+                self.total_bytes = 0
+            else:
+                bank = self._banks.pop(sound_path, None)
+                if bank is not None:
+                    self.total_bytes -= sum(variant.nbytes for variant in bank)
+    
+    def preload(self, sound_paths):
+        for sound_path in sound_paths:
+            try:
+                self.get_bank(sound_path)
+            except Exception as e:
+                print(f"Error loading sound {sound_path}: {e}")
+
+
+class NullAudioSink:
+    # Swallows mixed blocks, for load-testing the audio path without a sound card.
+    # With realtime=True each write takes as long as the block would take to play.
+    
+    def __init__(self, sample_rate=44100, realtime=False):
+        self.sample_rate = sample_rate
+        self.realtime = realtime
+        self.blocks_written = 0
+    
+    def write(self, block):
+        self.blocks_written += 1
+        if self.realtime:
+            time.sleep(len(block) / self.sample_rate)
+    
+    def close(self):
+        pass
+
+
+class PygameAudioSink:
+    # Streams the mixed blocks through one mixer channel, keeping at most one block
+    # queued behind the one that is playing.
+    
+    def __init__(self):
+        from pygame import mixer, sndarray
+        if not mixer.get_init():
+            mixer.init()
+        self.make_sound = sndarray.make_sound
+        self.channel = mixer.Channel(0)
+        mixer.set_reserved(1)
+    
+    def write(self, block):
+        sound = self.make_sound(block)
+        while self.channel.get_queue() is not None:
+            time.sleep(0.002)
+        if self.channel.get_busy():
+            self.channel.queue(sound)
+        else:
+            self.channel.play(sound)
+    
+    def close(self):
+        self.channel.stop()
+
+
+class Voice:
+    __slots__ = ('sound_path', 'samples', 'position', 'enqueued_at')
+    
+    def __init__(self, sound_path, samples, enqueued_at):
+        self.sound_path = sound_path
+        self.samples = samples
+        self.position = 0
+        self.enqueued_at = enqueued_at
+
+
+class AudioWorker:
+    # Plays triggers on its own thread so the Qt thread only pays for a queue put.
+    # Overlapping sounds are mixed into one output stream of block_frames blocks.
+    # A trigger of a sound that started less than coalesce_seconds ago is merged
+    # into it, and triggers beyond max_voices are dropped.
+    
+    # Without a sink the pygame one is opened on the worker thread, so loading pygame
+    # doesn't hold up startup
+    def __init__(self, sink, cache, max_voices=6, queue_size=32, block_frames=1024,
+                 sample_rate=44100, coalesce_seconds=0.03):
+        self.sink = sink
+        self.cache = cache
+        self.max_voices = max_voices
+        self.block_frames = block_frames
+        self.coalesce_frames = int(coalesce_seconds * sample_rate)
+        self.queue = queue.Queue(queue_size)
+        self.voices = []
+        self.latencies = deque(maxlen=1024)
+        self.metrics = None
+        self.rejected = 0  # queue was full
+        self.dropped = 0  # over the voice limit
+        self.coalesced = 0
+        self._thread = None
+    
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        if self._thread:
+            try:
+                self.queue.put(None, timeout=1)
+            except queue.Full:
+                pass
+            self._thread.join(timeout=1)
+            self._thread = None
+        if self.sink is not None:
+            self.sink.close()
+    
+    def trigger(self, sound_path):
+        try:
+            self.queue.put_nowait((sound_path, time.perf_counter()))
+        except queue.Full:
+            self.rejected += 1
+    
+    def _run(self):
+        if self.sink is None:
+            try:
+                self.sink = PygameAudioSink()
+            except Exception as e:
+                print(f"Error opening audio output: {e}")
+                return
+        while True:
+            # Sleep on the queue while nothing is playing, drain it between blocks otherwise
+            item = ()
+            try:
+                item = self.queue.get(block=not self.voices)
+                while item is not None:
+                    self._add_voice(*item)
+                    item = self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            if item is None:
+                break
+            if not self.voices:
+                continue  # every trigger failed to load, nothing to mix
+            
+            starting = [voice for voice in self.voices if voice.position == 0]
+            self.sink.write(self._mix())
+            now = time.perf_counter()
+            for voice in starting:
+                self.latencies.append(now - voice.enqueued_at)
+                if self.metrics is not None:
+                    self.metrics.observe('lazy_timer_sound_latency_seconds', now - voice.enqueued_at)
+    
+    def _add_voice(self, sound_path, enqueued_at):
+        for voice in self.voices:
+            if voice.sound_path == sound_path and voice.position < self.coalesce_frames:
+                self.coalesced += 1
+                return
+        if len(self.voices) >= self.max_voices:
+            self.dropped += 1
+            return
+        try:
+            samples = self.cache.variant(sound_path)
+        except Exception as e:
+            print(f"Error playing sound: {e}")
+            return
+        self.voices.append(Voice(sound_path, samples, enqueued_at))
+    
+    def _mix(self):
+        import numpy as np
+        mix = np.zeros((self.block_frames,) + self.voices[0].samples.shape[1:], np.int32)
+        for voice in self.voices:
+            chunk = voice.samples[voice.position:voice.position + self.block_frames]
+            mix[:len(chunk)] += chunk
+            voice.position += self.block_frames
+        self.voices = [voice for voice in self.voices if voice.position < len(voice.samples)]
+        return np.clip(mix, -32768, 32767).astype(np.int16)
+    
+    def latency_stats(self):
+        if not self.latencies:
+            return None
+        import numpy as np
+        latencies = np.array(self.latencies) * 1000
+        return {
+            'count': len(latencies),
+            'p50_ms': float(np.percentile(latencies, 50)),
+            'p95_ms': float(np.percentile(latencies, 95)),
+            'max_ms': float(latencies.max())
+        }
+
+
+class SoundPlayer:
+    
+    def __init__(self, cache=None, sink=None, max_voices=6):
+        self.cache = cache or SampleCache()
+        self.worker = AudioWorker(sink, self.cache, max_voices=max_voices)
+        self.worker.start()
+    
+    def preload(self, sound_paths):
+        threading.Thread(target=self.cache.preload, args=(list(sound_paths),), daemon=True).start()
+    
+    def play_sound(self, sound_path, enable_sounds=True):
+        if enable_sounds:
+            self.worker.trigger(sound_path)
+    
+    def close(self):
+        self.worker.stop()
+        mixer = sys.modules.get('pygame.mixer')
+        if mixer is not None:
+            mixer.quit()
+
+
+KEY_EVENT, ENTER_EVENT, MOUSE_EVENT = 0, 1, 2
+
+InputBatch = namedtuple('InputBatch', ['keys', 'enters', 'mouse', 'first_time', 'last_time', 'overruns'])
+
+
+# Held modifiers are tracked as bits, a chord is (modifier bits, key name)
+MODIFIER_BITS = {
+    'ctrl': 1, 'left ctrl': 1, 'right ctrl': 1,
+    'shift': 2, 'left shift': 2, 'right shift': 2,
+    'alt': 4, 'left alt': 4, 'right alt': 4, 'alt gr': 4,
+    'windows': 8, 'left windows': 8, 'right windows': 8
+}
+ENTER_CHORD = (0, 'enter')
+
+
+def parse_key_chord(text):
+    # "enter", "ctrl+s", "ctrl+shift+f5": modifiers, then the key
+    parts = [part.strip() for part in text.lower().split('+')]
+    if text == '+' or text.endswith('++'):
+        parts[-2:] = ['+']  # the plus key itself
+    if not all(parts) or parts[-1] in MODIFIER_BITS:
+        raise ValueError(f"bad key chord {text!r}")
+    modifiers = 0
+    for part in parts[:-1]:
+        if part not in MODIFIER_BITS:
+            raise ValueError(f"{part!r} in {text!r} is not a modifier key")
+        modifiers |= MODIFIER_BITS[part]
+    return modifiers, parts[-1]
+
+
+class InputRing:
+    # Single-producer/single-consumer ring of (monotonic timestamp, kind) records in
+    # preallocated arrays. The hook thread writes a slot and then publishes it by
+    # bumping head; the GUI thread only moves tail, so no lock is needed.
+    
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self.times = array('d', bytes(8 * capacity))
+        self.kinds = array('B', bytes(capacity))
+        self.head = 0
+        self.tail = 0
+    
+    def push(self, timestamp, kind):
+        slot = self.head % self.capacity
+        self.times[slot] = timestamp
+        self.kinds[slot] = kind
+        self.head += 1
+    
+    def drain(self):
+        head = self.head
+        overruns = max(0, head - self.tail - self.capacity)
+        start = self.tail + overruns
+        self.tail = head
+        if start == head:
+            return None
+        counts = [0, 0, 0]
+        for index in range(start, head):
+            counts[self.kinds[index % self.capacity]] += 1
+        return InputBatch(counts[KEY_EVENT], counts[ENTER_EVENT], counts[MOUSE_EVENT],
+                          self.times[start % self.capacity], self.times[(head - 1) % self.capacity], overruns)
+
+
+class KeyboardHookBackend:
+    # System-wide key hook from the keyboard module, which runs its own listener thread.
+    # Releases are passed on too, the monitor needs them to track held modifiers. The
+    # listener keeps running after unhook, so on Windows Win32KeyHookBackend is used.
+    
+    def __init__(self):
+        self._hook = None
+    
+    def start(self, on_key):
+        import keyboard
+        self._hook = keyboard.hook(lambda event: on_key(event.name, event.event_type == 'down'))
+    
+    def stop(self):
+        if self._hook is not None:
+            import keyboard
+            keyboard.unhook(self._hook)
+            self._hook = None
+
+
+def win32_key_names():
+    # Virtual-key codes to the names the keyboard module uses, so chords parse the
+    # same either way. Punctuation depends on the layout and is filled in on Windows.
+    names = [''] * 256
+    for code in range(ord('0'), ord('9') + 1):
+        names[code] = names[code + 0x30] = chr(code)  # top row and keypad
+    for code in range(ord('A'), ord('Z') + 1):
+        names[code] = chr(code).lower()
+    for index in range(24):
+        names[0x70 + index] = f"f{index + 1}"
+    names[0x08:0x0E] = ['backspace', 'tab', '', '', 'clear', 'enter']
+    names[0x10:0x15] = ['shift', 'ctrl', 'alt', 'pause', 'caps lock']
+    names[0x1B] = 'esc'
+    names[0x20:0x2F] = ['space', 'page up', 'page down', 'end', 'home', 'left', 'up', 'right', 'down',
+                        'select', 'print', 'execute', 'print screen', 'insert', 'delete']
+    names[0x5B:0x5E] = ['left windows', 'right windows', 'menu']
+    names[0x6A:0x70] = ['*', '+', 'separator', '-', 'decimal', '/']
+    names[0x90:0x92] = ['num lock', 'scroll lock']
+    names[0xA0:0xA6] = ['left shift', 'right shift', 'left ctrl', 'right ctrl', 'left alt', 'right alt']
+    return names
+
+
+class Win32KeyHookBackend:
+    # Low-level key hook (WH_KEYBOARD_LL) installed with SetWindowsHookExW on a thread
+    # of its own, which pumps messages for as long as it is installed. stop() posts
+    # WM_QUIT, the thread takes the hook out with UnhookWindowsHookEx and ends, so
+    # while stopped Windows doesn't call into this process at all.
+    
+    WM_QUIT = 0x0012
+    WM_KEYDOWN = 0x0100
+    WM_SYSKEYDOWN = 0x0104
+    
+    def __init__(self):
+        self.names = win32_key_names()
+        self.on_key = None
+        self.installed = False
+        self._thread = None
+        self._thread_id = None
+    
+    def start(self, on_key):
+        self.on_key = on_key
+        if not self.installed:
+            self.installed = True
+            self._install()
+    
+    def stop(self):
+        if self.installed:
+            self.installed = False
+            self._remove()
+        self.on_key = None
+    
+    def handle(self, vk_code, down):
+        self.on_key(self.names[vk_code & 0xFF], down)
+    
+    def _install(self):
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(ready,), name='key-hook', daemon=True)
+        self._thread.start()
+        ready.wait(1)
+    
+    def _remove(self):
+        import ctypes
+        ctypes.windll.user32.PostThreadMessageW(self._thread_id, self.WM_QUIT, 0, 0)
+        self._thread.join(1)
+        self._thread = None
+    
+    def _run(self, ready):
+        import ctypes
+        from ctypes import wintypes
+        user32 = ctypes.windll.user32
+        kernel32 = ctypes.windll.kernel32
+        
+        class KBDLLHOOKSTRUCT(ctypes.Structure):
+            _fields_ = [('vkCode', wintypes.DWORD), ('scanCode', wintypes.DWORD), ('flags', wintypes.DWORD),
+                        ('time', wintypes.DWORD), ('dwExtraInfo', ctypes.c_size_t)]
+        
+        HOOKPROC = ctypes.WINFUNCTYPE(wintypes.LPARAM, ctypes.c_int, wintypes.WPARAM, wintypes.LPARAM)
+        user32.SetWindowsHookExW.argtypes = (ctypes.c_int, HOOKPROC, wintypes.HINSTANCE, wintypes.DWORD)
+        user32.SetWindowsHookExW.restype = wintypes.HHOOK
+        user32.CallNextHookEx.argtypes = (wintypes.HHOOK, ctypes.c_int, wintypes.WPARAM, wintypes.LPARAM)
+        user32.CallNextHookEx.restype = wintypes.LPARAM
+        user32.UnhookWindowsHookEx.argtypes = (wintypes.HHOOK,)
+        kernel32.GetModuleHandleW.restype = wintypes.HMODULE
+        
+        # Punctuation keys as the current layout types them
+        for code in range(0xBA, 0xE3):
+            if not self.names[code]:
+                char = user32.MapVirtualKeyW(code, 2) & 0xFFFF  # MAPVK_VK_TO_CHAR
+                if char:
+                    self.names[code] = chr(char).lower()
+        
+        keydowns = (self.WM_KEYDOWN, self.WM_SYSKEYDOWN)
+        handle = self.handle
+        
+        def hook_proc(code, wparam, lparam):
+            if code == 0:  # HC_ACTION
+                handle(KBDLLHOOKSTRUCT.from_address(lparam).vkCode, wparam in keydowns)
+            return user32.CallNextHookEx(None, code, wparam, lparam)
+        
+        proc = HOOKPROC(hook_proc)  # referenced until the hook is gone
+        msg = wintypes.MSG()
+        self._thread_id = kernel32.GetCurrentThreadId()
+        user32.PeekMessageW(ctypes.byref(msg), None, 0, 0, 0)  # creates the queue stop() posts to
+        hook = user32.SetWindowsHookExW(13, proc, kernel32.GetModuleHandleW(None), 0)  # WH_KEYBOARD_LL
+        ready.set()
+        if not hook:
+            print(f"Error installing the key hook: {ctypes.WinError()}")
+            return
+        while user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+            pass
+        user32.UnhookWindowsHookEx(hook)
+
+
+class ReplayInputBackend:
+    # Replays key names into the pipeline, for keystroke-flood benchmarks and tests
+    
+    def __init__(self):
+        self.on_key = None
+    
+    def start(self, on_key):
+        self.on_key = on_key
+    
+    def stop(self):
+        self.on_key = None
+    
+    def replay(self, key_names):
+        # A chord like "ctrl+s" holds its modifiers down around the key. While stopped
+        # the keys go nowhere, like typing with the hook removed.
+        if self.on_key is None:
+            return
+        for name in key_names:
+            if len(name) > 1 and '+' in name:
+                *modifiers, name = name.split('+')
+                for modifier in modifiers:
+                    self.on_key(modifier, True)
+                self.on_key(name, True)
+                for modifier in modifiers:
+                    self.on_key(modifier, False)
+            else:
+                self.on_key(name, True)
+
+
+class MouseHookBackend:
+    # Mouse activity from the mouse module. Moves arrive hundreds of times a second,
+    # so at most one event per min_interval is passed on.
+    
+    def __init__(self, min_interval=0.25):
+        self.min_interval = min_interval
+        self._last_event = 0.0
+        self._hook = None
+    
+    def start(self, on_activity):
+        import mouse
+        
+        def on_event(event):
+            now = time.monotonic()
+            if now - self._last_event >= self.min_interval:
+                self._last_event = now
+                on_activity(now)
+        
+        self._hook = on_event
+        mouse.hook(on_event)
+    
+    def stop(self):
+        if self._hook is not None:
+            import mouse
+            mouse.unhook(self._hook)
+            self._hook = None
+
+
+class KeyboardMonitor:
+    # Keystrokes are timestamped on the hook thread and collected in an InputRing.
+    # Chords in bound_keys (Enter, and whatever the reward rules use) are forwarded
+    # immediately through post(), which hands on_chord to the loop thread; everything
+    # else reaches on_batch as one InputBatch per flush(), which the owner calls at
+    # the batch rate. Mouse events (optional) come from another thread, so they get
+    # a ring of their own. The key hook can be taken off while monitoring, see
+    # set_key_hook.
+    
+    def __init__(self, backend=None, mouse_backend=None, on_chord=None, on_batch=None, post=None,
+                 bound_keys=frozenset([ENTER_CHORD])):
+        self.backend = backend or (Win32KeyHookBackend() if sys.platform == 'win32' else KeyboardHookBackend())
+        self.mouse_backend = mouse_backend
+        self.on_chord = on_chord
+        self.on_batch = on_batch
+        self.post = post or (lambda callback: callback())
+        self.bound_keys = bound_keys
+        self.modifiers = 0
+        self.key_hook_active = False
+        self.ring = InputRing()
+        self.mouse_ring = InputRing(256)
+        self.last_activity_time = time.monotonic()
+    
+    def start_monitoring(self):
+        self.set_key_hook(True)
+        if self.mouse_backend is not None:
+            self.mouse_backend.start(self._on_mouse)
+    
+    def stop_monitoring(self):
+        self.set_key_hook(False)
+        if self.mouse_backend is not None:
+            self.mouse_backend.stop()
+    
+    def set_key_hook(self, active):
+        # Releases typed while the hook is off are never seen, so held modifiers start over
+        if active == self.key_hook_active:
+            return
+        self.key_hook_active = active
+        self.modifiers = 0
+        if active:
+            self.backend.start(self._on_key)
+        else:
+            self.backend.stop()
+    
+    def set_mouse_backend(self, mouse_backend):
+        if self.mouse_backend is not None:
+            self.mouse_backend.stop()
+        self.mouse_backend = mouse_backend
+        if mouse_backend is not None:
+            mouse_backend.start(self._on_mouse)
+    
+    def _on_mouse(self, timestamp):
+        self.mouse_ring.push(timestamp, MOUSE_EVENT)
+    
+    def _on_key(self, name, down=True):
+        # Left and right modifiers share a bit, releasing either one clears it
+        bit = MODIFIER_BITS.get(name)
+        if bit is not None:
+            if not down:
+                self.modifiers &= ~bit
+                return
+            self.modifiers |= bit
+        elif not down:
+            return
+        now = time.monotonic()
+        self.ring.push(now, ENTER_EVENT if name == 'enter' else KEY_EVENT)
+        # Shifted letters arrive upper case
+        chord = (self.modifiers, name.lower())
+        if chord in self.bound_keys and self.on_chord is not None:
+            self.post(lambda: self.on_chord(chord, now))
+    
+    def flush(self):
+        batch = self.ring.drain()
+        mouse_batch = self.mouse_ring.drain()
+        if mouse_batch is not None:
+            if batch is None:
+                batch = mouse_batch
+            else:
+                batch = InputBatch(batch.keys, batch.enters, mouse_batch.mouse,
+                                   min(batch.first_time, mouse_batch.first_time),
+                                   max(batch.last_time, mouse_batch.last_time),
+                                   batch.overruns + mouse_batch.overruns)
+        if batch is not None:
+            self.last_activity_time = batch.last_time
+            if self.on_batch is not None:
+                self.on_batch(batch)
+        return batch
+    
+    def get_idle_time(self):
+        return time.monotonic() - self.last_activity_time
+
+
+TYPING_RATE_WINDOWS = (10, 60, 300)
+
+
+class TypingRateMeter:
+    # Keystrokes per minute over the last 10 s, 1 min and 5 min. Keys go into the
+    # one-second buckets of a fixed ring as long as the longest window, and each
+    # window keeps a running sum that every passing second takes the bucket leaving
+    # it off, so adding keys and reading a rate cost the same at any typing speed.
+    
+    def __init__(self, windows=TYPING_RATE_WINDOWS, clock=time.monotonic):
+        self.windows = tuple(windows)
+        self.clock = clock
+        self.size = max(self.windows)
+        self.buckets = array('I', [0]) * self.size
+        self.sums = [0] * len(self.windows)
+        self._index = {window: index for index, window in enumerate(self.windows)}
+        self.second = math.floor(clock())
+    
+    def _advance(self, now):
+        second = math.floor(now)
+        if second <= self.second:
+            return
+        if second == self.second + 1:
+            # Typing is mostly second after second
+            for index, window in enumerate(self.windows):
+                self.sums[index] -= self.buckets[(second - window) % self.size]
+            self.buckets[second % self.size] = 0
+        elif second - self.second >= self.size:
+            # Everything has left every window
+            self.buckets = array('I', [0]) * self.size
+            self.sums = [0] * len(self.windows)
+        else:
+            # Seconds (old - window, new - window] leave each window, all of it once
+            # the gap is as long as the window. Then the new seconds' buckets are cleared.
+            elapsed = second - self.second
+            for index, window in enumerate(self.windows):
+                if elapsed >= window:
+                    self.sums[index] = 0
+                else:
+                    self.sums[index] -= self._total(self.second + 1 - window, second - window)
+            start, stop = (self.second + 1) % self.size, second % self.size + 1
+            if start < stop:
+                self.buckets[start:stop] = array('I', [0]) * (stop - start)
+            else:
+                self.buckets[start:] = array('I', [0]) * (self.size - start)
+                self.buckets[:stop] = array('I', [0]) * stop
+        self.second = second
+    
+    def _total(self, first, last):
+        # Keys in seconds first..last, all still in the ring
+        if last < first:
+            return 0
+        start, stop = first % self.size, last % self.size + 1
+        if start < stop:
+            return sum(self.buckets[start:stop])
+        return sum(self.buckets[start:]) + sum(self.buckets[:stop])
+    
+    def add(self, count, timestamp=None):
+        # Late keys count toward the current second
+        self._advance(self.clock() if timestamp is None else timestamp)
+        self.buckets[self.second % self.size] += count
+        self.sums = [total + count for total in self.sums]
+    
+    def rate(self, window=60, now=None):
+        self._advance(self.clock() if now is None else now)
+        return self.sums[self._index[window]] * 60 / window
+    
+    def time_until_below(self, window, rate, now=None):
+        # Seconds until the window's rate drops below rate if no more keys come, 0 if
+        # it already has. Walks at most one window of buckets.
+        now = self.clock() if now is None else now
+        self._advance(now)
+        threshold = rate * window / 60
+        total = self.sums[self._index[window]]
+        if total < threshold:
+            return 0.0
+        for age in range(1, window + 1):
+            total -= self.buckets[(self.second + age - window) % self.size]
+            if total < threshold:
+                return self.second + age - now
+        return float(window)
+
+
+RewardRule = namedtuple('RewardRule', ['keys', 'seconds', 'target', 'cooldown_seconds', 'per_minute'],
+                        defaults=('*', 0, 0))
+
+
+class RewardTable:
+    # Reward rules compiled into one dict keyed by (chord, focused target index), so
+    # a keystroke costs a single lookup and never an OS query: the focused target is
+    # the one the engine already tracks. A rule's target is "*" for every target, one
+    # target's pattern, or None for anywhere outside the targets. Rules for a named
+    # target beat "*" rules, earlier rules beat later ones. Positive seconds are taken
+    # off the countdown, negative ones are a penalty. Cooldowns and per-minute caps
+    # are tracked per rule.
+    
+    def __init__(self, rules, targets, enter_seconds=0, clock=time.monotonic):
+        self.clock = clock
+        self.rules = list(rules)
+        if enter_seconds:
+            # The plain Enter reward (enter_shortcut_seconds) comes last, any Enter rule overrides it
+            self.rules.append(RewardRule('enter', enter_seconds))
+        target_indices = {}
+        for index, target in enumerate(targets):
+            target_indices.setdefault(target.pattern.casefold(), index)
+        self.table = {}
+        for wildcard in (False, True):
+            for index, rule in enumerate(self.rules):
+                if (rule.target == '*') != wildcard:
+                    continue
+                chord = parse_key_chord(rule.keys)
+                if wildcard:
+                    indices = range(len(targets))
+                elif rule.target is None:
+                    indices = [None]
+                elif rule.target.casefold() in target_indices:
+                    indices = [target_indices[rule.target.casefold()]]
+                else:
+                    raise ValueError(f"{rule.target!r} is not one of the targets")
+                for target in indices:
+                    self.table.setdefault((chord, target), index)
+        # Read by the hook thread, which only forwards chords that have a rule
+        self.keys = frozenset(chord for chord, _ in self.table)
+        # Rules for outside the targets need the key hook while no target is focused
+        self.outside_targets = any(target is None for _, target in self.table)
+        self.last_fired = [-math.inf] * len(self.rules)
+        self.recent = [deque(maxlen=rule.per_minute) if rule.per_minute else None for rule in self.rules]
+        self.fired = 0
+        self.suppressed = 0
+    
+    def fire(self, chord, target):
+        # The rule to apply, or None if there is none or it is cooling down or capped
+        index = self.table.get((chord, target))
+        if index is None:
+            return None
+        rule = self.rules[index]
+        now = self.clock()
+        if now - self.last_fired[index] < rule.cooldown_seconds:
+            self.suppressed += 1
+            return None
+        recent = self.recent[index]
+        if recent is not None:
+            if len(recent) == recent.maxlen and now - recent[0] < 60:
+                self.suppressed += 1
+                return None
+            recent.append(now)
+        self.last_fired[index] = now
+        self.fired += 1
+        return rule
+
+
+class Win32IdleBackend:
+    # Seconds since the last input anywhere on the desktop, keys or mouse, from
+    # GetLastInputInfo. The OS keeps that time itself, so idle detection needs no
+    # hook on keys typed outside the targets.
+    
+    counts_mouse = True
+    
+    def __init__(self):
+        import ctypes
+        from ctypes import wintypes
+        
+        class LASTINPUTINFO(ctypes.Structure):
+            _fields_ = [('cbSize', wintypes.UINT), ('dwTime', wintypes.DWORD)]
+        
+        self._info = LASTINPUTINFO(ctypes.sizeof(LASTINPUTINFO), 0)
+        self._info_ref = ctypes.byref(self._info)
+        self._get_last_input_info = ctypes.windll.user32.GetLastInputInfo
+        self._get_tick_count = ctypes.windll.kernel32.GetTickCount
+        self._get_tick_count.restype = wintypes.DWORD
+    
+    def idle_seconds(self):
+        if not self._get_last_input_info(self._info_ref):
+            return 0.0
+        # Both are 32-bit millisecond tick counts, masking keeps the difference right across the wrap
+        return ((self._get_tick_count() - self._info.dwTime) & 0xFFFFFFFF) / 1000
+
+
+class FakeIdleBackend:
+    # OS idle time for tests, simulations and benchmarks on their own clock. input()
+    # stands in for the user touching whatever counts_mouse says is counted.
+    
+    def __init__(self, clock=time.monotonic, counts_mouse=False):
+        self.clock = clock
+        self.counts_mouse = counts_mouse
+        self.last_input = clock()
+    
+    def input(self, timestamp=None):
+        self.last_input = self.clock() if timestamp is None else timestamp
+    
+    def idle_seconds(self):
+        return max(0.0, self.clock() - self.last_input)
+
+
+def os_idle_backend():
+    # For the real entry points only; simulations pass a FakeIdleBackend on their clock
+    if sys.platform == 'win32':
+        return Win32IdleBackend()
+    return None
+
+
+class IdleDetector:
+    # Idle/active state machine driven by one deadline. Each activity re-arms it for
+    # last activity + timeout, and it fires once when that passes, so there are no
+    # periodic wakeups. The owner provides arm(delay_seconds) and calls on_deadline()
+    # when it expires (a single-shot QTimer in the window, a fake clock in tests).
+    # With an OS idle backend the deadline also asks the OS for the last input, which
+    # covers keys no hook saw. Nothing reports the user coming back then, so while
+    # idle the owner calls poll() from a poll it already runs.
+    
+    def __init__(self, timeout_seconds, arm, clock=time.monotonic, backend=None):
+        self.timeout = timeout_seconds
+        self.arm = arm
+        self.clock = clock
+        self.backend = backend
+        self.idle = False
+        self.last_activity = clock()
+        self.deadline = None
+        self._subscribers = []
+    
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+    
+    def _set_idle(self, idle):
+        self.idle = idle
+        for callback in list(self._subscribers):
+            callback(idle)
+    
+    def _arm(self, delay):
+        self.deadline = self.clock() + delay
+        self.arm(delay)
+    
+    def start(self):
+        self._arm(self.timeout)
+    
+    def idle_time(self):
+        return self.clock() - self.last_activity
+    
+    def on_activity(self, timestamp=None):
+        self.last_activity = max(self.last_activity, self.clock() if timestamp is None else timestamp)
+        if self.idle:
+            self._set_idle(False)
+        # A pending deadline is never later than the new one; when it fires it
+        # re-arms for the rest, so most batches don't touch the timer at all
+        if self.deadline is None:
+            self._arm(max(0.0, self.timeout - self.idle_time()))
+    
+    def _sync(self):
+        if self.backend is not None:
+            self.last_activity = max(self.last_activity, self.clock() - self.backend.idle_seconds())
+    
+    def on_deadline(self):
+        self.deadline = None
+        self._sync()
+        remaining = self.timeout - self.idle_time()
+        if remaining > 0:
+            self._arm(remaining)
+        elif not self.idle:
+            self._set_idle(True)
+    
+    def poll(self):
+        if self.idle and self.backend is not None:
+            self._sync()
+            if self.idle_time() < self.timeout:
+                self.on_activity(self.last_activity)
+    
+    def set_timeout(self, timeout_seconds):
+        self.timeout = timeout_seconds
+        if not self.idle:
+            self.on_deadline()
+
+
+# Latency buckets in seconds, from 50 us to 10 s
+LATENCY_BOUNDS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25,
+                  0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+METRIC_HELP = {
+    'lazy_timer_job_lateness_seconds': "How late scheduled jobs ran after their deadline, tick jitter is job=tick",
+    'lazy_timer_loop_stall_seconds': "Time the loop was blocked running a job",
+    'lazy_timer_focus_poll_seconds': "Foreground window and process query",
+    'lazy_timer_input_delay_seconds': "Keystroke to its handler on the loop, per batch or bound chord",
+    'lazy_timer_sound_latency_seconds': "Sound trigger to its first block written to the output",
+    'lazy_timer_io_seconds': "Settings and state file reads and writes"
+}
+
+
+class Histogram:
+    # Fixed buckets counted in a preallocated array, an observation is a bisect and
+    # an increment. Each histogram has one writer thread; exporters read it from
+    # another and may see an observation half counted, which scrapes tolerate.
+    
+    def __init__(self, bounds=LATENCY_BOUNDS):
+        self.bounds = bounds
+        self.counts = array('Q', bytes(8 * (len(bounds) + 1)))
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+    
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+    
+    def quantile(self, fraction):
+        # Upper bound of the bucket holding the quantile, the maximum for the last one
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+class Metrics:
+    # Histograms by (name, labels) and counters sampled on export. Instrumented code
+    # holds a Metrics or None and checks for None, so with metrics off a hot path
+    # pays for one attribute test.
+    
+    def __init__(self):
+        self.histograms = {}
+        self.counters = []
+    
+    def histogram(self, name, **labels):
+        key = (name, tuple(labels.items()))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms.setdefault(key, Histogram())
+        return histogram
+    
+    def observe(self, name, value, **labels):
+        self.histogram(name, **labels).observe(value)
+    
+    def add_counter(self, name, help_text, read):
+        # read() is called from the exporting thread, so it should only read plain numbers
+        self.counters.append((name, help_text, read))
+    
+    def summary(self):
+        summary = {}
+        for (name, labels), histogram in sorted(self.histograms.items()):
+            label_text = ','.join(f"{key}={value}" for key, value in labels)
+            summary[f"{name}{{{label_text}}}" if labels else name] = {
+                'count': histogram.count,
+                'mean_ms': histogram.sum / histogram.count * 1000 if histogram.count else None,
+                'p50_ms': histogram.quantile(0.5) * 1000 if histogram.count else None,
+                'p99_ms': histogram.quantile(0.99) * 1000 if histogram.count else None,
+                'max_ms': histogram.max * 1000 if histogram.count else None
+            }
+        for name, _, read in self.counters:
+            summary[name] = read()
+        return summary
+    
+    def prometheus_text(self):
+        lines = []
+        described = set()
+        for (name, labels), histogram in sorted(self.histograms.items()):
+            if name not in described:
+                described.add(name)
+                lines.append(f"# HELP {name} {METRIC_HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+            label_text = ''.join(f'{key}="{value}",' for key, value in labels)
+            cumulative = 0
+            for bound, count in zip(histogram.bounds + (math.inf,), histogram.counts):
+                cumulative += count
+                le = '+Inf' if bound == math.inf else repr(bound)
+                lines.append(f'{name}_bucket{{{label_text}le="{le}"}} {cumulative}')
+            plain_labels = f"{{{label_text.rstrip(',')}}}" if labels else ''
+            lines.append(f"{name}_sum{plain_labels} {histogram.sum!r}")
+            lines.append(f"{name}_count{plain_labels} {histogram.count}")
+        for name, help_text, read in self.counters:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name} {read()}")
+        return '\n'.join(lines) + '\n'
+
+
+class MetricsServer:
+    # Serves Metrics.prometheus_text() at http://127.0.0.1:port/metrics from a
+    # daemon thread; http.server is only imported when it is turned on
+    
+    def __init__(self, metrics, port):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(handler):
+                if handler.path.split('?')[0] not in ('/', '/metrics'):
+                    handler.send_error(404)
+                    return
+                body = metrics.prometheus_text().encode()
+                handler.send_response(200)
+                handler.send_header('Content-Type', 'text/plain; version=0.0.4')
+                handler.send_header('Content-Length', str(len(body)))
+                handler.end_headers()
+                handler.wfile.write(body)
+            
+            def log_message(handler, *args):
+                pass
+        
+        self.metrics = metrics
+        self.requested_port = port
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class ControlServerStarter:
+    # Imports and starts lazy_ass_timer_control's ControlServer from a thread, as
+    # asyncio alone takes longer to import than this whole module. The controller
+    # holds this from the first call, so settings applied while the import runs can't
+    # start a second server (whose startup removes the first one's socket), and a
+    # stop before the server exists keeps it from starting.
+    
+    def __init__(self, controller):
+        self.server = None
+        self._stopped = False
+        self._lock = threading.Lock()
+        threading.Thread(target=self._start, args=(controller,), daemon=True).start()
+    
+    def _start(self, controller):
+        from lazy_ass_timer_control import ControlServer
+        with self._lock:
+            if not self._stopped:
+                self.server = ControlServer(controller)
+                self.server.start()
+    
+    def stats(self):
+        if self.server is None:
+            return {'requests': 0, 'evicted': 0, 'broadcasts': 0}
+        return self.server.stats()
+    
+    def stop(self):
+        with self._lock:
+            self._stopped = True
+        if self.server is not None:
+            self.server.stop()
+
+
+class ScheduledJob:
+    __slots__ = ('name', 'callback', 'interval', 'low_power_interval', 'deadline', 'generation', 'runs')
+    
+    def __init__(self, name, callback, interval, low_power_interval):
+        self.name = name
+        self.callback = callback
+        self.interval = interval
+        self.low_power_interval = low_power_interval
+        self.deadline = None
+        self.generation = 0
+        self.runs = 0
+    
+    @property
+    def scheduled(self):
+        return self.deadline is not None
+
+
+class Scheduler:
+    # Owns every timed job in one heap of deadlines and keeps a single OS timer
+    # armed for the earliest of them. The owner provides arm(delay_seconds) and
+    # calls run_due() when it fires. Periodic jobs are aligned to multiples of their
+    # interval so jobs with related intervals share wakeups, and in low-power mode
+    # they run at their low_power_interval instead. Rescheduled or cancelled jobs
+    # leave stale heap entries behind, which are skipped by generation, and the heap
+    # is rebuilt once they outnumber the live ones.
+    
+    def __init__(self, arm, clock=time.monotonic, slack=0.005):
+        self.arm = arm
+        self.clock = clock
+        self.slack = slack
+        self.metrics = None
+        self._job_histograms = {}  # job -> (stall, lateness) of self._histograms_for
+        self._histograms_for = None
+        self.low_power = False
+        self.wakeups = 0
+        self._recent_wakeups = deque()
+        self._heap = []
+        self._stale = 0
+        self._sequence = itertools.count()
+        self._armed_deadline = None
+        self._dispatching = False
+    
+    def add_job(self, name, callback, interval=None, low_power_interval=None):
+        return ScheduledJob(name, callback, interval, low_power_interval)
+    
+    def call_later(self, delay, callback, name=None):
+        job = ScheduledJob(name, callback, None, None)
+        self.schedule(job, delay)
+        return job
+    
+    def call_every(self, interval, callback, low_power_interval=None, name=None):
+        job = ScheduledJob(name, callback, interval, low_power_interval)
+        self.schedule_periodic(job)
+        return job
+    
+    def interval_of(self, job):
+        if self.low_power and job.low_power_interval is not None:
+            return job.low_power_interval
+        return job.interval
+    
+    def schedule_periodic(self, job, after=None):
+        # Next multiple of the interval after now (or after the deadline just served,
+        # which may be slightly ahead of now)
+        interval = self.interval_of(job)
+        now = self.clock()
+        base = now if after is None else max(now, after)
+        self.schedule(job, (math.floor(base / interval + 1e-9) + 1) * interval - now)
+    
+    def schedule(self, job, delay):
+        if job.deadline is not None:
+            self._stale += 1
+        job.generation += 1
+        job.deadline = self.clock() + delay
+        heapq.heappush(self._heap, (job.deadline, next(self._sequence), job.generation, job))
+        if self._stale > 32 and self._stale * 2 > len(self._heap):
+            self._compact()
+        self._rearm()
+    
+    def cancel(self, job):
+        if job.deadline is not None:
+            self._stale += 1
+        job.generation += 1
+        job.deadline = None
+    
+    def _compact(self):
+        # Jobs rescheduled far ahead (the hidden tick, idle deadlines) would otherwise
+        # pile up entries that take hours to reach the top
+        self._heap = [entry for entry in self._heap if entry[2] == entry[3].generation]
+        heapq.heapify(self._heap)
+        self._stale = 0
+    
+    def set_low_power(self, low_power):
+        if low_power == self.low_power:
+            return
+        self.low_power = low_power
+        # Move each periodic job onto its new interval, counted from now
+        jobs = {entry[3] for entry in self._heap if entry[3].scheduled and entry[3].interval is not None}
+        for job in jobs:
+            self.schedule_periodic(job)
+    
+    def run_due(self):
+        now = self.clock()
+        self.wakeups += 1
+        self._recent_wakeups.append(now)
+        while self._recent_wakeups[0] < now - 60:
+            self._recent_wakeups.popleft()
+        self._armed_deadline = None
+        self._dispatching = True
+        # Coarse OS timers may fire a little early, so take anything within slack, but
+        # only if it was queued before this wakeup: a job re-armed for the little time it
+        # has left would otherwise run again and again until the clock catches up
+        horizon = next(self._sequence)
+        try:
+            while self._heap and (self._heap[0][0] <= now
+                                  or (self._heap[0][0] <= now + self.slack and self._heap[0][1] < horizon)):
+                deadline, _, generation, job = heapq.heappop(self._heap)
+                if generation != job.generation:
+                    self._stale -= 1
+                    continue
+                # Requeue periodic jobs before running them, so the callback may reschedule
+                job.deadline = None
+                if job.interval is not None:
+                    self.schedule_periodic(job, after=deadline)
+                job.runs += 1
+                if self.metrics is None:
+                    job.callback()
+                else:
+                    self._run_measured(job, now - deadline)
+        finally:
+            self._dispatching = False
+        self._rearm()
+    
+    def _run_measured(self, job, lateness):
+        # How late the job ran (for the tick, its jitter) and how long it held up the loop
+        if self._histograms_for is not self.metrics:
+            self._histograms_for = self.metrics
+            self._job_histograms = {}
+        histograms = self._job_histograms.get(job)
+        if histograms is None:
+            histograms = self._job_histograms[job] = (
+                self.metrics.histogram('lazy_timer_loop_stall_seconds', job=job.name),
+                self.metrics.histogram('lazy_timer_job_lateness_seconds', job=job.name))
+        started = time.perf_counter()
+        try:
+            job.callback()
+        finally:
+            histograms[0].observe(time.perf_counter() - started)
+            histograms[1].observe(lateness)
+    
+    def _rearm(self):
+        if self._dispatching:
+            return
+        while self._heap and self._heap[0][2] != self._heap[0][3].generation:
+            heapq.heappop(self._heap)
+            self._stale -= 1
+        if not self._heap:
+            return
+        deadline = self._heap[0][0]
+        if deadline != self._armed_deadline:
+            self._armed_deadline = deadline
+            self.arm(max(0.0, deadline - self.clock()))
+    
+    def wakeups_per_minute(self):
+        cutoff = self.clock() - 60
+        while self._recent_wakeups and self._recent_wakeups[0] < cutoff:
+            self._recent_wakeups.popleft()
+        return len(self._recent_wakeups)
+
+
+def write_atomic(path, text):
+    # Write to a temp file next to the target, fsync it and rename it over the
+    # target, so a crash leaves either the old file or the new one, never half of one
+    import tempfile
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path), dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+class StateJournal:
+    # Append-only journal of timer checkpoints, one checksummed JSON record per line.
+    # After compact_after appends it is rewritten atomically down to the latest
+    # record, so recovery never reads more than compact_after lines. A torn or
+    # corrupt line (crash mid-append) is skipped and the last good record wins.
+    
+    def __init__(self, path, compact_after=256):
+        self.path = path
+        self.compact_after = compact_after
+        self.records_since_compaction = 0
+        self._file = None
+    
+    @staticmethod
+    def _encode(record):
+        payload = json.dumps(record, separators=(',', ':'))
+        return f"{zlib.crc32(payload.encode()):08x} {payload}\n"
+    
+    def load(self):
+        last = None
+        lines = 0
+        try:
+            with open(self.path, 'r') as f:
+                for line in f:
+                    lines += 1
+                    checksum, _, payload = line.rstrip('\n').partition(' ')
+                    try:
+                        if int(checksum, 16) == zlib.crc32(payload.encode()):
+                            last = json.loads(payload)
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            pass
+        self.records_since_compaction = lines
+        return last
+    
+    def append(self, record):
+        if self.records_since_compaction >= self.compact_after:
+            self.compact(record)
+            return
+        if self._file is None:
+            self._file = open(self.path, 'a')
+        self._file.write(self._encode(record))
+        # Flushing is enough to survive the process being killed
+        self._file.flush()
+        self.records_since_compaction += 1
+    
+    def compact(self, record):
+        self.close()
+        write_atomic(self.path, self._encode(record))
+        self.records_since_compaction = 1
+    
+    def close(self):
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+
+
+# Activity journal event types
+(ACTIVITY_FOCUS, ACTIVITY_KEYS, ACTIVITY_REWARD, ACTIVITY_IDLE, ACTIVITY_ACTIVE,
+ ACTIVITY_TIMER_START, ACTIVITY_TIMER_STOP, ACTIVITY_TIMER_EXPIRED) = range(1, 9)
+
+# Fixed-width 24 byte record: wall-clock timestamp, event type, interned process id, value
+ACTIVITY_RECORD = struct.Struct('<dBxxxId')
+
+
+@lru_cache(maxsize=None)
+def activity_dtype():
+    # NumPy view of ACTIVITY_RECORD
+    import numpy as np
+    return np.dtype({'names': ['timestamp', 'event', 'process', 'value'],
+                     'formats': ['<f8', 'u1', '<u4', '<f8'],
+                     'offsets': [0, 8, 12, 16], 'itemsize': ACTIVITY_RECORD.size})
+
+
+class ActivityRecorder:
+    # Records activity events into one binary file per day (activity-YYYYMMDD.bin)
+    # plus a shared strings.txt of interned process names, where line n is id n and
+    # id 0 means no process. record() only appends a tuple to a deque; a background
+    # thread interns, packs and writes the records once a second. The deque is bounded,
+    # if the writer can't keep up the oldest records are dropped.
+    
+    def __init__(self, directory, enabled=True, flush_interval=1.0, max_pending=100_000):
+        self.directory = directory
+        self.enabled = enabled
+        self.flush_interval = flush_interval
+        self._pending = deque(maxlen=max_pending)
+        self.write_errors = 0
+        self._string_ids = None
+        self._strings_file = None
+        self._day = None
+        self._day_file = None
+        self._stop = threading.Event()
+        self._thread = None
+        self.set_enabled(enabled)
+    
+    def set_enabled(self, enabled):
+        # The writer thread is started the first time recording is enabled
+        self.enabled = enabled
+        if enabled and self._thread is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+    
+    def record(self, event, value=0.0, process_name=None):
+        if self.enabled:
+            self._pending.append((time.time(), event, process_name, value))
+    
+    def _intern(self, process_name):
+        if not process_name:
+            return 0
+        string_id = self._string_ids.get(process_name)
+        if string_id is None:
+            string_id = self._string_ids[process_name] = len(self._string_ids)
+            self._strings_file.write(process_name + '\n')
+        return string_id
+    
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self._flush()
+        self._flush()
+        self._close_files()
+    
+    def _flush(self):
+        # A failed write (a full disk, a name that can't be encoded) loses the records
+        # being written; the files are reopened on the next flush, re-reading the
+        # string ids from what actually made it to disk. Reported once per failing streak.
+        try:
+            self._write_pending()
+        except Exception as e:
+            if not self.write_errors:
+                print(f"Error writing activity: {e}")
+            self.write_errors += 1
+            self._close_files()
+        else:
+            self.write_errors = 0
+    
+    def _open_strings(self):
+        strings = ActivityLog(self.directory).strings()
+        self._string_ids = {name: index for index, name in enumerate(strings)}
+        self._strings_file = open(os.path.join(self.directory, 'strings.txt'), 'a', encoding='utf-8')
+        if not strings:
+            self._strings_file.write('\n')
+            self._string_ids[''] = 0
+    
+    def _close_files(self):
+        for f in (self._strings_file, self._day_file):
+            if f is not None:
+                try:
+                    f.close()
+                except OSError as e:
+                    print(f"Error closing activity file: {e}")
+        self._strings_file = self._day_file = self._day = self._string_ids = None
+    
+    def _write_pending(self):
+        if not self._pending:
+            return
+        if self._strings_file is None:
+            self._open_strings()
+        buffer = bytearray()
+        while self._pending:
+            timestamp, event, process_name, value = self._pending.popleft()
+            day = date.fromtimestamp(timestamp)
+            if day != self._day:
+                self._write(buffer)
+                buffer = bytearray()
+                self._rotate(day)
+            buffer += ACTIVITY_RECORD.pack(timestamp, event, self._intern(process_name), value)
+        self._write(buffer)
+        # Strings first, so a reader never sees an id it can't resolve
+        self._strings_file.flush()
+        self._day_file.flush()
+    
+    def _write(self, buffer):
+        if buffer:
+            self._strings_file.flush()
+            self._day_file.write(buffer)
+    
+    def _rotate(self, day):
+        if self._day_file is not None:
+            self._day_file.close()
+        self._day = day
+        self._day_file = open(ActivityLog(self.directory).day_path(day), 'ab')
+    
+    def close(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+class ActivityLog:
+    # Reads the activity journal. Day files are memory-mapped, so the columns of
+    # read_day() are zero-copy views into the file.
+    
+    def __init__(self, directory):
+        self.directory = directory
+    
+    def day_path(self, day):
+        return os.path.join(self.directory, f"activity-{day:%Y%m%d}.bin")
+    
+    def days(self):
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(datetime.strptime(name[9:17], '%Y%m%d').date()
+                      for name in names if name.startswith('activity-') and name.endswith('.bin'))
+    
+    def strings(self):
+        try:
+            with open(os.path.join(self.directory, 'strings.txt'), 'r', encoding='utf-8') as f:
+                return f.read().split('\n')[:-1]
+        except FileNotFoundError:
+            return []
+    
+    def read_day(self, day):
+        import numpy as np
+        path = self.day_path(day)
+        # Ignore a partially written trailing record
+        count = os.path.getsize(path) // ACTIVITY_RECORD.size
+        if count == 0:
+            return np.zeros(0, activity_dtype())
+        return np.memmap(path, dtype=activity_dtype(), mode='r', shape=(count,))
+
+
+RATE_HISTOGRAM_SIZE = 1001  # keystrokes per minute, the last bin collects everything above
+
+
+class DayAccumulator:
+    # Streams one day of activity records through in chunks, keeping only running
+    # totals and the state at the end of the previous chunk, so memory stays flat
+    # however many records the day has. Time between two consecutive records is
+    # credited to the focus/idle state after the first one; gaps longer than
+    # max_gap (sleep, crash) are not counted.
+    
+    def __init__(self, day, string_count, max_gap=300):
+        import numpy as np
+        self.day_start = datetime(day.year, day.month, day.day).timestamp()
+        self.max_gap = max_gap
+        self.process_seconds = np.zeros(string_count, np.float64)
+        self.minute_keys = np.zeros(24 * 60 + 60, np.float64)  # room for DST days
+        self.focused_seconds = 0.0
+        self.rewards = 0
+        self.reward_seconds = 0.0
+        self.idle_pauses = 0
+        self.longest_streak = 0.0
+        self._last_time = None
+        self._process = 0
+        self._target = False
+        self._idle = False
+        self._streak = 0.0
+    
+    @staticmethod
+    def _forward_fill(mask, values, initial):
+        # Value of the most recent masked record at each position, initial before the first
+        import numpy as np
+        index = np.where(mask, np.arange(len(mask)), -1)
+        np.maximum.accumulate(index, out=index)
+        return np.where(index >= 0, values[np.maximum(index, 0)], initial)
+    
+    def add(self, records):
+        if len(records) == 0:
+            return
+        import numpy as np
+        timestamps = np.asarray(records['timestamp'])
+        events = np.asarray(records['event'])
+        values = np.asarray(records['value'])
+        
+        # State after each record
+        focus = events == ACTIVITY_FOCUS
+        processes = self._forward_fill(focus, records['process'], self._process)
+        targets = self._forward_fill(focus, values > 0, self._target)
+        idle_events = (events == ACTIVITY_IDLE) | (events == ACTIVITY_ACTIVE)
+        idle = self._forward_fill(idle_events, events == ACTIVITY_IDLE, self._idle)
+        
+        # Segment i runs from the previous record to record i, in the state before record i
+        previous_time = timestamps[0] if self._last_time is None else self._last_time
+        durations = np.diff(timestamps, prepend=previous_time)
+        durations[(durations > self.max_gap) | (durations < 0)] = 0
+        segment_processes = np.concatenate(([self._process], processes[:-1]))
+        segment_active = ~np.concatenate(([self._idle], idle[:-1]))
+        segment_focused = np.concatenate(([self._target], targets[:-1])) & segment_active
+        
+        active_durations = np.where(segment_active, durations, 0)
+        self.process_seconds += np.bincount(segment_processes, weights=active_durations,
+                                            minlength=len(self.process_seconds))[:len(self.process_seconds)]
+        self.focused_seconds += float(durations[segment_focused].sum())
+        
+        rewards = events == ACTIVITY_REWARD
+        self.rewards += int(rewards.sum())
+        self.reward_seconds += float(values[rewards].sum())
+        self.idle_pauses += int((events == ACTIVITY_IDLE).sum())
+        
+        keys = events == ACTIVITY_KEYS
+        minutes = ((timestamps[keys] - self.day_start) // 60).astype(np.intp)
+        np.clip(minutes, 0, len(self.minute_keys) - 1, out=minutes)
+        self.minute_keys += np.bincount(minutes, weights=values[keys], minlength=len(self.minute_keys))
+        
+        # Focused streaks: total focused time per run of consecutive focused segments,
+        # with the run still open at the end of the last chunk carried into the first
+        run_ids = np.concatenate(([0], np.cumsum(segment_focused[1:] != segment_focused[:-1])))
+        run_totals = np.bincount(run_ids, weights=np.where(segment_focused, durations, 0))
+        if segment_focused[0]:
+            run_totals[0] += self._streak
+        self.longest_streak = max(self.longest_streak, float(run_totals.max()))
+        self._streak = float(run_totals[-1]) if segment_focused[-1] else 0.0
+        
+        self._last_time = float(timestamps[-1])
+        self._process = int(processes[-1])
+        self._target = bool(targets[-1])
+        self._idle = bool(idle[-1])
+    
+    def rollup(self, strings):
+        import numpy as np
+        active_minutes = self.minute_keys[self.minute_keys > 0]
+        histogram = np.bincount(np.minimum(active_minutes, RATE_HISTOGRAM_SIZE - 1).astype(np.intp),
+                                minlength=RATE_HISTOGRAM_SIZE)
+        return {
+            'focused_seconds': self.focused_seconds,
+            'process_seconds': {strings[index] if index < len(strings) else f"#{index}": float(seconds)
+                                for index, seconds in enumerate(self.process_seconds) if seconds > 0 and index},
+            'rewards': self.rewards,
+            'reward_seconds': self.reward_seconds,
+            'idle_pauses': self.idle_pauses,
+            'keys': float(self.minute_keys.sum()),
+            'rate_histogram': histogram.tolist(),
+            'longest_streak_seconds': self.longest_streak
+        }
+
+
+class ActivityReport:
+    # Builds per-day rollups from the activity journal. Rollups of finished days are
+    # cached as JSON next to the journal (keyed by the day file's size), so repeated
+    # reports over old data only read the cache.
+    
+    def __init__(self, log, chunk_size=1 << 20, use_cache=True):
+        self.log = log
+        self.chunk_size = chunk_size
+        self.use_cache = use_cache
+        self.cache_directory = os.path.join(log.directory, 'rollups')
+    
+    def day_rollup(self, day, strings):
+        size = os.path.getsize(self.log.day_path(day))
+        cache_path = os.path.join(self.cache_directory, f"{day:%Y%m%d}.json")
+        if self.use_cache and day < date.today():
+            try:
+                with open(cache_path, 'r') as f:
+                    cached = json.load(f)
+                if cached['source_size'] == size:
+                    return cached
+            except (OSError, ValueError, KeyError):
+                pass
+        
+        records = self.log.read_day(day)
+        accumulator = DayAccumulator(day, len(strings))
+        for start in range(0, len(records), self.chunk_size):
+            accumulator.add(records[start:start + self.chunk_size])
+        rollup = accumulator.rollup(strings)
+        rollup['day'] = day.isoformat()
+        rollup['source_size'] = size
+        
+        if self.use_cache and day < date.today():
+            try:
+                os.makedirs(self.cache_directory, exist_ok=True)
+                write_atomic(cache_path, json.dumps(rollup))
+            except OSError as e:
+                print(f"Error caching rollup: {e}")
+        return rollup
+    
+    def rollups(self, first_day=None, last_day=None):
+        strings = self.log.strings()
+        return [self.day_rollup(day, strings) for day in self.log.days()
+                if (first_day is None or day >= first_day) and (last_day is None or day <= last_day)]
+    
+    @staticmethod
+    def totals(rollups):
+        import numpy as np
+        histogram = np.zeros(RATE_HISTOGRAM_SIZE, np.int64)
+        process_seconds = {}
+        for rollup in rollups:
+            histogram += rollup['rate_histogram']
+            for name, seconds in rollup['process_seconds'].items():
+                process_seconds[name] = process_seconds.get(name, 0.0) + seconds
+        
+        percentiles = {}
+        if histogram.sum():
+            cumulative = np.cumsum(histogram) / histogram.sum()
+            for percentile in (50, 90, 99):
+                percentiles[percentile] = int(np.searchsorted(cumulative, percentile / 100))
+        return {
+            'focused_seconds': sum(rollup['focused_seconds'] for rollup in rollups),
+            'process_seconds': process_seconds,
+            'rewards': sum(rollup['rewards'] for rollup in rollups),
+            'reward_seconds': sum(rollup['reward_seconds'] for rollup in rollups),
+            'idle_pauses': sum(rollup['idle_pauses'] for rollup in rollups),
+            'keys': sum(rollup['keys'] for rollup in rollups),
+            'rate_percentiles': percentiles,
+            'longest_streak_seconds': max((rollup['longest_streak_seconds'] for rollup in rollups), default=0.0)
+        }
+
+
+def format_duration(seconds):
+    return str(timedelta(seconds=int(seconds)))
+
+
+def report_main(argv):
+    import argparse
+    parser = argparse.ArgumentParser(prog='lazy_ass_timer report', description="Summarize recorded activity")
+    parser.add_argument('--days', type=int, default=7, help="number of days to include, counting back from today")
+    parser.add_argument('--since', type=date.fromisoformat, help="first day to include (YYYY-MM-DD), overrides --days")
+    parser.add_argument('--until', type=date.fromisoformat, help="last day to include (YYYY-MM-DD)")
+    parser.add_argument('--top', type=int, default=10, help="number of processes to list")
+    parser.add_argument('--no-cache', action='store_true', help="recompute daily rollups")
+    parser.add_argument('--json', action='store_true', help="print the rollups and totals as JSON")
+    parser.add_argument('--dir', default=os.path.join(os.path.expanduser("~"), "pycharm_timer_activity"))
+    args = parser.parse_args(argv)
+    
+    first_day = args.since or date.today() - timedelta(days=args.days - 1)
+    report = ActivityReport(ActivityLog(args.dir), use_cache=not args.no_cache)
+    rollups = report.rollups(first_day, args.until)
+    totals = report.totals(rollups)
+    if args.json:
+        print(json.dumps({'days': rollups, 'totals': totals}, indent=4))
+        return 0
+    if not rollups:
+        print(f"No activity recorded since {first_day}")
+        return 0
+    
+    print(f"{'Day':<12}{'Focused':>10}{'Rewards':>9}{'Idle':>6}{'Keys':>12}{'Streak':>10}")
+    for rollup in rollups:
+        print(f"{rollup['day']:<12}{format_duration(rollup['focused_seconds']):>10}{rollup['rewards']:>9}"
+              f"{rollup['idle_pauses']:>6}{int(rollup['keys']):>12}{format_duration(rollup['longest_streak_seconds']):>10}")
+    print()
+    print(f"Focused: {format_duration(totals['focused_seconds'])}, "
+          f"rewards: {totals['rewards']} ({format_duration(totals['reward_seconds'])}), "
+          f"idle pauses: {totals['idle_pauses']}, "
+          f"longest streak: {format_duration(totals['longest_streak_seconds'])}")
+    if totals['rate_percentiles']:
+        print("Keys per active minute: " + ", ".join(
+            f"p{percentile} {value}" for percentile, value in totals['rate_percentiles'].items()))
+    print()
+    print("Time per process:")
+    for name, seconds in sorted(totals['process_seconds'].items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {name:<30}{format_duration(seconds):>10}")
+    return 0
+
+
+class HeadlessLoop:
+    # Event loop for --headless: a single timer deadline (armed by the Scheduler) plus
+    # callbacks posted from the hook threads, run in order on the thread calling run()
+    
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.on_timer = None
+        self._deadline = None
+        self._posted = deque()
+        self._condition = threading.Condition()
+        self._running = False
+    
+    def arm(self, delay):
+        with self._condition:
+            self._deadline = self.clock() + delay
+            self._condition.notify()
+    
+    def post(self, callback):
+        with self._condition:
+            self._posted.append(callback)
+            self._condition.notify()
+    
+    def run(self):
+        self._running = True
+        while True:
+            with self._condition:
+                while self._running and not self._posted and not self._due():
+                    timeout = None if self._deadline is None else self._deadline - self.clock()
+                    self._condition.wait(timeout)
+                if not self._running:
+                    break
+                posted = list(self._posted)
+                self._posted.clear()
+                due = self._due()
+                if due:
+                    self._deadline = None
+            for callback in posted:
+                callback()
+            if due and self.on_timer is not None:
+                self.on_timer()
+    
+    def _due(self):
+        return self._deadline is not None and self.clock() >= self._deadline
+    
+    def stop(self):
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+
+
+DEFAULT_SETTINGS = {
+    'targets': [TargetRule('pycharm64.exe', 'exact', 0, 1.0)._asdict()],
+    'default_timer_seconds': 3 * 60 * 60,  # 3 hours
+    'enter_shortcut_seconds': 20,  # 20 seconds
+    'reward_rules': [],  # RewardRule fields, e.g. {"keys": "ctrl+s", "seconds": 5, "cooldown_seconds": 30}
+    'timers': [],  # extra TimerSpec fields, e.g. {"name": "Break", "seconds": 300, "count": "away"}
+    'idle_timeout_seconds': 3 * 60,  # 3 minutes
+    'min_typing_rate': 0,  # keys per minute needed for the countdown to run, 0 to count whenever focused
+    'typing_rate_window': 60,  # seconds, one of TYPING_RATE_WINDOWS
+    'enable_sounds': True,
+    'display_color': '#0078d7',  # Default blue color
+    'enter_sound_path': r"assets\pop noise.mp3",
+    'idle_sound_path': r"assets\keh noise.mp3",
+    'time_up_sound_path': r"assets\fnaf.mp3",
+    'max_sound_voices': 6,
+    'input_batch_hz': 4,
+    'count_mouse_activity': False,
+    'hook_keys_only_in_targets': True,  # keys typed elsewhere aren't hooked while the OS idle time can be used
+    'include_child_processes': False,
+    'record_activity': True,
+    'control_server': True,
+    'control_port': 47631,  # only used where there are no Unix sockets
+    'collect_metrics': False,  # latency histograms, see Metrics
+    'metrics_port': 0  # Prometheus endpoint on 127.0.0.1 while collecting, 0 for none
+}
+
+SOUND_PATH_KEYS = ('enter_sound_path', 'idle_sound_path', 'time_up_sound_path')
+
+
+def read_settings(settings_file):
+    with open(settings_file, 'r') as f:
+        loaded_settings = json.load(f)
+    if not isinstance(loaded_settings, dict):
+        raise ValueError("settings must be a JSON object")
+    # Older versions had a single exact target
+    if 'targets' not in loaded_settings and 'target_process_name' in loaded_settings:
+        loaded_settings['targets'] = [
+            TargetRule(loaded_settings.pop('target_process_name'), 'exact', 0, 1.0)._asdict()]
+    return loaded_settings
+
+
+def load_settings(settings_file):
+    try:
+        if os.path.exists(settings_file):
+            loaded_settings = read_settings(settings_file)
+            # Make sure all default settings exist, add any missing ones
+            for key, value in DEFAULT_SETTINGS.items():
+                if key not in loaded_settings:
+                    loaded_settings[key] = value
+            return loaded_settings
+        else:
+            return DEFAULT_SETTINGS.copy()
+    except Exception as e:
+        print(f"Error loading settings: {e}")
+        return DEFAULT_SETTINGS.copy()
+
+
+def setting_number(kind, low, high):
+    def check(value):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"expected a number, got {value!r}")
+        if kind is int and value != int(value):
+            raise ValueError(f"expected a whole number, got {value!r}")
+        if not low <= value <= high:
+            raise ValueError(f"{value!r} is outside {low}..{high}")
+        return kind(value)
+    # Editors read the range off the check, so they accept exactly what loads
+    check.low, check.high = low, high
+    return check
+
+
+def setting_bool(value):
+    if not isinstance(value, bool):
+        raise ValueError(f"expected true or false, got {value!r}")
+    return value
+
+
+def setting_str(value):
+    if not isinstance(value, str):
+        raise ValueError(f"expected a string, got {value!r}")
+    return value
+
+
+def setting_choice(*choices):
+    def check(value):
+        if isinstance(value, bool) or value not in choices:
+            raise ValueError(f"expected one of {', '.join(map(str, choices))}, got {value!r}")
+        return choices[choices.index(value)]
+    return check
+
+
+def setting_color(value):
+    if not re.fullmatch(r'#[0-9a-fA-F]{6}', setting_str(value)):
+        raise ValueError(f"expected a #rrggbb color, got {value!r}")
+    return value
+
+
+def setting_targets(value):
+    if not isinstance(value, list) or not value:
+        raise ValueError("expected a non-empty list of targets")
+    rules = []
+    for rule in value:
+        rule = TargetRule(**rule)
+        if rule.kind not in ('exact', 'glob', 'regex'):
+            raise ValueError(f"unknown target kind {rule.kind!r}")
+        setting_number(float, 0, 1e9)(rule.budget_seconds)
+        if setting_number(float, 0, 1e6)(rule.weight) <= 0:
+            raise ValueError("target weights must be positive")
+        rules.append(rule)
+    # Compiling the matcher checks the patterns
+    TargetMatcher(rules)
+    return tuple(rules)
+
+
+def setting_reward_rules(value):
+    if not isinstance(value, list):
+        raise ValueError("expected a list of reward rules")
+    rules = []
+    for rule in value:
+        rule = RewardRule(**rule)
+        parse_key_chord(setting_str(rule.keys))
+        if rule.target is not None:
+            setting_str(rule.target)
+        setting_number(float, -3600, 3600)(rule.seconds)
+        setting_number(float, 0, 24 * 3600)(rule.cooldown_seconds)
+        setting_number(int, 0, 10000)(rule.per_minute)
+        rules.append(rule)
+    return tuple(rules)
+
+
+def setting_timers(value):
+    if not isinstance(value, list):
+        raise ValueError("expected a list of timers")
+    specs = []
+    for spec in value:
+        spec = TimerSpec(**spec)
+        if not setting_str(spec.name).strip() or spec.name in [other.name for other in specs]:
+            raise ValueError(f"timer names must be unique and not empty, got {spec.name!r}")
+        if spec.time_up_sound_path is not None:
+            setting_str(spec.time_up_sound_path)
+        specs.append(spec._replace(seconds=setting_number(int, 1, 100 * 3600)(spec.seconds),
+                                   count=setting_choice(*TIMER_COUNT_MODES)(spec.count),
+                                   targets=setting_targets(spec.targets) if spec.targets is not None else None,
+                                   repeat=setting_bool(spec.repeat)))
+    return tuple(specs)
+
+
+SETTING_CHECKS = {
+    'targets': setting_targets,
+    'default_timer_seconds': setting_number(int, 0, 100 * 3600),
+    'enter_shortcut_seconds': setting_number(int, 0, 3600),
+    'reward_rules': setting_reward_rules,
+    'timers': setting_timers,
+    'idle_timeout_seconds': setting_number(int, 1, 24 * 3600),
+    'min_typing_rate': setting_number(float, 0, 1000),
+    'typing_rate_window': setting_choice(*TYPING_RATE_WINDOWS),
+    'enable_sounds': setting_bool,
+    'display_color': setting_color,
+    'enter_sound_path': setting_str,
+    'idle_sound_path': setting_str,
+    'time_up_sound_path': setting_str,
+    'max_sound_voices': setting_number(int, 1, 64),
+    'input_batch_hz': setting_number(float, 0.5, 100),
+    'count_mouse_activity': setting_bool,
+    'hook_keys_only_in_targets': setting_bool,
+    'include_child_processes': setting_bool,
+    'record_activity': setting_bool,
+    'control_server': setting_bool,
+    'control_port': setting_number(int, 0, 65535),
+    'collect_metrics': setting_bool,
+    'metrics_port': setting_number(int, 0, 65535)
+}
+
+
+class SettingsSnapshot:
+    # Validated, immutable settings. Built once per load and swapped in whole, so hot
+    # paths read plain attributes and never a mix of two versions.
+    __slots__ = tuple(DEFAULT_SETTINGS)
+    
+    def __init__(self, raw):
+        for key in self.__slots__:
+            try:
+                object.__setattr__(self, key, SETTING_CHECKS[key](raw.get(key, DEFAULT_SETTINGS[key])))
+            except (TypeError, ValueError, re.error) as e:
+                raise ValueError(f"{key}: {e}") from None
+        # Reward rules name targets, so they are checked against this snapshot's
+        try:
+            RewardTable(self.reward_rules, self.targets)
+        except ValueError as e:
+            raise ValueError(f"reward_rules: {e}") from None
+    
+    def __setattr__(self, key, value):
+        raise AttributeError("settings snapshots are read-only")
+    
+    def __eq__(self, other):
+        return isinstance(other, SettingsSnapshot) and self.as_dict() == other.as_dict()
+    
+    def as_dict(self):
+        settings = {key: getattr(self, key) for key in self.__slots__}
+        settings['targets'] = [rule._asdict() for rule in self.targets]
+        settings['reward_rules'] = [rule._asdict() for rule in self.reward_rules]
+        settings['timers'] = [spec._replace(targets=[rule._asdict() for rule in spec.targets] if spec.targets else None)
+                              ._asdict() for spec in self.timers]
+        return settings
+
+
+class SettingsWatcher:
+    # Watches the settings file from a background thread and hands every changed,
+    # valid version to on_change as a SettingsSnapshot. Uses inotify on the file's
+    # directory (write_atomic replaces the file, so watching the file itself would
+    # lose it after the first save), and polls os.stat where inotify isn't available.
+    IN_CLOSE_WRITE, IN_MOVED_TO, IN_CREATE, IN_DELETE = 0x8, 0x80, 0x100, 0x200
+    
+    def __init__(self, path, on_change, poll_interval=1.0, debounce=0.02, use_inotify=True):
+        self.path = os.path.abspath(path)
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.use_inotify = use_inotify
+        self.backend = None
+        self.reloads = 0
+        self.failures = 0
+        self.last_error = None
+        self.latencies = deque(maxlen=256)  # change seen -> snapshot handed over
+        self.metrics = None
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+    
+    def _run(self):
+        fd = self._open_inotify() if self.use_inotify else None
+        if fd is None:
+            self.backend = 'poll'
+            self._poll()
+        else:
+            self.backend = 'inotify'
+            try:
+                self._watch(fd)
+            finally:
+                os.close(fd)
+    
+    def _open_inotify(self):
+        if not sys.platform.startswith('linux'):
+            return None
+        try:
+            import ctypes
+            libc = ctypes.CDLL(None, use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd < 0:
+                return None
+            mask = self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE | self.IN_DELETE
+            if libc.inotify_add_watch(fd, os.path.dirname(self.path).encode(), mask) < 0:
+                os.close(fd)
+                return None
+            return fd
+        except (OSError, AttributeError):
+            return None
+    
+    def _watch(self, fd):
+        import select
+        name = os.path.basename(self.path).encode()
+        header = struct.Struct('iIII')
+        while not self._stop.is_set():
+            if not select.select([fd], [], [], 0.5)[0]:
+                continue
+            seen = None
+            # A save is several events (create, write, rename), wait for the burst to end
+            while select.select([fd], [], [], self.debounce)[0]:
+                data = os.read(fd, 65536)
+                offset = 0
+                while offset < len(data):
+                    _, mask, _, length = header.unpack_from(data, offset)
+                    event_name = data[offset + header.size:offset + header.size + length].rstrip(b'\0')
+                    offset += header.size + length
+                    if event_name == name and seen is None:
+                        seen = time.monotonic()
+            if seen is not None:
+                self.reload(seen)
+    
+    def _poll(self):
+        last = self._stat()
+        while not self._stop.wait(self.poll_interval):
+            current = self._stat()
+            if current != last:
+                last = current
+                self.reload(time.monotonic())
+    
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+            return stat.st_mtime_ns, stat.st_size, stat.st_ino
+        except OSError:
+            return None
+    
+    def reload(self, seen=None):
+        # Parsed and validated here, off the timer's loop
+        seen = seen or time.monotonic()
+        started = time.perf_counter()
+        try:
+            snapshot = SettingsSnapshot(read_settings(self.path))
+            if self.metrics is not None:
+                self.metrics.observe('lazy_timer_io_seconds', time.perf_counter() - started, op='settings_load')
+        except Exception as e:
+            self.failures += 1
+            self.last_error = str(e)
+            print(f"Error reloading settings: {e}")
+            return
+        self.reloads += 1
+        self.on_change(snapshot, seen)
+    
+    def stats(self):
+        latencies = sorted(self.latencies)
+        return {
+            'backend': self.backend,
+            'reloads': self.reloads,
+            'failures': self.failures,
+            'last_error': self.last_error,
+            'latency_p50_ms': round(latencies[len(latencies) // 2] * 1000, 2) if latencies else None,
+            'latency_max_ms': round(latencies[-1] * 1000, 2) if latencies else None
+        }
+
+
+class TimerController:
+    # Everything the timer does apart from drawing it: countdown, focus tracking, idle
+    # detection, rewards, sounds and persistence. It runs on any loop with arm(delay),
+    # post(callback) and an on_timer attribute (QtLoop in the GUI, HeadlessLoop for
+    # --headless) and tells subscribers whenever the published state changes.
+    # The I/O pieces can be swapped for fakes.
+    
+    # clock, config, persist, sound_player and activity exist for simulations, which run
+    # the controller on a virtual clock without touching any files.
+    def __init__(self, loop, home=None, settings_file=None, focus_provider=None, input_backend=None,
+                 audio_sink=None, process_table=None, config=None, clock=time.monotonic, persist=True,
+                 sound_player=None, activity=None, idle_backend=None):
+        self.loop = loop
+        self.clock = clock
+        self.persist = persist
+        self.home = home or os.path.expanduser("~")
+        self.listeners = []
+        self.view_visible = False
+        self.view_renderer = None  # set by the GUI, has renders and repaints counters
+        
+        # Load settings from file, every later change to the file is applied live. A file
+        # that fails to load runs on the defaults but is never overwritten with them.
+        self.settings_file = settings_file or os.path.join(self.home, "pycharm_timer_settings.json")
+        self.settings_error = None
+        try:
+            self.config = config or SettingsSnapshot(load_settings(self.settings_file))
+        except ValueError as e:
+            print(f"Error loading settings: {e}")
+            self.settings_error = str(e)
+            self.config = SettingsSnapshot(DEFAULT_SETTINGS)
+        self.settings_watcher = SettingsWatcher(
+            self.settings_file, lambda config, seen: loop.post(lambda: self.apply_config(config, seen)))
+        
+        # Sound player, decodes the configured sounds in the background. With sounds
+        # off only the time's up sound plays, and it is decoded on first use.
+        self.sound_player = sound_player or SoundPlayer(sink=audio_sink, max_voices=self.config.max_sound_voices)
+        if self.config.enable_sounds:
+            self.sound_player.preload(getattr(self.config, key) for key in SOUND_PATH_KEYS)
+        
+        # Timer state, views only sample the engine for display
+        self.target_matcher = TargetMatcher(self.target_rules())
+        engine_clock = time.monotonic_ns if clock is time.monotonic else lambda: round(clock() * 1_000_000_000)
+        self.engine = TimerEngine(self.config.default_timer_seconds, self.target_matcher.rules, engine_clock)
+        self.status_message = f"{self.target_label()} isn't focused"
+        
+        # Activity journal, written from a background thread
+        self.activity = activity or ActivityRecorder(os.path.join(self.home, "pycharm_timer_activity"),
+                                                     enabled=self.config.record_activity)
+        
+        # Every timed job runs off this scheduler and the loop's one timer
+        self.scheduler = Scheduler(loop.arm, clock)
+        loop.on_timer = self.scheduler.run_due
+        
+        # Reward rules, one dict lookup per bound keystroke
+        self.rewards = self.compile_rewards()
+        
+        # Keyboard monitor, chords with a reward rule are posted to the loop thread right away
+        mouse_backend = MouseHookBackend() if self.config.count_mouse_activity else None
+        self.keyboard_monitor = KeyboardMonitor(input_backend, mouse_backend, on_chord=self.on_key_chord,
+                                                on_batch=self.on_input_batch, post=loop.post,
+                                                bound_keys=self.rewards.keys)
+        
+        # Hands keystroke batches to the loop thread
+        self.input_job = self.scheduler.call_every(1 / self.config.input_batch_hz, self.keyboard_monitor.flush,
+                                                   low_power_interval=1, name='input')
+        
+        # Focus tracking, every caller reads self.focus_provider.current
+        self.process_table = process_table or PsutilProcessTable()
+        self.focus_provider = focus_provider or Win32FocusProvider(ProcessNameCache(self.process_table))
+        self.name_cache = getattr(self.focus_provider, 'name_cache', None) or ProcessNameCache(self.process_table)
+        self.ancestry = AncestryCache(self.process_table)
+        self.tree_matcher = ProcessTreeMatcher(self.target_matcher, self.ancestry, self.name_cache)
+        self.focus_provider.subscribe(self.on_focus_changed)
+        
+        # Keeps the ancestry cache current while child processes count as the target
+        self.process_tree_job = self.scheduler.call_every(30, self.sync_process_tree, low_power_interval=120,
+                                                          name='process_tree')
+        
+        # Window focus checker, every second (every 2 while unseen or paused)
+        self.focus_job = self.scheduler.call_every(1, self.check_target_focus, low_power_interval=2, name='focus')
+        
+        # Idle detection, a single deadline re-armed by each activity batch. The OS idle
+        # time also covers keys typed while the key hook is off, see update_key_hook.
+        self.auto_paused = False
+        self.idle_alerted = False
+        self.idle_job = self.scheduler.add_job('idle', None)
+        self.idle_backend = idle_backend
+        self.idle_detector = IdleDetector(self.config.idle_timeout_seconds,
+                                          lambda delay: self.scheduler.schedule(self.idle_job, delay), clock,
+                                          backend=self.idle_source())
+        self.idle_job.callback = self.idle_detector.on_deadline
+        self.idle_detector.subscribe(self.on_idle_changed)
+        
+        # Typing rate, and the optional gate that only lets the countdown run while typing
+        self.typing_meter = TypingRateMeter(clock=clock)
+        self.shown_typing_rate = None
+        self.gate_job = self.scheduler.add_job('typing_gate', self.update_typing_gate)
+        
+        # Main tick, only scheduled while the timer runs, see schedule_tick
+        self.tick_job = self.scheduler.add_job('tick', self.update_timer, interval=1, low_power_interval=5)
+        self.status_job = self.scheduler.add_job('status', self.restore_status_message)
+        
+        # Extra named timers on the same focus and keyboard source, see NamedTimer
+        self.timers = []
+        self.build_timers()
+        
+        # Persistence, settings writes and state checkpoints are both debounced
+        self.settings_save_job = self.scheduler.add_job('save_settings', self.save_settings)
+        self.checkpoint_job = self.scheduler.add_job('checkpoint', self.checkpoint_state)
+        self.periodic_checkpoint_job = self.scheduler.call_every(15, self.checkpoint_state, name='periodic_checkpoint')
+        self.state_journal = StateJournal(os.path.join(self.home, "pycharm_timer_state.journal")) if persist else None
+        self.last_checkpoint = None
+        
+        # Local control socket for scripts and plugins, see lazy_ass_timer_control
+        self.control_server = None
+        
+        # Hot-path instrumentation, only while collect_metrics is on
+        self.metrics = None
+        self.metrics_server = None
+    
+    def start(self):
+        # Subscribe views first, restoring a running session publishes right away
+        if self.config.control_server:
+            self.start_control_server()
+        if self.persist:
+            self.settings_watcher.start()
+        self.update_metrics()
+        self.keyboard_monitor.start_monitoring()
+        self.update_key_hook()
+        self.idle_detector.start()
+        self.update_typing_gate()
+        self.update_power_mode()
+        self.restore_state()
+        self.check_target_focus()
+        self.publish_state()
+    
+    def start_control_server(self):
+        self.control_server = ControlServerStarter(self)
+    
+    def update_metrics(self):
+        # Hands one Metrics (or None) to every instrumented piece and keeps the
+        # Prometheus endpoint in line with the settings
+        if self.config.collect_metrics and self.metrics is None:
+            self.metrics = Metrics()
+            worker = getattr(self.sound_player, 'worker', None)
+            self.metrics.add_counter('lazy_timer_wakeups_total', "Scheduler wakeups", lambda: self.scheduler.wakeups)
+            self.metrics.add_counter('lazy_timer_rewards_total', "Reward rules applied", lambda: self.rewards.fired)
+            self.metrics.add_counter('lazy_timer_rewards_suppressed_total', "Reward keys held back by a cooldown or cap",
+                                     lambda: self.rewards.suppressed)
+            if worker is not None:
+                self.metrics.add_counter('lazy_timer_sounds_dropped_total', "Sounds over the voice limit or queue",
+                                         lambda: worker.dropped + worker.rejected)
+            renderer = self.view_renderer
+            if renderer is not None:
+                self.metrics.add_counter('lazy_timer_view_renders_total', "State snapshots rendered by the window",
+                                         lambda: renderer.renders)
+                self.metrics.add_counter('lazy_timer_view_repaints_total', "Widget updates made by the window",
+                                         lambda: renderer.repaints)
+        elif not self.config.collect_metrics:
+            self.metrics = None
+        self.scheduler.metrics = self.metrics
+        self.settings_watcher.metrics = self.metrics
+        if hasattr(self.sound_player, 'worker'):
+            self.sound_player.worker.metrics = self.metrics
+        
+        port = self.config.metrics_port if self.metrics is not None else 0
+        server = self.metrics_server
+        if server is not None and (server.metrics is not self.metrics or server.requested_port != port):
+            server.stop()
+            self.metrics_server = None
+        if port and self.metrics_server is None:
+            try:
+                self.metrics_server = MetricsServer(self.metrics, port)
+            except OSError as e:
+                print(f"Error starting metrics endpoint: {e}")
+    
+    def stats(self):
+        # For --stats: the counters that are always kept, and the histograms when collected
+        worker = getattr(self.sound_player, 'worker', None)
+        jobs = [self.input_job, self.focus_job, self.process_tree_job, self.idle_job, self.gate_job, self.tick_job,
+                self.status_job, self.settings_save_job, self.checkpoint_job, self.periodic_checkpoint_job]
+        jobs += [timer.job for timer in self.timers]
+        return {
+            'scheduler': {'wakeups': self.scheduler.wakeups,
+                          'wakeups_per_minute': self.scheduler.wakeups_per_minute(),
+                          'job_runs': {job.name: job.runs for job in jobs}},
+            'audio': {'rejected': worker.rejected, 'dropped': worker.dropped,
+                      'coalesced': worker.coalesced} if worker is not None else None,
+            'rewards': {'fired': self.rewards.fired, 'suppressed': self.rewards.suppressed},
+            'settings': self.settings_watcher.stats(),
+            'control': self.control_server.stats() if self.control_server is not None else None,
+            'view': {'renders': self.view_renderer.renders, 'repaints': self.view_renderer.repaints,
+                     'suspended': self.view_renderer.suspended} if self.view_renderer is not None else None,
+            'metrics': self.metrics.summary() if self.metrics is not None else None
+        }
+    
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+    
+    def publish_state(self):
+        for listener in self.listeners:
+            listener(self)
+    
+    def snapshot(self):
+        # Plain values for the control protocol
+        return {
+            'remaining_seconds': round(self.engine.remaining(), 3),
+            'time_text': self.time_text(),
+            'running': self.engine.running,
+            'focused': self.engine.focused,
+            'counting': self.engine.counting,
+            'target': self.focus_provider.current.process_name if self.engine.focused else None,
+            'typing_rate': round(self.typing_rate(), 1),
+            'gated': self.engine.gated,
+            'timers': [{'name': timer.spec.name, 'remaining_seconds': round(timer.engine.remaining(), 3),
+                        'time_text': self.time_text(timer.engine), 'running': timer.engine.running,
+                        'counting': timer.engine.counting} for timer in self.timers],
+            'status': self.status_message,
+            'settings_reloads': self.settings_watcher.reloads,
+            'settings_reload_failures': self.settings_watcher.failures
+        }
+    
+    def time_text(self, engine=None):
+        # Round up so the display only reaches 00:00:00 when the time is really up
+        hours, remainder = divmod(math.ceil((engine or self.engine).remaining()), 3600)
+        minutes, seconds = divmod(remainder, 60)
+        return f"{hours:02}:{minutes:02}:{seconds:02}"
+    
+    def typing_rate(self):
+        # Keystrokes per minute over the configured window
+        return self.typing_meter.rate(self.config.typing_rate_window)
+    
+    def target_rules(self):
+        return list(self.config.targets)
+    
+    def idle_source(self):
+        # The OS idle time, unless it counts the mouse while mouse activity shouldn't count
+        backend = self.idle_backend
+        if backend is None or (backend.counts_mouse and not self.config.count_mouse_activity):
+            return None
+        return backend
+    
+    def update_key_hook(self):
+        # Keystrokes only matter while a target is focused, unless a reward rule is for
+        # outside the targets or idle time has nowhere else to come from. Elsewhere the
+        # hook is off and typing costs this process nothing per key.
+        needed = (not self.config.hook_keys_only_in_targets or self.idle_detector.backend is None
+                  or self.engine.focused or self.rewards.outside_targets)
+        self.keyboard_monitor.set_key_hook(needed)
+    
+    def compile_rewards(self):
+        return RewardTable(self.config.reward_rules, self.target_matcher.rules,
+                           self.config.enter_shortcut_seconds, self.clock)
+    
+    def timing_status(self):
+        if self.engine.gated:
+            return f"Typing below {self.config.min_typing_rate:g} keys/min in {self.target_label()} - Timer paused"
+        return f"Timing {self.target_label()} usage"
+    
+    def target_label(self):
+        # The focused target's process name, or every configured target
+        if self.engine.focused:
+            return self.focus_provider.current.process_name
+        return ", ".join(rule.pattern for rule in self.config.targets)
+    
+    def save_settings(self):
+        self.scheduler.cancel(self.settings_save_job)
+        if not self.persist:
+            return
+        if self.settings_error is not None:
+            print(f"Error saving settings: {self.settings_file} didn't load ({self.settings_error}), "
+                  f"fix it by hand, it is left as it is")
+            return
+        started = time.perf_counter()
+        try:
+            write_atomic(self.settings_file, json.dumps(self.config.as_dict(), indent=4))
+        except Exception as e:
+            print(f"Error saving settings: {e}")
+        if self.metrics is not None:
+            self.metrics.observe('lazy_timer_io_seconds', time.perf_counter() - started, op='settings_save')
+    
+    def request_settings_save(self):
+        # Debounced, a burst of changes ends up as one write
+        if not self.settings_save_job.scheduled:
+            self.scheduler.schedule(self.settings_save_job, 1)
+    
+    def restore_state(self):
+        if not self.persist:
+            return
+        try:
+            state = self.state_journal.load()
+        except Exception as e:
+            print(f"Error loading timer state: {e}")
+            return
+        if state is None:
+            return
+        self.engine.set_remaining(state['remaining_us'] / 1_000_000)
+        for timer in self.timers:
+            if timer.spec.name in state.get('timers', {}):
+                timer.engine.set_remaining(state['timers'][timer.spec.name] / 1_000_000)
+        self.last_checkpoint = (state['remaining_us'], state['running'],
+                                tuple(timer.engine.remaining_us() for timer in self.timers))
+        if state['running']:
+            self.toggle_timer()
+        else:
+            self.set_status("Restored previous session")
+    
+    def checkpoint_state(self):
+        checkpoint = (self.engine.remaining_us(), self.engine.running,
+                      tuple(timer.engine.remaining_us() for timer in self.timers))
+        # Nothing to write while paused
+        if checkpoint == self.last_checkpoint or not self.persist:
+            return
+        self.last_checkpoint = checkpoint
+        started = time.perf_counter()
+        try:
+            self.state_journal.append({'remaining_us': checkpoint[0], 'running': checkpoint[1],
+                                       'timers': {timer.spec.name: remaining_us for timer, remaining_us
+                                                  in zip(self.timers, checkpoint[2])},
+                                       'saved_at': time.time()})
+        except Exception as e:
+            print(f"Error saving timer state: {e}")
+        if self.metrics is not None:
+            self.metrics.observe('lazy_timer_io_seconds', time.perf_counter() - started, op='checkpoint')
+    
+    def request_checkpoint(self):
+        if not self.checkpoint_job.scheduled:
+            self.scheduler.schedule(self.checkpoint_job, 1)
+    
+    def set_status(self, text):
+        self.status_message = text
+        self.publish_state()
+    
+    def toggle_timer(self):
+        self.auto_paused = False
+        if self.engine.running:
+            self.scheduler.cancel(self.tick_job)
+            self.engine.pause()
+            self.update_timers(False)
+            self.activity.record(ACTIVITY_TIMER_STOP, self.engine.remaining())
+            self.publish_state()
+            self.set_status("Timer paused")
+            self.update_power_mode()
+        else:
+            self.engine.start()
+            self.update_timers(True)
+            self.activity.record(ACTIVITY_TIMER_START, self.engine.remaining())
+            self.update_power_mode()
+            if self.engine.focused:
+                self.set_status(self.timing_status())
+            else:
+                self.set_status(f"{self.target_label()} not in focus - Timer paused")
+        self.request_checkpoint()
+    
+    def reset_timer(self):
+        self.engine.reset(self.config.default_timer_seconds)
+        for timer in self.timers:
+            timer.engine.reset(timer.spec.seconds)
+        self.update_timers(self.engine.running)
+        self.schedule_tick()
+        self.publish_state()
+        self.request_checkpoint()
+        if not self.engine.running:
+            self.set_status("Timer reset")
+    
+    def set_remaining(self, seconds):
+        self.engine.set_remaining(seconds)
+        self.schedule_tick()
+        self.request_checkpoint()
+        self.publish_state()
+    
+    def apply_settings(self, new_settings):
+        # Settings edited in the app, unlike file reloads these get saved
+        self.apply_config(SettingsSnapshot({**self.config.as_dict(), **new_settings}))
+        self.request_settings_save()
+    
+    def apply_config(self, config, seen=None):
+        # The one place settings change. Runs on the loop, so handlers see either the
+        # old snapshot or the new one.
+        old_config = self.config
+        if seen is not None:
+            self.settings_watcher.latencies.append(time.monotonic() - seen)
+            self.settings_error = None  # the file is valid again
+        if config == old_config:
+            return  # our own save, or a no-op edit
+        self.config = config
+        
+        # Update the process name in status label if changed
+        if old_config.targets != config.targets:
+            self.target_matcher = TargetMatcher(self.target_rules())
+            self.tree_matcher.matcher = self.target_matcher
+            self.engine.set_targets(self.target_matcher.rules)
+        if old_config.timers != config.timers or old_config.targets != config.targets:
+            self.build_timers()
+        if old_config.targets != config.targets or old_config.include_child_processes != config.include_child_processes:
+            self.on_focus_changed(self.focus_provider.current)
+            self.set_status(f"Waiting for {self.target_label()} to be focused")
+        
+        if (old_config.reward_rules != config.reward_rules or old_config.targets != config.targets
+                or old_config.enter_shortcut_seconds != config.enter_shortcut_seconds):
+            self.rewards = self.compile_rewards()
+            self.keyboard_monitor.bound_keys = self.rewards.keys
+            self.update_key_hook()
+        
+        if old_config.hook_keys_only_in_targets != config.hook_keys_only_in_targets:
+            self.update_key_hook()
+        
+        if old_config.idle_timeout_seconds != config.idle_timeout_seconds:
+            self.idle_detector.set_timeout(config.idle_timeout_seconds)
+        
+        if (old_config.min_typing_rate != config.min_typing_rate
+                or old_config.typing_rate_window != config.typing_rate_window):
+            self.update_typing_gate()
+        
+        if old_config.count_mouse_activity != config.count_mouse_activity:
+            self.keyboard_monitor.set_mouse_backend(MouseHookBackend() if config.count_mouse_activity else None)
+            self.idle_detector.backend = self.idle_source()
+            self.update_key_hook()
+        
+        if old_config.input_batch_hz != config.input_batch_hz:
+            self.input_job.interval = 1 / config.input_batch_hz
+            self.scheduler.schedule_periodic(self.input_job)
+        
+        if (old_config.collect_metrics != config.collect_metrics
+                or old_config.metrics_port != config.metrics_port):
+            self.update_metrics()
+        
+        self.sound_player.worker.max_voices = config.max_sound_voices
+        self.activity.set_enabled(config.record_activity)
+        if config.control_server and self.control_server is None:
+            self.start_control_server()
+        elif not config.control_server and self.control_server is not None:
+            self.control_server.stop()
+            self.control_server = None
+        
+        # Drop cached samples for sounds that were swapped out
+        changed_sounds = [getattr(config, key) for key in SOUND_PATH_KEYS
+                          if getattr(old_config, key) != getattr(config, key)]
+        for key in SOUND_PATH_KEYS:
+            if getattr(old_config, key) != getattr(config, key):
+                self.sound_player.cache.invalidate(getattr(old_config, key))
+        if config.enable_sounds and not old_config.enable_sounds:
+            changed_sounds = [getattr(config, key) for key in SOUND_PATH_KEYS]
+        if changed_sounds and config.enable_sounds:
+            self.sound_player.preload(changed_sounds)
+        
+        # Color and reward text changes go out with the new snapshot
+        self.publish_state()
+    
+    def update_timer(self):
+        # Only samples the engine, a late or skipped tick costs nothing but a repaint
+        if self.engine.counting:
+            self.publish_state()
+            
+            if self.engine.is_expired():
+                # The session is over, the named timers stop with it as on a pause
+                self.scheduler.cancel(self.tick_job)
+                self.engine.pause()
+                self.update_timers(False)
+                self.activity.record(ACTIVITY_TIMER_EXPIRED)
+                self.set_status("Time's up!")
+                self.sound_player.play_sound(self.config.time_up_sound_path)
+                self.update_power_mode()
+                self.request_checkpoint()
+            elif not self.view_visible:
+                self.schedule_tick()
+            elif self.engine.remaining() < self.scheduler.interval_of(self.tick_job):
+                # Wake up right at expiry rather than a whole (low-power) tick later
+                self.scheduler.schedule(self.tick_job, self.engine.remaining())
+        elif not self.view_visible:
+            self.schedule_tick()
+    
+    def schedule_tick(self):
+        # A visible countdown ticks every second (5 in low power). With nobody watching
+        # the only reason to wake up is expiry, so the tick is armed for the moment the
+        # countdown would reach zero at the current rate, and re-armed on every change.
+        if not self.engine.running:
+            self.scheduler.cancel(self.tick_job)
+        elif self.view_visible:
+            self.scheduler.schedule_periodic(self.tick_job)
+        else:
+            delay = self.engine.time_to_expiry()
+            if delay is None:
+                self.scheduler.cancel(self.tick_job)
+            else:
+                self.scheduler.schedule(self.tick_job, delay)
+    
+    def build_timers(self):
+        # Timers that keep their name keep their remaining time across a settings change
+        remaining = {timer.spec.name: timer.engine.remaining() for timer in self.timers}
+        running = self.engine.running
+        for timer in self.timers:
+            self.scheduler.cancel(timer.job)
+        self.timers = []
+        for spec in self.config.timers:
+            matcher = None
+            if spec.targets:
+                matcher = ProcessTreeMatcher(TargetMatcher(spec.targets), self.ancestry, self.name_cache)
+            if spec.count != 'focused':
+                rules = (ANY_TARGET,)
+            else:
+                rules = matcher.matcher.rules if matcher is not None else self.target_matcher.rules
+            timer = NamedTimer(spec, matcher, TimerEngine(spec.seconds, rules, self.engine.clock))
+            timer.job = self.scheduler.add_job(f"timer:{spec.name}", lambda timer=timer: self.on_timer_expired(timer))
+            if spec.name in remaining:
+                timer.engine.set_remaining(min(remaining[spec.name], spec.seconds))
+            self.timers.append(timer)
+        if self.config.enable_sounds:
+            self.sound_player.preload(spec.time_up_sound_path for spec in self.config.timers if spec.time_up_sound_path)
+        self.update_timers(running)
+    
+    def update_timers(self, running=None):
+        # Brings the named timers in line with the focus and the typing gate (and with
+        # start/pause when running is given), then re-arms each one's expiry job. A timer
+        # that ran out stays at zero until it is reset.
+        focus = self.focus_provider.current
+        pid = focus.pid if self.config.include_child_processes else 0
+        for timer in self.timers:
+            engine = timer.engine
+            if running is False:
+                engine.pause()
+            elif running and not engine.running and not engine.is_expired():
+                engine.start()
+            engine.set_gated(self.engine.gated and timer.spec.count == 'focused')
+            timer.update_target(pid, focus.process_name, self.engine.target)
+            delay = engine.time_to_expiry()
+            if delay is None:
+                self.scheduler.cancel(timer.job)
+            elif timer.job.deadline is None or abs(timer.job.deadline - self.clock() - delay) > 0.001:
+                self.scheduler.schedule(timer.job, delay)
+    
+    def on_timer_expired(self, timer):
+        # Coarse OS timers may fire a little early, re-arm for the rest
+        if not timer.engine.is_expired():
+            self.update_timers()
+            return
+        self.sound_player.play_sound(timer.spec.time_up_sound_path or self.config.time_up_sound_path)
+        if timer.spec.repeat:
+            timer.engine.reset(timer.spec.seconds)
+            self.set_status(f"{timer.spec.name} is up, starting it again")
+        else:
+            timer.engine.pause()
+            self.set_status(f"{timer.spec.name} is up!")
+        self.update_timers()
+        self.request_checkpoint()
+        self.scheduler.schedule(self.status_job, 5)
+    
+    def set_view_visible(self, visible):
+        self.view_visible = visible
+        self.update_power_mode()
+    
+    def update_power_mode(self):
+        # Stretch the periodic jobs while nobody can see the timer or nothing is timed
+        self.scheduler.set_low_power(not self.view_visible or not self.engine.running)
+        self.schedule_tick()
+    
+    def sync_process_tree(self):
+        if self.config.include_child_processes:
+            self.ancestry.sync()
+    
+    def on_focus_changed(self, snapshot):
+        if self.config.include_child_processes:
+            self.engine.set_target(self.tree_matcher.match(snapshot.pid, snapshot.process_name))
+        else:
+            self.engine.set_target(self.target_matcher.match(snapshot.process_name))
+        self.update_timers()
+        self.update_key_hook()
+        if not self.view_visible:
+            self.schedule_tick()
+        self.activity.record(ACTIVITY_FOCUS, self.engine.focused, snapshot.process_name)
+        self.check_idle()
+    
+    def check_target_focus(self):
+        # Publishes a focus change (and updates the engine) if there is one
+        if self.metrics is None:
+            self.focus_provider.poll()
+        else:
+            started = time.perf_counter()
+            self.focus_provider.poll()
+            self.metrics.observe('lazy_timer_focus_poll_seconds', time.perf_counter() - started)
+        # A return from idle that only the OS idle time saw
+        self.idle_detector.poll()
+        
+        # Calculate percentage complete
+        total_time = self.config.default_timer_seconds
+        time_elapsed = total_time - self.engine.remaining()
+        percentage_complete = (time_elapsed / total_time) * 100 if total_time > 0 else 0
+        
+        if self.engine.running:
+            if self.engine.focused and self.engine.gated:
+                self.set_status(f"{self.timing_status()}, {percentage_complete:.1f}% complete")
+            elif self.engine.focused:
+                status = f"Timing {self.target_label()} usage, {percentage_complete:.1f}% complete"
+                budget = self.engine.targets[self.engine.target].budget_seconds
+                if budget:
+                    used = min(budget, self.engine.target_seconds(self.engine.target))
+                    status += f", {used // 60:.0f}/{budget // 60} min of its budget"
+                self.set_status(status)
+            else:
+                self.set_status(f"{self.target_label()} not focused - Timer paused, {percentage_complete:.1f}% complete")
+        
+        # Keeps the typing rate next to the timer current while nothing else publishes
+        typing_rate = round(self.typing_rate())
+        if self.view_visible and typing_rate != self.shown_typing_rate:
+            self.shown_typing_rate = typing_rate
+            self.publish_state()
+    
+    def on_input_batch(self, batch):
+        if self.metrics is not None:
+            self.metrics.observe('lazy_timer_input_delay_seconds', self.clock() - batch.first_time, kind='batch')
+        self.idle_detector.on_activity(batch.last_time)
+        if batch.keys or batch.enters:
+            self.activity.record(ACTIVITY_KEYS, batch.keys + batch.enters)
+            self.typing_meter.add(batch.keys + batch.enters, batch.last_time)
+            # More keys only push a pending closing deadline back, see update_typing_gate
+            if self.config.min_typing_rate and (self.engine.gated or not self.gate_job.scheduled):
+                self.update_typing_gate()
+    
+    def update_typing_gate(self):
+        # With a minimum typing rate the countdown only runs at that rate or faster. The
+        # gate closes at a deadline, the moment the rate would drop below the minimum if
+        # no more keys came. More keys can only make that later, so the deadline isn't
+        # moved per batch; when it fires the rate is checked again.
+        self.scheduler.cancel(self.gate_job)
+        delay = 0.0
+        if self.config.min_typing_rate:
+            delay = self.typing_meter.time_until_below(self.config.typing_rate_window, self.config.min_typing_rate)
+            if delay:
+                self.scheduler.schedule(self.gate_job, delay)
+        gated = bool(self.config.min_typing_rate) and not delay
+        if gated != self.engine.gated:
+            self.engine.set_gated(gated)
+            self.update_timers()
+            self.schedule_tick()
+            if self.engine.running and self.engine.focused:
+                self.check_target_focus()
+            else:
+                self.publish_state()
+    
+    def on_idle_changed(self, idle):
+        self.activity.record(ACTIVITY_IDLE if idle else ACTIVITY_ACTIVE)
+        if idle:
+            self.check_idle()
+            return
+        self.idle_alerted = False
+        if self.auto_paused:
+            self.auto_paused = False
+            if not self.engine.running:
+                self.toggle_timer()  # Resume after an auto-pause
+    
+    def check_idle(self):
+        # Runs on the idle transition and on focus changes while idle; idling in the
+        # target itself (reading code) doesn't count
+        if not self.idle_detector.idle or self.idle_alerted or self.engine.focused:
+            return
+        self.idle_alerted = True
+        
+        # Play idle sound regardless of timer state
+        self.sound_player.play_sound(
+            self.config.idle_sound_path,
+            self.config.enable_sounds
+        )
+        # If timer is running, auto-pause it
+        if self.engine.running:
+            self.toggle_timer()  # Auto-pause
+            self.auto_paused = True
+            self.set_status(f"Auto-paused after {format_duration(self.config.idle_timeout_seconds)} of inactivity")
+    
+    def on_enter_pressed(self):
+        self.on_key_chord(ENTER_CHORD)
+    
+    def on_key_chord(self, chord, pressed_at=None):
+        if self.metrics is not None and pressed_at is not None:
+            self.metrics.observe('lazy_timer_input_delay_seconds', self.clock() - pressed_at, kind='chord')
+        # Rewards only count while the timer runs, a press while paused uses up no cooldown or cap
+        if not self.engine.running:
+            return
+        rule = self.rewards.fire(chord, self.engine.target)
+        if rule is None:
+            return
+        self.engine.subtract(rule.seconds)
+        self.schedule_tick()
+        self.activity.record(ACTIVITY_REWARD, rule.seconds, self.focus_provider.current.process_name)
+        self.request_checkpoint()
+        self.publish_state()
+        if rule.seconds >= 0:
+            self.set_status(f"Subtracted {rule.seconds:g} seconds")
+            sound_path = self.config.enter_sound_path
+        else:
+            self.set_status(f"Added {-rule.seconds:g} seconds for {rule.keys}")
+            sound_path = self.config.idle_sound_path
+        
+        # Play the reward (or penalty) sound if sounds are enabled
+        self.sound_player.play_sound(sound_path, self.config.enable_sounds)
+        
+        # Reset temporary message after 2 seconds
+        self.scheduler.schedule(self.status_job, 2)
+    
+    def restore_status_message(self):
+        if self.engine.running:
+            if self.engine.focused:
+                self.set_status(self.timing_status())
+            else:
+                self.set_status(f"{self.target_label()} not in focus - Timer paused")
+        else:
+            self.set_status("Timer paused")
+    
+    def close(self):
+        # Save pending settings changes and the countdown before exiting. Settings with
+        # nothing pending are already in the file, or were rejected there and must stay.
+        self.settings_watcher.stop()
+        if self.control_server is not None:
+            self.control_server.stop()
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+        if self.settings_save_job.scheduled:
+            self.save_settings()
+        self.checkpoint_state()
+        if self.state_journal is not None:
+            self.state_journal.close()
+        self.activity.close()
+        self.keyboard_monitor.stop_monitoring()
+        self.sound_player.close()
+
+
+def headless_main(argv):
+    import argparse
+    parser = argparse.ArgumentParser(prog='lazy_ass_timer.py --headless',
+                                     description="Run the timer without a window, printing status changes.")
+    parser.add_argument('--start', action='store_true', help="start the countdown right away")
+    args = parser.parse_args(argv)
+    
+    loop = HeadlessLoop()
+    controller = TimerController(loop, idle_backend=os_idle_backend())
+    last_status = [None]
+    
+    def print_status(controller):
+        if controller.status_message != last_status[0]:
+            last_status[0] = controller.status_message
+            print(f"[{controller.time_text()}] {controller.status_message}", flush=True)
+    
+    controller.subscribe(print_status)
+    # Stopped by the session manager at logout, save like a closed window would
+    import signal
+    signal.signal(signal.SIGTERM, lambda signum, frame: loop.post(loop.stop))
+    controller.start()
+    if args.start and not controller.engine.running:
+        controller.toggle_timer()
+    try:
+        loop.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        controller.close()
+    return 0
+
+
+def main():
+    if sys.argv[1:2] == ['report']:
+        sys.exit(report_main(sys.argv[2:]))
+    if sys.argv[1:2] == ['--headless']:
+        sys.exit(headless_main(sys.argv[2:]))
+    
+    # Run as a script this module is __main__, let the GUI and ctl reuse it instead of importing it again
+    sys.modules.setdefault('lazy_ass_timer', sys.modules[__name__])
+    if sys.argv[1:2] == ['ctl']:
+        from lazy_ass_timer_control import control_main
+        sys.exit(control_main(sys.argv[2:]))
+    if sys.argv[1:2] == ['--stats']:
+        from lazy_ass_timer_control import stats_main
+        sys.exit(stats_main(sys.argv[2:]))
+    if sys.argv[1:2] == ['simulate']:
+        from lazy_ass_timer_sim import simulate_main
+        sys.exit(simulate_main(sys.argv[2:]))
+    from lazy_ass_timer_gui import gui_main
+    sys.exit(gui_main(sys.argv))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,409 @@
+import asyncio
+import itertools
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+# Line-delimited JSON control protocol. Every request is one object with an op and an
+# optional id, answered by one line with the same id:
+#   {"id": 1, "op": "toggle"}  ->  {"id": 1, "ok": true, "state": {...}}
+#   {"id": 2, "op": "edit", "remaining_seconds": 600}
+#   {"id": 3, "op": "subscribe"}  ->  the reply, then {"event": "state", "state": {...}} per change
+#   {"id": 4, "op": "stats"}  ->  the reply with a "stats" object too, see TimerController.stats
+# Errors come back as {"id": ..., "ok": false, "error": "..."}.
+
+CONTROL_OPS = {
+    'state': lambda controller, request: None,
+    'toggle': lambda controller, request: controller.toggle_timer(),
+    'start': lambda controller, request: controller.engine.running or controller.toggle_timer(),
+    'pause': lambda controller, request: controller.engine.running and controller.toggle_timer(),
+    'reset': lambda controller, request: controller.reset_timer(),
+    'edit': lambda controller, request: controller.set_remaining(remaining_seconds(request)),
+    'reward': lambda controller, request: controller.on_enter_pressed()
+}
+
+
+def remaining_seconds(request):
+    seconds = float(request['remaining_seconds'])
+    if not 0 <= seconds < 100 * 3600:
+        raise ValueError("remaining_seconds out of range")
+    return seconds
+
+
+def control_address(home, port):
+    # Unix socket next to the other state files; Windows has no AF_UNIX for asyncio,
+    # so it gets a localhost TCP port instead
+    if hasattr(socket, 'AF_UNIX') and sys.platform != 'win32':
+        return os.path.join(home, "pycharm_timer_control.sock")
+    return ('127.0.0.1', port)
+
+
+class ControlClientConnection:
+    # Server side of one client. Replies and state events go through a bounded queue
+    # drained by a sender task; a client that lets it fill up is disconnected rather
+    # than buffered for.
+    
+    def __init__(self, writer, max_queue):
+        self.writer = writer
+        self.queue = asyncio.Queue(max_queue)
+        self.subscribed = False
+        self.closed = False
+    
+    def send(self, line):
+        try:
+            self.queue.put_nowait(line)
+            return True
+        except asyncio.QueueFull:
+            return False
+    
+    async def run_sender(self):
+        try:
+            while True:
+                self.writer.write(await self.queue.get())
+                await self.writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+    
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.writer.transport.abort()
+
+
+class ControlServer:
+    # Runs its own asyncio loop on a daemon thread. Requests are handed to the timer's
+    # loop with post() and answered once they ran there; state changes are serialized
+    # once on the timer's loop and fanned out from this thread, so the timer never
+    # waits on a client.
+    
+    def __init__(self, controller, address=None, max_queue=64, request_timeout=5):
+        self.controller = controller
+        self.address = address or control_address(controller.home, controller.config.control_port)
+        self.max_queue = max_queue
+        self.request_timeout = request_timeout
+        self.clients = set()
+        self.subscribers = set()
+        self.requests = 0
+        self.evicted = 0
+        self.broadcasts = 0
+        self.last_line = None
+        self.aloop = None
+        self._server = None
+        self._stopping = None
+        self._thread = None
+        self._ready = threading.Event()
+        # Listeners belong to the timer's loop
+        controller.loop.post(lambda: controller.subscribe(self.on_state))
+    
+    def start(self):
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+    
+    def run(self):
+        # Blocks until stop(), for callers that already are on a thread of their own
+        self._thread = self._thread or threading.current_thread()
+        asyncio.run(self._main())
+    
+    def wait_ready(self, timeout=5):
+        return self._ready.wait(timeout)
+    
+    def stats(self):
+        return {'requests': self.requests, 'evicted': self.evicted, 'broadcasts': self.broadcasts}
+    
+    def stop(self):
+        if self._thread is None:
+            return
+        # A server still starting up has no loop to signal yet
+        self._ready.wait(2)
+        try:
+            self.aloop.call_soon_threadsafe(self._stopping.set)
+        except (AttributeError, RuntimeError):
+            pass  # never got a loop, or it already ended on a startup error
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+        self._thread = None
+    
+    async def _main(self):
+        self.aloop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        try:
+            if isinstance(self.address, str):
+                if os.path.exists(self.address):
+                    os.remove(self.address)  # left behind by a crash
+                self._server = await asyncio.start_unix_server(self._handle_client, self.address)
+            else:
+                self._server = await asyncio.start_server(self._handle_client, *self.address)
+                # Port 0 picks a free one
+                self.address = self._server.sockets[0].getsockname()[:2]
+        except OSError as e:
+            print(f"Error starting control server: {e}")
+            return
+        finally:
+            self._ready.set()
+        await self._stopping.wait()
+        self._server.close()
+        for client in list(self.clients):
+            client.close()
+        await self._server.wait_closed()
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.remove(self.address)
+    
+    def on_state(self, controller):
+        # Timer loop thread: one json.dumps per change, and only with subscribers
+        if not self.subscribers or self.aloop is None:
+            return
+        line = json.dumps({'event': 'state', 'state': controller.snapshot()}).encode() + b'\n'
+        if line != self.last_line:
+            self.last_line = line
+            self.aloop.call_soon_threadsafe(self._broadcast, line)
+    
+    def _broadcast(self, line):
+        self.broadcasts += 1
+        for client in list(self.subscribers):
+            if not client.send(line):
+                self._evict(client)
+    
+    def _evict(self, client):
+        self.evicted += 1
+        self.subscribers.discard(client)
+        client.close()
+    
+    async def _handle_client(self, reader, writer):
+        client = ControlClientConnection(writer, self.max_queue)
+        self.clients.add(client)
+        sender = asyncio.ensure_future(client.run_sender())
+        try:
+            while not client.closed:
+                line = await reader.readline()
+                if not line:
+                    break
+                reply = await self._handle_request(client, line)
+                if not client.send(json.dumps(reply).encode() + b'\n'):
+                    self._evict(client)
+        except (ConnectionError, ValueError):
+            # ValueError: a line over the reader's limit
+            pass
+        finally:
+            self.clients.discard(client)
+            self.subscribers.discard(client)
+            sender.cancel()
+            client.close()
+    
+    async def _handle_request(self, client, line):
+        self.requests += 1
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get('id')
+            op = request['op']
+            if op == 'stats':
+                action = CONTROL_OPS['state']
+            elif op == 'subscribe':
+                client.subscribed = True
+                self.subscribers.add(client)
+                action = CONTROL_OPS['state']
+            elif op == 'unsubscribe':
+                client.subscribed = False
+                self.subscribers.discard(client)
+                action = CONTROL_OPS['state']
+            elif op in CONTROL_OPS:
+                action = CONTROL_OPS[op]
+            else:
+                raise ValueError(f"unknown op {op!r}")
+            
+            def run_op():
+                action(self.controller, request)
+                return self.controller.snapshot(), self.controller.stats() if op == 'stats' else None
+            
+            state, stats = await self._call(run_op)
+        except Exception as e:
+            return {'id': request_id, 'ok': False, 'error': f"{type(e).__name__}: {e}"}
+        reply = {'id': request_id, 'ok': True, 'state': state}
+        if stats is not None:
+            reply['stats'] = stats
+        return reply
+    
+    async def _call(self, function):
+        # Run function on the timer's loop and wait for its result here
+        future = self.aloop.create_future()
+        
+        def settle(setter, value):
+            if not future.done():
+                setter(value)
+        
+        def run():
+            try:
+                result = function()
+            except Exception as e:
+                self.aloop.call_soon_threadsafe(settle, future.set_exception, e)
+            else:
+                self.aloop.call_soon_threadsafe(settle, future.set_result, result)
+        
+        self.controller.loop.post(run)
+        return await asyncio.wait_for(future, self.request_timeout)
+
+
+class ControlClient:
+    # Asyncio client, used by the ctl command and the load test
+    
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self.states = asyncio.Queue()
+        self._receiver = asyncio.ensure_future(self._receive())
+    
+    @classmethod
+    async def connect(cls, address, limit=1 << 20):
+        if isinstance(address, str):
+            reader, writer = await asyncio.open_unix_connection(address, limit=limit)
+        else:
+            reader, writer = await asyncio.open_connection(*address, limit=limit)
+        return cls(reader, writer)
+    
+    async def request(self, op, **fields):
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self.writer.write(json.dumps({'id': request_id, 'op': op, **fields}).encode() + b'\n')
+        await self.writer.drain()
+        return await future
+    
+    async def _receive(self):
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                if message.get('event') == 'state':
+                    self.states.put_nowait((time.perf_counter(), message['state']))
+                else:
+                    future = self._pending.pop(message.get('id'), None)
+                    if future is not None and not future.done():
+                        future.set_result(message)
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("control server closed the connection"))
+            self._pending.clear()
+            self.states.put_nowait(None)
+    
+    async def close(self):
+        self._receiver.cancel()
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+def control_main(argv, settings_file=None):
+    import argparse
+    from lazy_ass_timer import load_settings
+    parser = argparse.ArgumentParser(prog='lazy_ass_timer.py ctl',
+                                     description="Control a running timer over its control socket.")
+    parser.add_argument('op', choices=sorted(CONTROL_OPS) + ['stats', 'subscribe'])
+    parser.add_argument('remaining_seconds', nargs='?', type=float, help="new remaining time, for edit")
+    parser.add_argument('--home', default=os.path.expanduser("~"))
+    args = parser.parse_args(argv)
+    port = load_settings(settings_file or os.path.join(args.home, "pycharm_timer_settings.json"))['control_port']
+    
+    async def run():
+        try:
+            client = await ControlClient.connect(control_address(args.home, port))
+        except OSError as e:
+            print(f"Error connecting to the timer: {e}")
+            return 1
+        try:
+            fields = {} if args.remaining_seconds is None else {'remaining_seconds': args.remaining_seconds}
+            reply = await client.request(args.op, **fields)
+            print(json.dumps(reply), flush=True)
+            if args.op == 'subscribe' and reply['ok']:
+                while True:
+                    item = await client.states.get()
+                    if item is None:
+                        break
+                    print(json.dumps(item[1]), flush=True)
+            return 0 if reply['ok'] else 1
+        finally:
+            await client.close()
+    
+    try:
+        return asyncio.run(run())
+    except KeyboardInterrupt:
+        return 0
+
+
+def format_stats(state, stats):
+    lines = [f"Timer      {state['time_text']} {'running' if state['running'] else 'paused'}, "
+             f"{state['target'] or 'no target'} focused, {state['typing_rate']:.0f} keys/min"]
+    for timer in state['timers']:
+        note = '' if timer['counting'] else ' (waiting)' if timer['running'] else ' (paused)'
+        lines.append(f"           {timer['time_text']} {timer['name']}{note}")
+    scheduler = stats['scheduler']
+    lines.append(f"Scheduler  {scheduler['wakeups']} wakeups, {scheduler['wakeups_per_minute']} in the last minute")
+    lines.append("           " + ", ".join(f"{name} {runs}" for name, runs in scheduler['job_runs'].items()))
+    if stats['audio'] is not None:
+        lines.append("Audio      {rejected} rejected, {dropped} dropped, {coalesced} coalesced".format(**stats['audio']))
+    lines.append("Rewards    {fired} fired, {suppressed} suppressed".format(**stats['rewards']))
+    lines.append("Settings   {reloads} reloads, {failures} failures ({backend})".format(**stats['settings']))
+    if stats['control'] is not None:
+        lines.append("Control    {requests} requests, {broadcasts} broadcasts, {evicted} evicted".format(
+            **stats['control']))
+    lines.append("")
+    if stats['metrics'] is None:
+        lines.append("Latency histograms are off, set collect_metrics to true in the settings to collect them")
+        return "\n".join(lines)
+    
+    def ms(value):
+        return f"{value:9.3f}" if value is not None else f"{'-':>9}"
+    
+    lines.append(f"{'Metric':<58}{'count':>8}{'mean ms':>9}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for name, value in stats['metrics'].items():
+        if isinstance(value, dict):
+            lines.append(f"{name:<58}{value['count']:>8}{ms(value['mean_ms'])}{ms(value['p50_ms'])}"
+                         f"{ms(value['p99_ms'])}{ms(value['max_ms'])}")
+        else:
+            lines.append(f"{name:<58}{value:>8}")
+    return "\n".join(lines)
+
+
+def stats_main(argv, settings_file=None):
+    import argparse
+    from lazy_ass_timer import load_settings
+    parser = argparse.ArgumentParser(prog='lazy_ass_timer.py --stats',
+                                     description="Print the counters and latency histograms of a running timer.")
+    parser.add_argument('--home', default=os.path.expanduser("~"))
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args(argv)
+    port = load_settings(settings_file or os.path.join(args.home, "pycharm_timer_settings.json"))['control_port']
+    
+    async def run():
+        try:
+            client = await ControlClient.connect(control_address(args.home, port))
+        except OSError as e:
+            print(f"Error connecting to the timer: {e}")
+            return None
+        try:
+            return await client.request('stats')
+        finally:
+            await client.close()
+    
+    reply = asyncio.run(run())
+    if reply is None:
+        return 1
+    if not reply['ok']:
+        print(f"Error getting stats: {reply['error']}")
+        return 1
+    if args.json:
+        print(json.dumps({'state': reply['state'], 'stats': reply['stats']}, indent=2))
+    else:
+        print(format_stats(reply['state'], reply['stats']))
+    return 0
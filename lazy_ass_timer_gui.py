@@ -0,0 +1,597 @@
+import math
+import re
+import sys
+from PyQt5.QtWidgets import (QApplication, QMainWindow, QLCDNumber, QPushButton,
+                           QVBoxLayout, QHBoxLayout, QGridLayout, QWidget, QLabel,
+                           QInputDialog, QSpinBox, QDoubleSpinBox, QDialog, QFormLayout,
+                           QDialogButtonBox, QFileDialog, QColorDialog, QCheckBox,
+                           QPlainTextEdit, QMessageBox)
+from PyQt5.QtCore import QTimer, Qt, pyqtSignal, QObject, QEvent
+from PyQt5.QtGui import QFont, QColor, QPalette
+from collections import namedtuple
+from lazy_ass_timer import (SETTING_CHECKS, SettingsSnapshot, TargetRule, TimerController, TimerSpec, format_target_rule,
+                            format_timer_spec, os_idle_backend, parse_target_rule, parse_timer_spec)
+
+
+class QtLoop(QObject):
+    # TimerController loop on the Qt event loop: one single-shot QTimer for the
+    # scheduler, and a queued signal to run callbacks posted from other threads
+    posted = pyqtSignal(object)
+    
+    def __init__(self):
+        super().__init__()
+        self.on_timer = None
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(lambda: self.on_timer())
+        self.posted.connect(lambda callback: callback())
+    
+    def arm(self, delay):
+        self.timer.start(math.ceil(delay * 1000))
+    
+    def post(self, callback):
+        self.posted.emit(callback)
+    
+    def stop(self):
+        self.timer.stop()
+
+
+ViewState = namedtuple('ViewState', ['status_text', 'time_text', 'rate_text', 'timer_rows', 'button_text',
+                                     'shortcut_text', 'display_color'])
+
+
+class TimerViewRenderer:
+    # Applies ViewState snapshots to the widgets, touching only the ones whose value
+    # changed since the last rendered snapshot. While suspended (window minimized or
+    # hidden) nothing is touched and only the newest snapshot is kept for resume().
+    
+    def __init__(self, status_label, time_display, rate_label, timers_layout, start_pause_button, shortcut_label):
+        self.time_display = time_display
+        self.timers_layout = timers_layout
+        self.timer_rows = []  # (name label, time label, last row) per named timer
+        self.appliers = ViewState(status_label.setText, time_display.display, rate_label.setText,
+                                  self._apply_timer_rows, start_pause_button.setText, shortcut_label.setText,
+                                  self._apply_color)
+        self.last = None
+        self.pending = None
+        self.suspended = False
+        self.renders = 0
+        self.repaints = 0
+    
+    def _apply_color(self, color_name):
+        color = QColor(color_name)
+        palette = self.time_display.palette()
+        palette.setColor(palette.WindowText, color)
+        palette.setColor(palette.Light, color)
+        palette.setColor(palette.Dark, color)
+        self.time_display.setPalette(palette)
+    
+    def _apply_timer_rows(self, rows):
+        # One row per named timer, (name, time text, state). Rows are only created or
+        # removed when the timers change, and a tick only touches the rows that moved.
+        while len(self.timer_rows) > len(rows):
+            name_label, time_label, _ = self.timer_rows.pop()
+            for label in (name_label, time_label):
+                self.timers_layout.removeWidget(label)
+                label.deleteLater()
+        while len(self.timer_rows) < len(rows):
+            name_label, time_label = QLabel(), QLabel()
+            time_label.setFont(QFont('Consolas', 12))
+            time_label.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
+            row = len(self.timer_rows)
+            self.timers_layout.addWidget(name_label, row, 0)
+            self.timers_layout.addWidget(time_label, row, 1)
+            self.timer_rows.append((name_label, time_label, None))
+        for index, ((name_label, time_label, last), row) in enumerate(zip(self.timer_rows, rows)):
+            if row == last:
+                continue
+            name, time_text, state = row
+            if last is None or (name, state) != (last[0], last[2]):
+                name_label.setText(f"{name} ({state})" if state else name)
+            if last is None or time_text != last[1]:
+                time_label.setText(time_text)
+            self.timer_rows[index] = (name_label, time_label, row)
+    
+    def render(self, state):
+        if self.suspended:
+            self.pending = state
+            return
+        self.renders += 1
+        last = self.last or (None,) * len(state)
+        for value, old_value, apply in zip(state, last, self.appliers):
+            if value != old_value:
+                apply(value)
+                self.repaints += 1
+        self.last = state
+    
+    def suspend(self):
+        self.suspended = True
+    
+    def resume(self):
+        self.suspended = False
+        if self.pending is not None:
+            state, self.pending = self.pending, None
+            self.render(state)
+
+
+class EditTimeDialog(QDialog):
+    def __init__(self, hours, minutes, seconds, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Edit Time")
+        
+        layout = QFormLayout(self)
+        
+        # Hours spinner
+        self.hours_spin = QSpinBox()
+        self.hours_spin.setRange(0, 99)
+        self.hours_spin.setValue(hours)
+        layout.addRow("Hours:", self.hours_spin)
+        
+        # Minutes spinner
+        self.minutes_spin = QSpinBox()
+        self.minutes_spin.setRange(0, 59)
+        self.minutes_spin.setValue(minutes)
+        layout.addRow("Minutes:", self.minutes_spin)
+        
+        # Seconds spinner
+        self.seconds_spin = QSpinBox()
+        self.seconds_spin.setRange(0, 59)
+        self.seconds_spin.setValue(seconds)
+        layout.addRow("Seconds:", self.seconds_spin)
+        
+        # Buttons
+        button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
+        layout.addRow(button_box)
+    
+    def get_time(self):
+        return {
+            'hours': self.hours_spin.value(),
+            'minutes': self.minutes_spin.value(),
+            'seconds': self.seconds_spin.value()
+        }
+
+
+class ColorButton(QPushButton):
+    def __init__(self, color, parent=None):
+        super().__init__(parent)
+        self.setFixedSize(30, 30)
+        self.color = color
+        self.setStyleSheet(f"background-color: {color.name()}; border: 1px solid #000;")
+    
+    def set_color(self, color):
+        self.color = color
+        self.setStyleSheet(f"background-color: {color.name()}; border: 1px solid #000;")
+
+
+class SettingsDialog(QDialog):
+    def __init__(self, settings, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Settings")
+        self.resize(500, 400)
+        
+        self.settings = settings
+        
+        # Create form layout
+        layout = QFormLayout(self)
+        
+        # Target processes, one rule per line
+        self.targets = QPlainTextEdit("\n".join(format_target_rule(TargetRule(**rule))
+                                                for rule in self.settings['targets']))
+        self.targets.setToolTip("One target per line: name [budget minutes] [weight]\n"
+                                "Names may be globs (code*.exe) or regexes (re:^idea\\d+\\.exe$).\n"
+                                "A budget of 0 means unlimited.")
+        self.targets.setFixedHeight(80)
+        layout.addRow("Target Processes:", self.targets)
+        
+        # Extra named timers, one per line
+        self.timers = QPlainTextEdit("\n".join(format_timer_spec(TimerSpec(**spec))
+                                               for spec in self.settings['timers']))
+        self.timers.setToolTip("One timer per line: name minutes [focused|away|always] [repeat]\n"
+                               "focused counts while a target is focused, away while none is,\n"
+                               "always whenever the timers run. repeat starts it over when it runs out.")
+        self.timers.setFixedHeight(60)
+        layout.addRow("Other Timers:", self.timers)
+        
+        # Default timer setting, up to the longest the settings file accepts
+        default_seconds = self.settings['default_timer_seconds']
+        self.timer_hours = QSpinBox()
+        self.timer_hours.setRange(0, SETTING_CHECKS['default_timer_seconds'].high // 3600)
+        self.timer_hours.setValue(default_seconds // 3600)
+        layout.addRow("Default Time (hours):", self.timer_hours)
+        
+        # Add minutes setting
+        self.timer_mins = QSpinBox()
+        self.timer_mins.setRange(0, 59)  # Minutes should be 0-59
+        self.timer_mins.setValue((default_seconds % 3600) // 60)  # Get remaining minutes
+        layout.addRow("Default Time (minutes):", self.timer_mins)
+        
+        self.timer_secs = QSpinBox()
+        self.timer_secs.setRange(0, 59)
+        self.timer_secs.setValue(default_seconds % 60)
+        layout.addRow("Default Time (seconds):", self.timer_secs)
+        
+        # Enter shortcut seconds
+        self.shortcut_seconds = QSpinBox()
+        self.shortcut_seconds.setRange(*self.setting_range('enter_shortcut_seconds'))
+        self.shortcut_seconds.setValue(self.settings['enter_shortcut_seconds'])
+        layout.addRow("Reward Button:", self.shortcut_seconds)
+        
+        # Idle timeout
+        self.idle_seconds = QSpinBox()
+        self.idle_seconds.setRange(*self.setting_range('idle_timeout_seconds'))
+        self.idle_seconds.setValue(self.settings['idle_timeout_seconds'])
+        layout.addRow("Auto-pause when idle (seconds):", self.idle_seconds)
+        
+        # Typing rate gate, two decimals shown; an untouched value is kept as it was
+        self.min_typing_rate = QDoubleSpinBox()
+        self.min_typing_rate.setDecimals(2)
+        self.min_typing_rate.setRange(*self.setting_range('min_typing_rate'))
+        self.min_typing_rate.setValue(self.settings['min_typing_rate'])
+        self.min_typing_rate.setToolTip("The timer only counts down while you type at least this many keys\n"
+                                        "per minute in a target. 0 counts whenever a target is focused.")
+        layout.addRow("Minimum typing rate (keys/min):", self.min_typing_rate)
+        
+        self.include_child_processes = QCheckBox("Processes started by a target count as the target")
+        self.include_child_processes.setChecked(self.settings['include_child_processes'])
+        layout.addRow("", self.include_child_processes)
+        
+        self.count_mouse_activity = QCheckBox("Mouse activity counts as activity")
+        self.count_mouse_activity.setChecked(self.settings['count_mouse_activity'])
+        layout.addRow("", self.count_mouse_activity)
+        
+        self.hook_keys_only_in_targets = QCheckBox("Only hook keystrokes while a target is focused")
+        self.hook_keys_only_in_targets.setChecked(self.settings['hook_keys_only_in_targets'])
+        self.hook_keys_only_in_targets.setToolTip("Idle time comes from Windows instead, so keys typed in other\n"
+                                                  "apps cost nothing. Windows counts the mouse too, so this needs\n"
+                                                  "mouse activity to count. Rules for outside the targets keep\n"
+                                                  "the hook on.")
+        layout.addRow("", self.hook_keys_only_in_targets)
+        
+        # UI Color setting
+        layout.addRow(QLabel("UI Color Settings:"))
+        
+        # Timer display color
+        self.color_button = ColorButton(QColor(self.settings['display_color']))
+        color_button_layout = QHBoxLayout()
+        color_button_layout.addWidget(self.color_button)
+        color_button_layout.addWidget(QLabel("Change color"))
+        color_button_layout.addStretch()
+        layout.addRow("Timer Display Color:", color_button_layout)
+        
+        # Connect color button click
+        self.color_button.clicked.connect(self.choose_color)
+        
+        # Sound settings
+        layout.addRow(QLabel("Sound Settings:"))
+        
+        # Enter key sound
+        self.enable_sounds = QCheckBox("Enable Sound Effects")
+        self.enable_sounds.setChecked(self.settings.get('enable_sounds', True))  # Default to enabled
+        layout.addRow("", self.enable_sounds)  # Add to layout before the sound settings
+        
+        self.enter_sound_path = QLabel(self.settings['enter_sound_path'])
+        enter_sound_button = QPushButton("Browse...")
+        enter_sound_button.clicked.connect(self.browse_enter_sound)
+        
+        enter_sound_layout = QHBoxLayout()
+        enter_sound_layout.addWidget(self.enter_sound_path)
+        enter_sound_layout.addWidget(enter_sound_button)
+        layout.addRow("Reward Key Sound:", enter_sound_layout)
+        
+        # Idle timeout sound
+        self.idle_sound_path = QLabel(self.settings['idle_sound_path'])
+        idle_sound_button = QPushButton("Browse...")
+        idle_sound_button.clicked.connect(self.browse_idle_sound)
+        
+        idle_sound_layout = QHBoxLayout()
+        idle_sound_layout.addWidget(self.idle_sound_path)
+        idle_sound_layout.addWidget(idle_sound_button)
+        layout.addRow("Idle Timeout Sound:", idle_sound_layout)
+        
+        # Time up sound
+        self.time_up_sound_path = QLabel(self.settings['time_up_sound_path'])
+        time_up_sound_button = QPushButton("Browse...")
+        time_up_sound_button.clicked.connect(self.browse_time_up_sound)
+        
+        time_up_sound_layout = QHBoxLayout()
+        time_up_sound_layout.addWidget(self.time_up_sound_path)
+        time_up_sound_layout.addWidget(time_up_sound_button)
+        layout.addRow("Time's Up Sound:", time_up_sound_layout)
+        
+        # Save button
+        button_box = QDialogButtonBox(QDialogButtonBox.Save | QDialogButtonBox.Cancel)
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
+        layout.addRow(button_box)
+    
+    def choose_color(self):
+        color = QColorDialog.getColor(self.color_button.color, self, "Choose Timer Display Color")
+        if color.isValid():
+            self.color_button.set_color(color)
+    
+    def browse_enter_sound(self):
+        file_path, _ = QFileDialog.getOpenFileName(self, "Select Enter Key Sound", "", "Audio Files (*.mp3 *.wav)")
+        if file_path:
+            self.enter_sound_path.setText(file_path)
+    
+    def browse_idle_sound(self):
+        file_path, _ = QFileDialog.getOpenFileName(self, "Select Idle Timeout Sound", "", "Audio Files (*.mp3 *.wav)")
+        if file_path:
+            self.idle_sound_path.setText(file_path)
+    
+    def browse_time_up_sound(self):
+        file_path, _ = QFileDialog.getOpenFileName(self, "Select Time's Up Sound", "", "Audio Files (*.mp3 *.wav)")
+        if file_path:
+            self.time_up_sound_path.setText(file_path)
+    
+    def target_rules(self):
+        return [parse_target_rule(line) for line in self.targets.toPlainText().splitlines() if line.strip()]
+    
+    def timer_specs(self):
+        # Timers edited here keep the targets and sound they were given in the settings file
+        existing = {spec['name']: spec for spec in self.settings['timers']}
+        specs = []
+        for line in self.timers.toPlainText().splitlines():
+            if line.strip():
+                spec = parse_timer_spec(line)
+                old = existing.get(spec.name)
+                if old is not None:
+                    spec = spec._replace(targets=old['targets'], time_up_sound_path=old['time_up_sound_path'])
+                specs.append(spec._asdict())
+        return specs
+    
+    def accept(self):
+        try:
+            if not self.target_rules():
+                raise ValueError("at least one target is required")
+            SettingsSnapshot({**self.settings, **self.get_settings()})
+        except (ValueError, re.error) as e:
+            QMessageBox.warning(self, "Invalid settings", f"Invalid settings: {e}")
+            return
+        super().accept()
+    
+    @staticmethod
+    def setting_range(key):
+        check = SETTING_CHECKS[key]
+        return check.low, check.high
+    
+    def typing_rate(self):
+        rate = self.min_typing_rate.value()
+        if rate == round(self.settings['min_typing_rate'], 2):
+            return self.settings['min_typing_rate']
+        return rate
+    
+    def get_settings(self):
+        return {
+            'targets': [rule._asdict() for rule in self.target_rules()],
+            'timers': self.timer_specs(),
+            'default_timer_seconds': min(SETTING_CHECKS['default_timer_seconds'].high,
+                                         self.timer_hours.value() * 3600 + self.timer_mins.value() * 60
+                                         + self.timer_secs.value()),
+            'enter_shortcut_seconds': self.shortcut_seconds.value(),
+            'idle_timeout_seconds': self.idle_seconds.value(),
+            'min_typing_rate': self.typing_rate(),
+            'count_mouse_activity': self.count_mouse_activity.isChecked(),
+            'hook_keys_only_in_targets': self.hook_keys_only_in_targets.isChecked(),
+            'include_child_processes': self.include_child_processes.isChecked(),
+            'display_color': self.color_button.color.name(),
+            'enable_sounds': self.enable_sounds.isChecked(),
+            'enter_sound_path': self.enter_sound_path.text(),
+            'idle_sound_path': self.idle_sound_path.text(),
+            'time_up_sound_path': self.time_up_sound_path.text()
+        }
+
+
+class TimerWindow(QMainWindow):
+    # Thin view over a TimerController, it only draws the published state and opens dialogs
+    def __init__(self, controller=None, idle_backend=None):
+        super().__init__()
+        self.loop = QtLoop()
+        self.controller = controller or TimerController(self.loop, idle_backend=idle_backend)
+        self.controller.subscribe(self.publish_state)
+        self.init_ui()
+        self.controller.start()
+    
+    def init_ui(self):
+        self.setWindowTitle('Process Time Tracker')
+        self.setGeometry(100, 100, 500, 300)
+        
+        # Set up the central widget
+        central_widget = QWidget()
+        self.setCentralWidget(central_widget)
+        
+        # Create main layout
+        main_layout = QVBoxLayout(central_widget)
+        
+        # Status label
+        self.status_label = QLabel()
+        self.status_label.setAlignment(Qt.AlignCenter)
+        self.status_label.setFont(QFont('Arial', 12))
+        main_layout.addWidget(self.status_label)
+        
+        # Timer display
+        self.time_display = QLCDNumber()
+        self.time_display.setDigitCount(8)  # HH:MM:SS
+        self.time_display.setSegmentStyle(QLCDNumber.Filled)
+        
+        self.time_display.setMinimumHeight(100)
+        
+        # Typing rate, next to the timer
+        self.rate_label = QLabel()
+        self.rate_label.setAlignment(Qt.AlignCenter)
+        self.rate_label.setFont(QFont('Arial', 10))
+        self.rate_label.setMinimumWidth(80)
+        display_layout = QHBoxLayout()
+        display_layout.addWidget(self.time_display, 1)
+        display_layout.addWidget(self.rate_label)
+        main_layout.addLayout(display_layout)
+        
+        # Named timers, a row each under the main one
+        self.timers_layout = QGridLayout()
+        main_layout.addLayout(self.timers_layout)
+        
+        # Button layout
+        button_layout = QHBoxLayout()
+        
+        # Start/Pause button
+        self.start_pause_button = QPushButton()
+        self.start_pause_button.clicked.connect(self.controller.toggle_timer)
+        button_layout.addWidget(self.start_pause_button)
+        
+        # Reset button
+        reset_button = QPushButton("Reset")
+        reset_button.clicked.connect(self.controller.reset_timer)
+        button_layout.addWidget(reset_button)
+        
+        # Edit time button
+        edit_button = QPushButton("Edit Time")
+        edit_button.clicked.connect(self.edit_time)
+        button_layout.addWidget(edit_button)
+        
+        # Settings button
+        settings_button = QPushButton("Settings")
+        settings_button.clicked.connect(self.open_settings)
+        button_layout.addWidget(settings_button)
+        
+        main_layout.addLayout(button_layout)
+        
+        # Add keyboard shortcut information
+        self.shortcut_label = QLabel()
+        self.shortcut_label.setAlignment(Qt.AlignCenter)
+        main_layout.addWidget(self.shortcut_label)
+        
+        # Widgets are only ever updated through the renderer
+        self.renderer = TimerViewRenderer(self.status_label, self.time_display, self.rate_label, self.timers_layout,
+                                          self.start_pause_button, self.shortcut_label)
+        self.controller.view_renderer = self.renderer
+        self.publish_state(self.controller)
+    
+    def publish_state(self, controller):
+        self.renderer.render(ViewState(
+            controller.status_message,
+            controller.time_text(),
+            self.rate_text(controller),
+            self.timer_rows(controller),
+            "Pause" if controller.engine.running else "Start",
+            f"Press Enter to subtract {controller.config.enter_shortcut_seconds} seconds",
+            controller.config.display_color
+        ))
+    
+    def rate_text(self, controller):
+        text = f"{controller.typing_rate():.0f}\nkeys/min"
+        if controller.config.min_typing_rate:
+            text += f"\n(min {controller.config.min_typing_rate:g})"
+        return text
+    
+    def timer_rows(self, controller):
+        rows = []
+        for timer in controller.timers:
+            if timer.engine.is_expired():
+                state = "done"
+            elif not timer.engine.running:
+                state = "paused"
+            else:
+                state = "" if timer.engine.counting else "waiting"
+            rows.append((timer.spec.name, controller.time_text(timer.engine), state))
+        return tuple(rows)
+    
+    def edit_time(self):
+        was_running = self.controller.engine.running
+        if was_running:
+            self.controller.toggle_timer()  # Pause the timer
+        
+        # Convert current time to hours, minutes, seconds for easier editing
+        time_left = math.ceil(self.controller.engine.remaining())
+        hours = time_left // 3600
+        minutes = (time_left % 3600) // 60
+        seconds = time_left % 60
+        
+        # Open the edit time dialog
+        dialog = EditTimeDialog(hours, minutes, seconds, self)
+        if dialog.exec_():
+            time_values = dialog.get_time()
+            self.controller.set_remaining(time_values['hours'] * 3600 +
+                                          time_values['minutes'] * 60 +
+                                          time_values['seconds'])
+        
+        if was_running:
+            self.controller.toggle_timer()  # Resume the timer
+    
+    def open_settings(self):
+        dialog = SettingsDialog(self.controller.config.as_dict(), self)
+        
+        # Set color from settings
+        dialog.color_button.set_color(QColor(self.controller.config.display_color))
+        
+        if dialog.exec_():
+            self.controller.apply_settings(dialog.get_settings())
+    
+    def update_power_mode(self):
+        # Stop rendering while the window can't be seen, the controller stretches its jobs.
+        # A window covered by others is unexposed where the platform tells Qt so (macOS,
+        # some X11 and Wayland compositors); on Windows Qt only reports minimizing.
+        window = self.windowHandle()
+        hidden = self.isHidden() or self.isMinimized() or (window is not None and not window.isExposed())
+        self.controller.set_view_visible(not hidden)
+        if hidden:
+            self.renderer.suspend()
+        else:
+            self.renderer.resume()
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        # Expose events go to the native window, not the widget. Installing again is a no-op.
+        self.windowHandle().installEventFilter(self)
+        self.update_power_mode()
+    
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Expose:
+            self.update_power_mode()
+        return super().eventFilter(watched, event)
+    
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.update_power_mode()
+    
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.WindowStateChange:
+            self.update_power_mode()
+    
+    def closeEvent(self, event):
+        # Save settings and the countdown before closing
+        self.loop.stop()
+        self.controller.close()
+        super().closeEvent(event)
+
+
+def gui_main(argv):
+    app = QApplication(argv)
+    app.setStyle('Fusion')  # Use Fusion style for a modern look
+    
+    # Set application-wide dark palette
+    dark_palette = QPalette()
+    dark_palette.setColor(QPalette.Window, QColor(53, 53, 53))
+    dark_palette.setColor(QPalette.WindowText, Qt.white)
+    dark_palette.setColor(QPalette.Base, QColor(25, 25, 25))
+    dark_palette.setColor(QPalette.AlternateBase, QColor(53, 53, 53))
+    dark_palette.setColor(QPalette.ToolTipBase, Qt.white)
+    dark_palette.setColor(QPalette.ToolTipText, Qt.white)
+    dark_palette.setColor(QPalette.Text, Qt.white)
+    dark_palette.setColor(QPalette.Button, QColor(53, 53, 53))
+    dark_palette.setColor(QPalette.ButtonText, Qt.white)
+    dark_palette.setColor(QPalette.BrightText, Qt.red)
+    dark_palette.setColor(QPalette.Link, QColor(42, 130, 218))
+    dark_palette.setColor(QPalette.Highlight, QColor(42, 130, 218))
+    dark_palette.setColor(QPalette.HighlightedText, Qt.black)
+    app.setPalette(dark_palette)
+    
+    window = TimerWindow(idle_backend=os_idle_backend())
+    window.show()
+    return app.exec_()
+
+
+if __name__ == "__main__":
+    sys.exit(gui_main(sys.argv))
@@ -0,0 +1,304 @@
+import itertools
+import os
+import random
+import time
+from collections import deque, namedtuple
+from datetime import date, datetime, timedelta
+
+from lazy_ass_timer import (ACTIVITY_FOCUS, ACTIVITY_KEYS, ACTIVITY_REWARD,
+                            ACTIVITY_TIMER_EXPIRED, ACTIVITY_TIMER_STOP, DEFAULT_SETTINGS, ActivityLog,
+                            FakeIdleBackend, FakeProcessTable, InputBatch, ReplayInputBackend,
+                            ScriptedFocusProvider, SettingsSnapshot, TimerController, format_duration)
+
+# Replays focus and keystroke streams through the real TimerController on a virtual
+# clock: no Qt, no sleeping and no files, so a week runs in a fraction of a second.
+# Events are (timestamp, kind, value) tuples sorted by time, with the process name as
+# the value of a focus event and the keystroke count of a keys event.
+SIM_FOCUS, SIM_KEYS, SIM_ENTER = 0, 1, 2
+
+SimulatedDay = namedtuple('SimulatedDay', ['day', 'time_to_zero', 'auto_pauses', 'rewards', 'reward_seconds'])
+
+
+class VirtualLoop:
+    # Controller loop on a virtual clock. arm() only records the deadline and
+    # advance() fires it once virtual time gets there.
+    
+    def __init__(self, now=0.0):
+        self.now = now
+        self.on_timer = None
+        self.deadline = None
+        self._posted = deque()
+    
+    def clock(self):
+        return self.now
+    
+    def arm(self, delay):
+        self.deadline = self.now + delay
+    
+    def post(self, callback):
+        self._posted.append(callback)
+    
+    def advance(self, until):
+        while True:
+            while self._posted:
+                self._posted.popleft()()
+            if self.deadline is None or self.deadline > until:
+                break
+            self.now = max(self.now, self.deadline)
+            self.deadline = None
+            self.on_timer()
+        self.now = max(self.now, until)
+
+
+class ActivityTally:
+    # Stands in for ActivityRecorder, counting events in memory
+    
+    def __init__(self, clock):
+        self.clock = clock
+        self.counts = [0] * (ACTIVITY_TIMER_EXPIRED + 1)
+        self.values = [0.0] * (ACTIVITY_TIMER_EXPIRED + 1)
+        self.last = [None] * (ACTIVITY_TIMER_EXPIRED + 1)
+    
+    def record(self, event, value=0.0, process_name=None):
+        self.counts[event] += 1
+        self.values[event] += value
+        self.last[event] = self.clock()
+    
+    def set_enabled(self, enabled):
+        pass
+    
+    def close(self):
+        pass
+
+
+class SilentSoundPlayer:
+    
+    def __init__(self):
+        self.played = 0
+    
+    def preload(self, sound_paths):
+        pass
+    
+    def play_sound(self, sound_path, enable_sounds=True):
+        if enable_sounds:
+            self.played += 1
+    
+    def close(self):
+        pass
+
+
+def simulate(events, settings=None):
+    # One session a day: the timer is reset and started at the day's first event and
+    # paused at its last, as if clicked by hand. Returns a SimulatedDay per day.
+    config = SettingsSnapshot({**DEFAULT_SETTINGS, **(settings or {}), 'record_activity': False,
+                               'control_server': False})
+    # Virtual time counts from the first event; epoch seconds as floats are too coarse
+    # for the nanosecond steps the engine can ask for right before expiry
+    origin = events[0][0] if events else 0.0
+    loop = VirtualLoop()
+    tally = ActivityTally(loop.clock)
+    focus = ScriptedFocusProvider()
+    idle = FakeIdleBackend(loop.clock)
+    controller = TimerController(loop, config=config, clock=loop.clock, persist=False, focus_provider=focus,
+                                 input_backend=ReplayInputBackend(), process_table=FakeProcessTable(),
+                                 sound_player=SilentSoundPlayer(), activity=tally, idle_backend=idle)
+    controller.start()
+    # Focus and input are pushed in below, there is nothing to poll
+    for job in (controller.input_job, controller.focus_job, controller.process_tree_job,
+                controller.periodic_checkpoint_job):
+        controller.scheduler.cancel(job)
+    
+    days = []
+    day = day_start = day_end = None
+    counts = values = None
+    on_input_batch = controller.on_input_batch
+    monitor = controller.keyboard_monitor
+    
+    def finish_day():
+        expired_at = tally.last[ACTIVITY_TIMER_EXPIRED]
+        days.append(SimulatedDay(
+            day,
+            expired_at - day_start if expired_at is not None and expired_at >= day_start else None,
+            tally.counts[ACTIVITY_TIMER_STOP] - counts[ACTIVITY_TIMER_STOP],
+            tally.counts[ACTIVITY_REWARD] - counts[ACTIVITY_REWARD],
+            tally.values[ACTIVITY_REWARD] - values[ACTIVITY_REWARD]))
+        if controller.engine.running:
+            controller.toggle_timer()
+    
+    for timestamp, kind, value in events:
+        now = timestamp - origin
+        if day_end is None or timestamp >= day_end:
+            if day is not None:
+                finish_day()
+            loop.advance(now)
+            day = date.fromtimestamp(timestamp)
+            day_start = now
+            day_end = datetime.combine(day + timedelta(days=1), datetime.min.time()).timestamp()
+            counts, values = list(tally.counts), list(tally.values)
+            controller.reset_timer()
+            controller.toggle_timer()
+        else:
+            loop.advance(now)
+        if kind == SIM_FOCUS:
+            focus.set_focus(value or None)
+            continue
+        # The OS sees every key, the controller only those typed while its hook is on.
+        # The rest show in the idle time, which the focus poll would check.
+        idle.input(now)
+        if not monitor.key_hook_active:
+            controller.idle_detector.poll()
+        elif kind == SIM_KEYS:
+            on_input_batch(InputBatch(value, 0, 0, now, now, 0))
+        else:
+            controller.on_enter_pressed()
+    if day is not None:
+        finish_day()
+    controller.close()
+    return days
+
+
+def summarize(days):
+    finished = sorted(result.time_to_zero for result in days if result.time_to_zero is not None)
+    return {
+        'days': len(days),
+        'expired_days': len(finished),
+        'median_time_to_zero': finished[len(finished) // 2] if finished else None,
+        'auto_pauses': sum(result.auto_pauses for result in days),
+        'rewards': sum(result.rewards for result in days),
+        'reward_seconds': sum(result.reward_seconds for result in days)
+    }
+
+
+_worker_events = None
+
+
+def _init_worker(events):
+    global _worker_events
+    _worker_events = events
+
+
+def _simulate_settings(settings):
+    return summarize(simulate(_worker_events, settings))
+
+
+def sweep(events, grid, workers=None):
+    # Every combination of the grid's values, spread over a process pool. The events
+    # are sent to each worker once, not once per combination.
+    combinations = [dict(zip(grid, values)) for values in itertools.product(*grid.values())]
+    if workers == 1 or len(combinations) == 1:
+        return [(settings, summarize(simulate(events, settings))) for settings in combinations]
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(events,)) as pool:
+        return list(zip(combinations, pool.map(_simulate_settings, combinations)))
+
+
+def events_from_log(log, days):
+    # Focus changes, keystroke batches and rewards (Enter in a target) from the journal
+    import numpy as np
+    strings = log.strings()
+    events = []
+    for day in days:
+        records = log.read_day(day)
+        records = records[np.isin(records['event'], (ACTIVITY_FOCUS, ACTIVITY_KEYS, ACTIVITY_REWARD))]
+        for timestamp, event, process, value in zip(records['timestamp'].tolist(), records['event'].tolist(),
+                                                    records['process'].tolist(), records['value'].tolist()):
+            if event == ACTIVITY_KEYS:
+                events.append((timestamp, SIM_KEYS, int(value)))
+            elif event == ACTIVITY_FOCUS:
+                events.append((timestamp, SIM_FOCUS, strings[process] if process < len(strings) else ''))
+            else:
+                events.append((timestamp, SIM_ENTER, 0))
+    events.sort(key=lambda event: event[0])
+    return events
+
+
+def synthetic_events(days=7, seed=0, first_day=None, target='pycharm64.exe'):
+    # A plausible working week: coding blocks with typing, Enter presses and reading
+    # pauses, browsing and chat in between, short breaks and a lunch break
+    rng = random.Random(seed)
+    first_day = first_day or date.today() - timedelta(days=days)
+    others = ['chrome.exe', 'Discord.exe', 'WindowsTerminal.exe', 'explorer.exe']
+    events = []
+    for offset in range(days):
+        day = first_day + timedelta(days=offset)
+        now = datetime(day.year, day.month, day.day, 9).timestamp() + rng.uniform(-1800, 1800)
+        end = now + rng.uniform(7.5, 9) * 3600
+        lunch_at = now + rng.uniform(3, 4) * 3600
+        while now < end:
+            if now >= lunch_at:
+                now += rng.uniform(30, 60) * 60
+                lunch_at = end
+            coding = rng.random() < 0.6
+            process = target if coding else rng.choice(others)
+            events.append((now, SIM_FOCUS, process))
+            block_end = now + (rng.uniform(15, 50) if coding else rng.uniform(2, 15)) * 60
+            while now < block_end:
+                if rng.random() < (0.03 if coding else 0.08):
+                    now += rng.uniform(60, 600)  # reading, thinking or away
+                    continue
+                now += rng.expovariate(1.0 if coding else 0.3)
+                events.append((now, SIM_KEYS, rng.randint(1, 8)))
+                if coding and rng.random() < 0.04:
+                    events.append((now, SIM_ENTER, 0))
+            if rng.random() < 0.15:
+                now += rng.uniform(3, 15) * 60  # short break
+    return events
+
+
+def parse_values(text, kind=int):
+    return [kind(value) for value in text.split(',') if value.strip()]
+
+
+def simulate_main(argv):
+    import argparse
+    import json
+    parser = argparse.ArgumentParser(prog='lazy_ass_timer.py simulate',
+                                     description="Replay recorded or synthetic days with different settings.")
+    parser.add_argument('--synthetic', type=int, metavar='DAYS', help="simulate DAYS synthetic days")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--days', type=int, default=7, help="replay the last DAYS recorded days")
+    parser.add_argument('--dir', default=os.path.join(os.path.expanduser("~"), "pycharm_timer_activity"))
+    parser.add_argument('--idle-timeout', type=parse_values, default=None, metavar='SECONDS,...')
+    parser.add_argument('--reward', type=parse_values, default=None, metavar='SECONDS,...')
+    parser.add_argument('--duration', type=parse_values, default=None, metavar='SECONDS,...')
+    parser.add_argument('--min-rate', type=parse_values, default=None, metavar='KEYS_PER_MINUTE,...')
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args(argv)
+    
+    if args.synthetic:
+        events = synthetic_events(args.synthetic, args.seed)
+    else:
+        log = ActivityLog(args.dir)
+        events = events_from_log(log, log.days()[-args.days:])
+    if not events:
+        print("No recorded activity to replay, try --synthetic 7")
+        return 1
+    
+    grid = {'idle_timeout_seconds': args.idle_timeout or [DEFAULT_SETTINGS['idle_timeout_seconds']],
+            'enter_shortcut_seconds': args.reward or [DEFAULT_SETTINGS['enter_shortcut_seconds']],
+            'default_timer_seconds': args.duration or [DEFAULT_SETTINGS['default_timer_seconds']],
+            'min_typing_rate': args.min_rate or [DEFAULT_SETTINGS['min_typing_rate']]}
+    started = time.perf_counter()
+    results = sweep(events, grid, args.workers)
+    elapsed = time.perf_counter() - started
+    
+    if args.json:
+        print(json.dumps([{'settings': settings, **summary} for settings, summary in results], indent=2))
+        return 0
+    print(f"{len(events):,} events, {len(results)} combinations in {elapsed:.2f}s")
+    print()
+    print(f"{'Idle':>8}{'Reward':>8}{'Timer':>9}{'Rate':>6}{'Expired':>10}{'To zero':>10}{'Pauses':>8}{'Rewards':>9}"
+          f"{'Reward time':>13}")
+    for settings, summary in results:
+        to_zero = summary['median_time_to_zero']
+        print(f"{format_duration(settings['idle_timeout_seconds']):>8}"
+              f"{settings['enter_shortcut_seconds']:>7}s"
+              f"{format_duration(settings['default_timer_seconds']):>9}"
+              f"{settings['min_typing_rate']:>6}"
+              f"{summary['expired_days']:>6}/{summary['days']:<3}"
+              f"{format_duration(to_zero) if to_zero is not None else '-':>10}"
+              f"{summary['auto_pauses']:>8}"
+              f"{summary['rewards']:>9}"
+              f"{format_duration(summary['reward_seconds']):>13}")
+    return 0
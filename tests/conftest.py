@@ -0,0 +1,35 @@
+import os
+import sys
+
+import pytest
+
+# The modules live at the top of the repository, next to this directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import lazy_ass_timer as lat
+import lazy_ass_timer_sim as sim
+
+
+@pytest.fixture
+def make_controller():
+    # Controllers on a virtual loop and fakes only: no files, no hooks, no sound device.
+    # idle_backend is called with the loop's clock, e.g. lat.FakeIdleBackend.
+    controllers = []
+    
+    def make(settings=None, focus=None, idle_backend=None):
+        loop = sim.VirtualLoop()
+        config = lat.SettingsSnapshot({**lat.DEFAULT_SETTINGS, 'enable_sounds': False, 'record_activity': False,
+                                       'control_server': False, **(settings or {})})
+        controller = lat.TimerController(loop, config=config, clock=loop.clock, persist=False,
+                                         focus_provider=focus or lat.ScriptedFocusProvider(),
+                                         input_backend=lat.ReplayInputBackend(),
+                                         process_table=lat.FakeProcessTable(),
+                                         sound_player=lat.SoundPlayer(sink=lat.NullAudioSink()),
+                                         activity=sim.ActivityTally(loop.clock),
+                                         idle_backend=idle_backend and idle_backend(loop.clock))
+        controller.start()
+        controllers.append(controller)
+        return controller, loop
+    
+    yield make
+    for controller in controllers:
+        controller.close()
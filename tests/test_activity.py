@@ -0,0 +1,57 @@
+import os
+from datetime import date
+
+import pytest
+
+import lazy_ass_timer as lat
+
+np = pytest.importorskip('numpy')
+
+
+def make_recorder(directory, **kwargs):
+    # No writer thread; the test flushes
+    recorder = lat.ActivityRecorder(str(directory), enabled=False, **kwargs)
+    recorder.enabled = True
+    return recorder
+
+
+def test_records_and_names_round_trip(tmp_path):
+    recorder = lat.ActivityRecorder(str(tmp_path), flush_interval=3600)
+    recorder.record(lat.ACTIVITY_FOCUS, 1.0, 'pycharm64.exe')
+    recorder.record(lat.ACTIVITY_KEYS, 12)
+    recorder.record(lat.ACTIVITY_FOCUS, 0.0, 'éditeur.exe')
+    recorder.close()
+    log = lat.ActivityLog(str(tmp_path))
+    assert log.strings() == ['', 'pycharm64.exe', 'éditeur.exe']
+    records = log.read_day(date.today())
+    assert list(records['event']) == [lat.ACTIVITY_FOCUS, lat.ACTIVITY_KEYS, lat.ACTIVITY_FOCUS]
+    assert list(records['process']) == [1, 0, 2]
+
+
+def test_a_failed_write_is_reported_once_and_the_writer_recovers(tmp_path, capsys):
+    recorder = make_recorder(tmp_path)
+    # A directory where the day file should be makes opening it fail
+    blocker = lat.ActivityLog(str(tmp_path)).day_path(date.today())
+    os.mkdir(blocker)
+    for _ in range(3):
+        recorder.record(lat.ACTIVITY_FOCUS, 1.0, 'pycharm64.exe')
+        recorder._flush()
+    assert recorder.write_errors == 3 and not recorder._pending
+    assert capsys.readouterr().out.count("Error writing activity") == 1
+    os.rmdir(blocker)
+    recorder.record(lat.ACTIVITY_FOCUS, 1.0, 'code.exe')
+    recorder.record(lat.ACTIVITY_FOCUS, 1.0, 'pycharm64.exe')
+    recorder._flush()
+    recorder._close_files()
+    assert recorder.write_errors == 0
+    # Ids are re-read from disk, so names interned by the failed flushes keep theirs
+    log = lat.ActivityLog(str(tmp_path))
+    strings = log.strings()
+    assert [strings[index] for index in log.read_day(date.today())['process']] == ['code.exe', 'pycharm64.exe']
+
+
+def test_pending_records_are_bounded(tmp_path):
+    recorder = make_recorder(tmp_path, max_pending=10)
+    for index in range(25):
+        recorder.record(lat.ACTIVITY_KEYS, index)
+    assert [record[3] for record in recorder._pending] == list(range(15, 25))
@@ -0,0 +1,107 @@
+import time
+
+import pytest
+
+import lazy_ass_timer as lat
+
+np = pytest.importorskip('numpy')
+
+
+def decoder(sound_path):
+    if sound_path == 'missing.mp3':
+        raise FileNotFoundError(sound_path)
+    tone = np.full(4410, 1000, np.int16)
+    return np.stack([tone, tone], axis=1)
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return condition()
+
+
+def test_a_sound_that_fails_to_load_does_not_stop_the_worker():
+    sink = lat.NullAudioSink()
+    player = lat.SoundPlayer(lat.SampleCache(decoder=decoder), sink)
+    try:
+        player.play_sound('missing.mp3')
+        time.sleep(0.05)
+        assert player.worker._thread.is_alive()
+        player.play_sound('pop.mp3')
+        assert wait_for(lambda: sink.blocks_written > 0)
+    finally:
+        player.close()
+
+
+def test_overlapping_triggers_are_coalesced_and_capped():
+    player = lat.SoundPlayer(lat.SampleCache(decoder=decoder), lat.NullAudioSink(realtime=True), max_voices=2)
+    try:
+        for sound_path in ('a.mp3', 'a.mp3', 'b.mp3', 'c.mp3'):
+            player.play_sound(sound_path)
+        assert wait_for(lambda: player.worker.coalesced + player.worker.dropped == 2)
+        assert (player.worker.coalesced, player.worker.dropped) == (1, 1)
+    finally:
+        player.close()
+
+
+def counting_decoder(decoded):
+    def decode(sound_path):
+        decoded.append(sound_path)
+        return decoder(sound_path)
+    return decode
+
+
+def test_sample_cache_decodes_each_sound_once():
+    decoded = []
+    cache = lat.SampleCache(variants=4, decoder=counting_decoder(decoded))
+    bank = cache.get_bank('a.mp3')
+    assert cache.get_bank('a.mp3') is bank and decoded == ['a.mp3']
+    # Slowest variant is the longest, the fastest the shortest
+    assert len(bank) == 4 and len(bank[0]) > len(bank[-1])
+    assert all(variant.dtype == np.int16 and variant.shape[1] == 2 for variant in bank)
+    chosen = cache.variant('a.mp3')
+    assert any(chosen is variant for variant in bank)
+    assert cache.total_bytes == sum(variant.nbytes for variant in bank)
+
+
+def test_sample_cache_evicts_the_least_recently_used_sound():
+    decoded = []
+    bank_bytes = sum(variant.nbytes for variant in lat.SampleCache(decoder=decoder).get_bank('a.mp3'))
+    cache = lat.SampleCache(max_bytes=bank_bytes * 2, decoder=counting_decoder(decoded))
+    cache.get_bank('a.mp3')
+    cache.get_bank('b.mp3')
+    cache.get_bank('a.mp3')
+    cache.get_bank('c.mp3')
+    assert list(cache._banks) == ['a.mp3', 'c.mp3'] and cache.total_bytes == bank_bytes * 2
+    cache.get_bank('b.mp3')
+    assert decoded == ['a.mp3', 'b.mp3', 'c.mp3', 'b.mp3']
+    # A sound bigger than the limit on its own is still kept
+    cache = lat.SampleCache(max_bytes=1, decoder=decoder)
+    cache.get_bank('a.mp3')
+    assert list(cache._banks) == ['a.mp3']
+
+
+def test_sample_cache_invalidation():
+    decoded = []
+    cache = lat.SampleCache(decoder=counting_decoder(decoded))
+    for sound_path in ('a.mp3', 'b.mp3'):
+        cache.get_bank(sound_path)
+    bank_bytes = cache.total_bytes // 2
+    cache.invalidate('a.mp3')
+    cache.invalidate('missing.mp3')
+    assert list(cache._banks) == ['b.mp3'] and cache.total_bytes == bank_bytes
+    cache.get_bank('a.mp3')
+    cache.invalidate()
+    assert not cache._banks and cache.total_bytes == 0
+    assert decoded == ['a.mp3', 'b.mp3', 'a.mp3']
+
+
+def test_swapped_sounds_are_dropped_from_the_cache(make_controller):
+    controller, loop = make_controller()
+    cache = controller.sound_player.cache
+    cache.decoder = decoder
+    enter_sound = controller.config.enter_sound_path
+    cache.get_bank(enter_sound)
+    controller.apply_settings({'enter_sound_path': 'other.mp3'})
+    assert enter_sound not in cache._banks
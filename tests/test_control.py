@@ -0,0 +1,180 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+import lazy_ass_timer as lat
+import lazy_ass_timer_sim as sim
+from lazy_ass_timer_control import ControlClient, ControlServer
+
+
+@pytest.fixture
+def timer(tmp_path):
+    # Controller on a HeadlessLoop thread, like --headless, with the control socket in tmp_path
+    loop = lat.HeadlessLoop()
+    config = lat.SettingsSnapshot({**lat.DEFAULT_SETTINGS, 'enable_sounds': False, 'record_activity': False,
+                                   'control_server': False})
+    controller = lat.TimerController(loop, home=str(tmp_path), config=config, persist=False,
+                                     focus_provider=lat.ScriptedFocusProvider(['explorer.exe']),
+                                     input_backend=lat.ReplayInputBackend(),
+                                     process_table=lat.FakeProcessTable(),
+                                     sound_player=lat.SoundPlayer(sink=lat.NullAudioSink()),
+                                     activity=sim.ActivityTally(time.monotonic))
+    controller.start()
+    thread = threading.Thread(target=loop.run, daemon=True)
+    thread.start()
+    yield controller
+    if controller.control_server is not None:
+        controller.control_server.stop()
+    loop.post(loop.stop)
+    thread.join(timeout=5)
+    controller.close()
+
+
+def start_server(controller, **kwargs):
+    server = ControlServer(controller, **kwargs)
+    server.start()
+    assert server.wait_ready()
+    controller.control_server = server
+    return server
+
+
+def on_loop(controller, function):
+    # Run function on the timer's loop thread and return its result
+    done = threading.Event()
+    result = []
+    controller.loop.post(lambda: result.append(function()) or done.set())
+    assert done.wait(5)
+    return result[0]
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return condition()
+
+
+def test_requests_are_answered_with_their_id_and_the_state(timer):
+    server = start_server(timer)
+    
+    async def run():
+        client = await ControlClient.connect(server.address)
+        try:
+            replies = [await client.request('state'),
+                       await client.request('edit', remaining_seconds=600),
+                       await client.request('start'),
+                       await client.request('start'),
+                       await client.request('stats'),
+                       await client.request('edit', remaining_seconds=-1)]
+            return replies
+        finally:
+            await client.close()
+    
+    state, edit, start, start_again, stats, bad_edit = asyncio.run(run())
+    assert [reply['id'] for reply in (state, edit, start, start_again, stats)] == [1, 2, 3, 4, 5]
+    assert state['ok'] and not state['state']['running']
+    assert edit['state']['remaining_seconds'] == 600
+    assert start['state']['running'] and start_again['state']['running']
+    assert stats['stats']['control']['requests'] == 5
+    assert not bad_edit['ok'] and 'remaining_seconds' in bad_edit['error']
+    assert server.requests == 6
+
+
+def test_unknown_ops_and_bad_lines_get_errors(timer):
+    server = start_server(timer)
+    
+    async def run():
+        if isinstance(server.address, str):
+            reader, writer = await asyncio.open_unix_connection(server.address)
+        else:
+            reader, writer = await asyncio.open_connection(*server.address)
+        writer.write(b'{"id": 1, "op": "launch"}\nnot json\n{"id": 2}\n')
+        lines = [await reader.readline() for _ in range(3)]
+        writer.close()
+        return lines
+    
+    replies = [json.loads(line) for line in asyncio.run(run())]
+    assert [(reply['id'], reply['ok']) for reply in replies] == [(1, False), (None, False), (2, False)]
+    assert "unknown op 'launch'" in replies[0]['error']
+
+
+def test_subscribers_get_each_state_change_once(timer):
+    server = start_server(timer)
+    
+    async def run():
+        client = await ControlClient.connect(server.address)
+        try:
+            assert (await client.request('subscribe'))['ok']
+            for seconds in (500, 400, 400):
+                await client.request('edit', remaining_seconds=seconds)
+            states = []
+            while len(states) < 2:
+                states.append((await asyncio.wait_for(client.states.get(), 5))[1]['remaining_seconds'])
+            await asyncio.sleep(0.1)
+            return states, client.states.qsize()
+        finally:
+            await client.close()
+    
+    assert asyncio.run(run()) == ([500, 400], 0)
+
+
+def test_a_subscriber_that_stops_reading_is_evicted(timer):
+    server = start_server(timer)
+    
+    async def run():
+        healthy = await ControlClient.connect(server.address)
+        slow = await ControlClient.connect(server.address, limit=4096)
+        try:
+            for client in (healthy, slow):
+                await client.request('subscribe')
+            slow._receiver.cancel()
+            # State changes straight on the timer's loop, a few per millisecond
+            for seconds in range(1000, 11000, 5):
+                for offset in range(5):
+                    timer.loop.post(lambda seconds=seconds + offset: timer.set_remaining(seconds))
+                await asyncio.sleep(0.002)
+                if server.evicted:
+                    break
+            return await healthy.request('state'), len(server.subscribers)
+        finally:
+            await healthy.close()
+            await slow.close()
+    
+    reply, subscribers = asyncio.run(run())
+    assert server.evicted == 1 and reply['ok'] and subscribers == 1
+
+
+def test_the_controller_holds_the_server_from_the_first_call(timer):
+    # Settings applied again before the server's thread got to run don't start a second one
+    starter = on_loop(timer, lambda: timer.apply_settings({'control_server': True}) or timer.control_server)
+    assert starter is not None
+    on_loop(timer, lambda: timer.apply_settings({'max_sound_voices': 5}))
+    assert timer.control_server is starter
+    assert wait_for(lambda: starter.server is not None and starter.server.wait_ready(0))
+    assert on_loop(timer, timer.stats)['control'] == {'requests': 0, 'evicted': 0, 'broadcasts': 0}
+    on_loop(timer, lambda: timer.apply_settings({'control_server': False}))
+    assert timer.control_server is None and not starter.server._thread
+
+
+class DeferredThread:
+    # Runs its target only when the test says so
+    
+    started = []
+    
+    def __init__(self, target, args=(), daemon=None):
+        self.run = lambda: target(*args)
+    
+    def start(self):
+        self.started.append(self)
+
+
+def test_a_server_stopped_before_it_exists_never_starts(timer, monkeypatch):
+    monkeypatch.setattr(lat.threading, 'Thread', DeferredThread)
+    starter = lat.ControlServerStarter(timer)
+    starter.stop()
+    monkeypatch.undo()
+    DeferredThread.started.pop().run()
+    assert starter.server is None and starter.stats()['requests'] == 0
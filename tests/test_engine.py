@@ -0,0 +1,114 @@
+import lazy_ass_timer as lat
+
+
+class FakeClock:
+    # Nanoseconds, moved by hand; a stall is just a big jump between two reads
+    
+    def __init__(self):
+        self.now = 0
+    
+    def __call__(self):
+        return self.now
+    
+    def advance(self, seconds):
+        self.now += int(seconds * 1_000_000_000)
+
+
+def make_engine(duration_seconds=3600, targets=(lat.ANY_TARGET,)):
+    clock = FakeClock()
+    return lat.TimerEngine(duration_seconds, targets, clock), clock
+
+
+def test_counts_only_while_running_and_focused():
+    engine, clock = make_engine()
+    clock.advance(100)
+    engine.start()
+    clock.advance(100)
+    assert engine.remaining_us() == 3600 * 1_000_000
+    engine.set_focused(True)
+    clock.advance(100)
+    engine.set_focused(False)
+    clock.advance(100)
+    assert engine.remaining_us() == 3500 * 1_000_000
+
+
+def test_no_drift_across_stalls():
+    # A stalled loop samples late and rarely; the remaining time only depends on the clock
+    engine, clock = make_engine()
+    engine.set_focused(True)
+    engine.start()
+    for stall in (0.001, 0.25, 7.5, 0.5, 120, 0.003):
+        clock.advance(stall)
+        engine.remaining()
+    assert engine.remaining_us() == 3600 * 1_000_000 - 128_254_000
+
+
+def test_ten_thousand_ticks_sum_exactly():
+    engine, clock = make_engine()
+    engine.set_focused(True)
+    engine.start()
+    for _ in range(10_000):
+        clock.advance(0.1)
+        engine.remaining()
+    assert engine.remaining_us() == 2600 * 1_000_000
+
+
+def test_pause_and_resume_across_a_stall():
+    engine, clock = make_engine()
+    engine.set_focused(True)
+    engine.start()
+    clock.advance(10)
+    engine.pause()
+    clock.advance(3 * 3600)  # asleep while paused
+    assert engine.remaining_us() == 3590 * 1_000_000
+    engine.start()
+    clock.advance(0.5)
+    assert engine.remaining_us() == 3589_500_000
+
+
+def test_set_remaining_rebases_the_running_segment():
+    engine, clock = make_engine()
+    engine.set_focused(True)
+    engine.start()
+    clock.advance(30)
+    engine.set_remaining(60)
+    assert engine.remaining_us() == 60 * 1_000_000
+    clock.advance(15)
+    assert engine.remaining_us() == 45 * 1_000_000
+    engine.subtract(5)
+    assert engine.remaining_us() == 40 * 1_000_000
+
+
+def test_expires_exactly_at_zero():
+    engine, clock = make_engine(10)
+    engine.set_focused(True)
+    engine.start()
+    clock.advance(9.999999999)
+    assert not engine.is_expired()
+    assert engine.time_to_expiry() == 1e-9
+    clock.advance(1e-9)
+    assert engine.is_expired()
+    assert engine.remaining_us() == 0
+
+
+def test_weights_and_budgets():
+    targets = [lat.TargetRule('a.exe', 'exact', 0, 2.0), lat.TargetRule('b.exe', 'exact', 60, 1.0)]
+    engine, clock = make_engine(3600, targets)
+    engine.start()
+    engine.set_target(0)
+    clock.advance(100)
+    engine.set_target(1)
+    clock.advance(100)  # only the first 60 seconds count
+    assert engine.remaining_us() == (3600 - 200 - 60) * 1_000_000
+    assert not engine.counting
+
+
+def test_gated_time_does_not_count():
+    engine, clock = make_engine()
+    engine.set_focused(True)
+    engine.start()
+    engine.set_gated(True)
+    clock.advance(100)
+    engine.set_gated(False)
+    clock.advance(1)
+    assert engine.remaining_us() == 3599 * 1_000_000
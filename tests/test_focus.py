@@ -0,0 +1,72 @@
+import sys
+import types
+
+import lazy_ass_timer as lat
+
+
+def make_cache(max_entries=256):
+    table = lat.FakeProcessTable()
+    table.spawn(10, 4, 'pycharm64.exe')
+    table.spawn(20, 4, 'chrome.exe')
+    return table, lat.ProcessNameCache(table, max_entries)
+
+
+def test_name_cache_hits_after_the_first_lookup():
+    table, cache = make_cache()
+    assert cache.get(10) == 'pycharm64.exe'
+    assert cache.get(10) == 'pycharm64.exe'
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_name_cache_resolves_a_reused_pid_again():
+    table, cache = make_cache()
+    assert cache.get(10) == 'pycharm64.exe'
+    table.exit(10)
+    assert cache.get(10) is None
+    table.spawn(10, 4, 'notepad.exe')
+    assert cache.get(10) == 'notepad.exe'
+    # Reused without the cache seeing the exit, the create time gives it away
+    table.spawn(10, 4, 'cmd.exe')
+    assert cache.get(10) == 'cmd.exe'
+    assert cache.hits == 0
+
+
+def test_name_cache_stays_within_its_bound():
+    table, cache = make_cache(max_entries=2)
+    table.spawn(30, 4, 'code.exe')
+    for pid in (10, 20, 30):
+        cache.get(pid)
+    assert list(cache._entries) == [20, 30]
+    cache.get(20)
+    cache.get(10)
+    assert list(cache._entries) == [20, 10]
+
+
+def test_subscribers_only_hear_about_changes():
+    focus = lat.ScriptedFocusProvider(['pycharm64.exe', 'pycharm64.exe', None, 'chrome.exe'])
+    changes = []
+    focus.subscribe(changes.append)
+    for _ in range(5):
+        focus.poll()
+    assert [snapshot.process_name for snapshot in changes] == ['pycharm64.exe', None, 'chrome.exe']
+    focus.unsubscribe(changes.append)
+    focus.set_focus('code.exe')
+    assert len(changes) == 3 and focus.current.process_name == 'code.exe'
+
+
+def test_win32_provider_resolves_only_new_windows(monkeypatch):
+    windows = {100: 10, 200: 20}
+    foreground = [100]
+    monkeypatch.setitem(sys.modules, 'win32gui', types.SimpleNamespace(GetForegroundWindow=lambda: foreground[0]))
+    monkeypatch.setitem(sys.modules, 'win32process',
+                        types.SimpleNamespace(GetWindowThreadProcessId=lambda hwnd: (1, windows[hwnd])))
+    table, cache = make_cache()
+    focus = lat.Win32FocusProvider(cache)
+    assert focus.poll().process_name == 'pycharm64.exe'
+    for _ in range(10):
+        focus.poll()
+    assert cache.hits + cache.misses == 1
+    foreground[0] = 200
+    assert focus.poll()[1:3] == (20, 'chrome.exe')
+    foreground[0] = 0
+    assert focus.poll() == lat.NO_FOCUS._replace(timestamp=focus.current.timestamp)
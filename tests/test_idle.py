@@ -0,0 +1,161 @@
+import lazy_ass_timer as lat
+
+
+class FakeClock:
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+def make_detector(timeout=60):
+    # The owner's timer is a list of armed delays; the test fires it by hand
+    clock = FakeClock()
+    armed = []
+    detector = lat.IdleDetector(timeout, armed.append, clock)
+    changes = []
+    detector.subscribe(changes.append)
+    detector.start()
+    return detector, clock, armed, changes
+
+
+def fire(detector, clock):
+    clock.now = detector.deadline
+    detector.on_deadline()
+
+
+def test_goes_idle_once_at_the_timeout_and_back_on_activity():
+    detector, clock, armed, changes = make_detector()
+    assert armed == [60]
+    fire(detector, clock)
+    assert detector.idle and changes == [True]
+    assert detector.deadline is None  # no polling while idle
+    clock.now = 500
+    detector.on_activity()
+    assert not detector.idle and changes == [True, False]
+    assert detector.deadline == 560
+
+
+def test_activity_does_not_re_arm_a_pending_deadline():
+    detector, clock, armed, changes = make_detector()
+    for now in (10, 20, 30):
+        clock.now = now
+        detector.on_activity()
+    assert armed == [60]
+    fire(detector, clock)
+    # The deadline found activity since, and re-armed for the rest of the timeout
+    assert armed == [60, 30] and detector.deadline == 90 and not changes
+    fire(detector, clock)
+    assert changes == [True]
+
+
+def test_late_activity_timestamps_count_from_when_they_happened():
+    detector, clock, armed, changes = make_detector()
+    clock.now = 59
+    detector.on_activity(timestamp=30)
+    fire(detector, clock)
+    assert detector.deadline == 90 and not changes
+
+
+def test_shorter_timeout_applies_right_away():
+    detector, clock, armed, changes = make_detector()
+    clock.now = 20
+    detector.set_timeout(10)
+    assert changes == [True]
+
+
+def test_os_idle_time_covers_input_no_hook_saw():
+    clock = FakeClock()
+    backend = lat.FakeIdleBackend(clock)
+    detector = lat.IdleDetector(60, lambda delay: None, clock, backend=backend)
+    detector.start()
+    clock.now = 50
+    backend.input()
+    clock.now = 60
+    detector.on_deadline()
+    assert not detector.idle and detector.deadline == 110
+    clock.now = 110
+    detector.on_deadline()
+    assert detector.idle
+    clock.now = 200
+    detector.poll()
+    assert detector.idle
+    backend.input()
+    detector.poll()
+    assert not detector.idle
+
+
+def auto_pauses(controller):
+    return controller.activity.counts[lat.ACTIVITY_TIMER_STOP]
+
+
+def test_auto_pause_fires_once_per_idle_period(make_controller):
+    focus = lat.ScriptedFocusProvider(['chrome.exe'])
+    controller, loop = make_controller({'idle_timeout_seconds': 60}, focus)
+    controller.toggle_timer()
+    loop.advance(61)
+    assert controller.auto_paused and not controller.engine.running
+    assert auto_pauses(controller) == 1
+    # Switching between other apps while still idle doesn't pause or alert again
+    focus.set_focus('explorer.exe')
+    focus.set_focus('chrome.exe')
+    loop.advance(600)
+    assert auto_pauses(controller) == 1
+    # Activity resumes the timer, and the next idle period pauses it again
+    controller.on_input_batch(lat.InputBatch(5, 0, 0, loop.now, loop.now, 0))
+    assert controller.engine.running and not controller.auto_paused
+    loop.advance(loop.now + 61)
+    assert auto_pauses(controller) == 2
+
+
+def test_auto_pause_status_shows_a_timeout_under_a_minute(make_controller):
+    controller, loop = make_controller({'idle_timeout_seconds': 45}, lat.ScriptedFocusProvider(['chrome.exe']))
+    controller.toggle_timer()
+    loop.advance(46)
+    assert controller.status_message == "Auto-paused after 0:00:45 of inactivity"
+
+
+def test_idling_in_a_target_does_not_auto_pause(make_controller):
+    controller, loop = make_controller({'idle_timeout_seconds': 60}, lat.ScriptedFocusProvider(['pycharm64.exe']))
+    controller.toggle_timer()
+    loop.advance(600)
+    assert controller.idle_detector.idle and controller.engine.running
+
+
+class FakeMouseBackend:
+    
+    def __init__(self):
+        self.on_activity = None
+    
+    def start(self, on_activity):
+        self.on_activity = on_activity
+    
+    def stop(self):
+        self.on_activity = None
+    
+    def move(self, timestamp):
+        if self.on_activity is not None:
+            self.on_activity(timestamp)
+
+
+def test_mouse_activity_only_counts_when_switched_on(make_controller, monkeypatch):
+    mice = []
+    monkeypatch.setattr(lat, 'MouseHookBackend', lambda: mice.append(FakeMouseBackend()) or mice[-1])
+    controller, loop = make_controller({'idle_timeout_seconds': 60}, lat.ScriptedFocusProvider(['chrome.exe']))
+    assert not mice
+    loop.advance(61)
+    assert controller.idle_detector.idle
+    
+    controller.apply_settings({'count_mouse_activity': True})
+    mouse = mice[-1]
+    for now in range(70, 300, 10):
+        mouse.move(now)
+        loop.advance(now)
+    assert not controller.idle_detector.idle
+    
+    controller.apply_settings({'count_mouse_activity': False})
+    assert mouse.on_activity is None
+    loop.advance(loop.now + 61)
+    assert controller.idle_detector.idle
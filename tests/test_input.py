@@ -0,0 +1,66 @@
+import lazy_ass_timer as lat
+
+
+def test_ring_drains_counts_and_the_time_span():
+    ring = lat.InputRing(8)
+    assert ring.drain() is None
+    for timestamp, kind in ((1.0, lat.KEY_EVENT), (2.0, lat.ENTER_EVENT), (3.0, lat.KEY_EVENT)):
+        ring.push(timestamp, kind)
+    assert ring.drain() == lat.InputBatch(2, 1, 0, 1.0, 3.0, 0)
+    assert ring.drain() is None
+
+
+def test_ring_overrun_keeps_the_newest_and_counts_the_dropped():
+    ring = lat.InputRing(8)
+    for index in range(20):
+        ring.push(float(index), lat.ENTER_EVENT if index < 12 else lat.KEY_EVENT)
+    batch = ring.drain()
+    assert batch == lat.InputBatch(8, 0, 0, 12.0, 19.0, 12)
+    # Wrapping around without an overrun drops nothing
+    for index in range(20, 27):
+        ring.push(float(index), lat.KEY_EVENT)
+    assert ring.drain() == lat.InputBatch(7, 0, 0, 20.0, 26.0, 0)
+
+
+def make_monitor(**kwargs):
+    backend = lat.ReplayInputBackend()
+    chords, batches = [], []
+    monitor = lat.KeyboardMonitor(backend, on_chord=lambda chord, now: chords.append(chord),
+                                  on_batch=batches.append, **kwargs)
+    monitor.start_monitoring()
+    return monitor, backend, chords, batches
+
+
+def test_monitor_forwards_bound_chords_and_batches_the_rest():
+    monitor, backend, chords, batches = make_monitor(bound_keys=frozenset([lat.ENTER_CHORD, (1, 's')]))
+    backend.replay(['a', 'b', 'enter', 'ctrl+s', 'S', 'shift+s'])
+    assert chords == [lat.ENTER_CHORD, (1, 's')]
+    assert not batches
+    batch = monitor.flush()
+    # Modifier presses count as keystrokes, releases don't
+    assert (batch.keys, batch.enters, batch.overruns) == (7, 1, 0)
+    assert batches == [batch]
+    assert monitor.flush() is None and batches == [batch]
+
+
+def test_monitor_batch_reports_keys_dropped_by_an_overrun():
+    monitor, backend, chords, batches = make_monitor()
+    monitor.ring = lat.InputRing(16)
+    backend.replay(['a'] * 50)
+    assert monitor.flush().overruns == 34
+
+
+def test_monitor_merges_mouse_events_into_the_batch():
+    monitor, backend, chords, batches = make_monitor()
+    monitor._on_mouse(0.5)
+    monitor._on_mouse(0.75)
+    backend.replay(['a'])
+    batch = monitor.flush()
+    assert (batch.keys, batch.mouse, batch.first_time) == (1, 2, 0.5)
+
+
+def test_keys_go_nowhere_while_the_hook_is_off():
+    monitor, backend, chords, batches = make_monitor()
+    monitor.set_key_hook(False)
+    backend.replay(['a', 'enter'])
+    assert monitor.flush() is None and not chords
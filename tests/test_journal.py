@@ -0,0 +1,63 @@
+import os
+
+import pytest
+
+import lazy_ass_timer as lat
+
+
+def test_last_good_record_survives_a_torn_line(tmp_path):
+    path = str(tmp_path / 'state.journal')
+    journal = lat.StateJournal(path)
+    journal.append({'remaining': 100})
+    journal.append({'remaining': 90})
+    journal.close()
+    # Killed halfway through the next append
+    with open(path, 'a') as f:
+        f.write(lat.StateJournal._encode({'remaining': 80})[:12])
+    journal = lat.StateJournal(path)
+    assert journal.load() == {'remaining': 90}
+    assert journal.records_since_compaction == 3
+
+
+def test_records_failing_their_checksum_are_skipped(tmp_path):
+    path = str(tmp_path / 'state.journal')
+    good = lat.StateJournal._encode({'remaining': 100})
+    flipped = lat.StateJournal._encode({'remaining': 90}).replace('90', '91')
+    with open(path, 'w') as f:
+        f.write(good + flipped + "not a record\n\n")
+    assert lat.StateJournal(path).load() == {'remaining': 100}
+    assert lat.StateJournal(str(tmp_path / 'missing.journal')).load() is None
+
+
+def test_journal_is_compacted_to_the_latest_record(tmp_path):
+    path = str(tmp_path / 'state.journal')
+    journal = lat.StateJournal(path, compact_after=4)
+    for remaining in range(10):
+        journal.append({'remaining': remaining})
+    journal.close()
+    with open(path) as f:
+        lines = f.readlines()
+    # Compacted at the fifth and the ninth append
+    assert len(lines) == 2
+    reloaded = lat.StateJournal(path, compact_after=4)
+    assert reloaded.load() == {'remaining': 9} and reloaded.records_since_compaction == 2
+    assert os.listdir(tmp_path) == ['state.journal']
+
+
+def test_write_atomic_replaces_the_file_whole(tmp_path):
+    path = str(tmp_path / 'settings.json')
+    lat.write_atomic(path, 'old')
+    lat.write_atomic(path, 'new')
+    with open(path) as f:
+        assert f.read() == 'new'
+    assert os.listdir(tmp_path) == ['settings.json']
+
+
+def test_write_atomic_leaves_the_old_file_when_writing_fails(tmp_path):
+    path = str(tmp_path / 'settings.json')
+    lat.write_atomic(path, 'old')
+    with pytest.raises(UnicodeEncodeError):
+        lat.write_atomic(path, '\ud800')
+    with open(path) as f:
+        assert f.read() == 'old'
+    assert os.listdir(tmp_path) == ['settings.json']
@@ -0,0 +1,60 @@
+import lazy_ass_timer as lat
+
+
+def test_hook_follows_target_focus(make_controller):
+    focus = lat.ScriptedFocusProvider(['chrome.exe'])
+    controller, loop = make_controller(focus=focus, idle_backend=lat.FakeIdleBackend)
+    assert not controller.keyboard_monitor.key_hook_active
+    focus.set_focus('pycharm64.exe')
+    assert controller.keyboard_monitor.key_hook_active
+    focus.set_focus('chrome.exe')
+    assert not controller.keyboard_monitor.key_hook_active
+
+
+def test_hook_stays_on_without_an_os_idle_time(make_controller):
+    controller, loop = make_controller(focus=lat.ScriptedFocusProvider(['chrome.exe']))
+    assert controller.keyboard_monitor.key_hook_active
+
+
+def test_hook_stays_on_for_rules_outside_the_targets(make_controller):
+    controller, loop = make_controller({'reward_rules': [{'keys': 'f5', 'seconds': 1, 'target': None}]},
+                                       lat.ScriptedFocusProvider(['chrome.exe']), lat.FakeIdleBackend)
+    assert controller.keyboard_monitor.key_hook_active
+
+
+def test_setting_turns_gating_off(make_controller):
+    controller, loop = make_controller(focus=lat.ScriptedFocusProvider(['chrome.exe']),
+                                       idle_backend=lat.FakeIdleBackend)
+    controller.apply_settings({'hook_keys_only_in_targets': False})
+    assert controller.keyboard_monitor.key_hook_active
+    controller.apply_settings({'hook_keys_only_in_targets': True})
+    assert not controller.keyboard_monitor.key_hook_active
+
+
+def test_os_idle_time_that_counts_the_mouse_needs_mouse_activity_to_count(make_controller):
+    controller, loop = make_controller(focus=lat.ScriptedFocusProvider(['chrome.exe']),
+                                       idle_backend=lambda clock: lat.FakeIdleBackend(clock, counts_mouse=True))
+    assert controller.idle_detector.backend is None
+    assert controller.keyboard_monitor.key_hook_active
+
+
+def test_os_idle_time_keeps_the_user_active_and_notices_the_return(make_controller):
+    controller, loop = make_controller({'idle_timeout_seconds': 60}, lat.ScriptedFocusProvider(['chrome.exe']),
+                                       lat.FakeIdleBackend)
+    idle = controller.idle_backend
+    for now in range(10, 200, 10):
+        idle.input()
+        loop.advance(now)
+    assert not controller.idle_detector.idle
+    loop.advance(400)
+    assert controller.idle_detector.idle
+    idle.input()
+    loop.advance(402)  # the next focus poll
+    assert not controller.idle_detector.idle
+
+
+def test_win32_key_names_match_the_chord_names():
+    names = lat.win32_key_names()
+    assert (names[0x0D], names[0x53], names[0x74], names[0x2E]) == ('enter', 's', 'f5', 'delete')
+    for code in (0x10, 0x11, 0x12, 0xA0, 0xA1, 0xA2, 0xA3, 0xA4, 0xA5, 0x5B, 0x5C):
+        assert names[code] in lat.MODIFIER_BITS
@@ -0,0 +1,98 @@
+import urllib.error
+import urllib.request
+
+import pytest
+
+import lazy_ass_timer as lat
+
+
+def test_observations_land_in_the_first_bucket_at_or_above_them():
+    histogram = lat.Histogram((1.0, 2.0, 5.0))
+    for value in (0.5, 1.0, 1.5, 2.0, 4.0, 7.0):
+        histogram.observe(value)
+    assert list(histogram.counts) == [2, 2, 1, 1]
+    assert (histogram.count, histogram.sum, histogram.max) == (6, 16.0, 7.0)
+
+
+def test_quantiles_are_bucket_upper_bounds():
+    histogram = lat.Histogram((1.0, 2.0, 5.0))
+    assert histogram.quantile(0.5) is None
+    for value in (0.5, 0.6, 1.5, 3.0):
+        histogram.observe(value)
+    assert histogram.quantile(0.5) == 1.0
+    assert histogram.quantile(0.75) == 2.0
+    # Capped by the largest value seen, and the last bucket reports it
+    assert histogram.quantile(1.0) == 3.0
+    histogram.observe(9.0)
+    assert histogram.quantile(1.0) == 9.0
+
+
+def make_metrics():
+    metrics = lat.Metrics()
+    # Two buckets keep the expected text short
+    metrics.histograms[('lazy_timer_loop_stall_seconds', (('job', 'tick'),))] = lat.Histogram((0.001, 0.01))
+    metrics.observe('lazy_timer_loop_stall_seconds', 0.0005, job='tick')
+    metrics.observe('lazy_timer_loop_stall_seconds', 0.02, job='tick')
+    metrics.observe('lazy_timer_io_seconds', 0.004)
+    wakeups = [3]
+    metrics.add_counter('lazy_timer_wakeups_total', "Scheduler wakeups", lambda: wakeups[0])
+    return metrics, wakeups
+
+
+def test_prometheus_text():
+    metrics, wakeups = make_metrics()
+    lines = metrics.prometheus_text().splitlines()
+    io = lines.index('# TYPE lazy_timer_io_seconds histogram')
+    assert lines[io - 1] == f"# HELP lazy_timer_io_seconds {lat.METRIC_HELP['lazy_timer_io_seconds']}"
+    assert 'lazy_timer_io_seconds_bucket{le="0.0025"} 0' in lines
+    assert 'lazy_timer_io_seconds_bucket{le="0.005"} 1' in lines
+    assert 'lazy_timer_io_seconds_bucket{le="+Inf"} 1' in lines
+    assert 'lazy_timer_io_seconds_count 1' in lines
+    stall = lines.index('# TYPE lazy_timer_loop_stall_seconds histogram')
+    assert lines[stall + 1:stall + 6] == [
+        'lazy_timer_loop_stall_seconds_bucket{job="tick",le="0.001"} 1',
+        'lazy_timer_loop_stall_seconds_bucket{job="tick",le="0.01"} 1',
+        'lazy_timer_loop_stall_seconds_bucket{job="tick",le="+Inf"} 2',
+        'lazy_timer_loop_stall_seconds_sum{job="tick"} 0.0205',
+        'lazy_timer_loop_stall_seconds_count{job="tick"} 2']
+    # Counters are read at export
+    wakeups[0] = 10
+    assert metrics.prometheus_text().endswith(
+        "# HELP lazy_timer_wakeups_total Scheduler wakeups\n# TYPE lazy_timer_wakeups_total counter\n"
+        "lazy_timer_wakeups_total 10\n")
+
+
+def test_summary():
+    metrics, wakeups = make_metrics()
+    summary = metrics.summary()
+    assert summary['lazy_timer_loop_stall_seconds{job=tick}'] == {
+        'count': 2, 'mean_ms': pytest.approx(10.25), 'p50_ms': 1.0, 'p99_ms': 20.0, 'max_ms': 20.0}
+    assert summary['lazy_timer_io_seconds']['count'] == 1
+    assert summary['lazy_timer_wakeups_total'] == 3
+
+
+def test_metrics_server_serves_the_text():
+    metrics, wakeups = make_metrics()
+    server = lat.MetricsServer(metrics, 0)
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics", timeout=5) as response:
+            assert response.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+            assert response.read().decode() == metrics.prometheus_text()
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"http://127.0.0.1:{server.port}/other", timeout=5)
+    finally:
+        server.stop()
+
+
+def test_controller_collects_only_while_switched_on(make_controller):
+    controller, loop = make_controller(focus=lat.ScriptedFocusProvider(['pycharm64.exe']))
+    assert controller.metrics is None and controller.scheduler.metrics is None
+    controller.apply_settings({'collect_metrics': True})
+    controller.toggle_timer()
+    loop.advance(10)
+    summary = controller.stats()['metrics']
+    assert summary['lazy_timer_loop_stall_seconds{job=input}']['count'] == 10
+    assert summary['lazy_timer_focus_poll_seconds']['count'] == 5
+    assert summary['lazy_timer_wakeups_total'] == controller.scheduler.wakeups
+    controller.apply_settings({'collect_metrics': False})
+    assert controller.metrics is None and controller.stats()['metrics'] is None
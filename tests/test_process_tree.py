@@ -0,0 +1,74 @@
+import lazy_ass_timer as lat
+
+
+def make_tree():
+    # explorer -> pycharm -> cmd -> python; chrome on its own
+    table = lat.FakeProcessTable()
+    table.spawn(4, 0, 'explorer.exe')
+    table.spawn(10, 4, 'pycharm64.exe')
+    table.spawn(11, 10, 'cmd.exe')
+    table.spawn(12, 11, 'python.exe')
+    table.spawn(20, 4, 'chrome.exe')
+    ancestry = lat.AncestryCache(table)
+    matcher = lat.ProcessTreeMatcher(lat.TargetMatcher([lat.TargetRule('pycharm64.exe', 'exact', 0, 1.0)]),
+                                     ancestry, lat.ProcessNameCache(table))
+    return table, ancestry, matcher
+
+
+def test_descendants_of_a_target_count_as_the_target():
+    table, ancestry, matcher = make_tree()
+    assert list(ancestry.ancestors(12)) == [11, 10, 4]
+    assert matcher.match(10, 'pycharm64.exe') == 0
+    assert matcher.match(12, 'python.exe') == 0
+    assert matcher.match(20, 'chrome.exe') is None
+    assert matcher.match(0, None) is None
+
+
+def test_a_reused_parent_pid_ends_the_walk():
+    table, ancestry, matcher = make_tree()
+    assert matcher.match(12, 'python.exe') == 0
+    # pycharm exits and its pid goes to a newer process; cmd's parent is gone
+    table.exit(10)
+    table.spawn(10, 4, 'pycharm64.exe')
+    ancestry.sync()
+    assert list(ancestry.ancestors(12)) == [11]
+    assert matcher.match(12, 'python.exe') is None
+
+
+def test_sync_adds_and_removes_processes():
+    table, ancestry, matcher = make_tree()
+    ancestry.sync()
+    table.spawn(30, 10, 'git.exe')
+    table.exit(12)
+    # The cache still answers from what it had until the next sync
+    table.exit(11)
+    assert list(ancestry.ancestors(12)) == [11, 10, 4]
+    ancestry.sync()
+    assert list(ancestry.ancestors(12)) == []
+    assert 30 in ancestry._entries and 12 not in ancestry._entries
+    del table.processes[10]  # started entries need no table lookup
+    assert list(ancestry.ancestors(30)) == [10, 4]
+
+
+def test_cache_stays_within_its_bound():
+    table = lat.FakeProcessTable()
+    table.spawn(1, 0, 'root.exe')
+    for pid in range(2, 50):
+        table.spawn(pid, pid - 1, f"p{pid}.exe")
+    ancestry = lat.AncestryCache(table, max_entries=8)
+    assert len(list(ancestry.ancestors(49))) == 32  # max_depth
+    assert len(ancestry._entries) == 8
+    ancestry.sync()
+    assert len(ancestry._entries) == 8
+
+
+def test_controller_counts_child_processes_when_switched_on(make_controller):
+    focus = lat.ScriptedFocusProvider()
+    controller, loop = make_controller({'include_child_processes': True}, focus)
+    table = controller.process_table
+    table.spawn(10, 4, 'pycharm64.exe')
+    table.spawn(11, 10, 'cmd.exe')
+    focus.set_focus('cmd.exe', pid=11)
+    assert controller.engine.focused
+    controller.apply_settings({'include_child_processes': False})
+    assert not controller.engine.focused
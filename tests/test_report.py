@@ -0,0 +1,110 @@
+import os
+from datetime import date, datetime, timedelta
+
+import pytest
+
+import lazy_ass_timer as lat
+
+np = pytest.importorskip('numpy')
+
+STRINGS = ['', 'pycharm64.exe', 'chrome.exe', 'explorer.exe']
+DAY = date.today() - timedelta(days=3)
+
+
+def write_day(directory, day, rows, append=False):
+    # rows of (seconds after 09:00, event, process, value)
+    with open(os.path.join(directory, 'strings.txt'), 'w') as f:
+        f.write('\n'.join(STRINGS) + '\n')
+    log = lat.ActivityLog(str(directory))
+    nine = datetime(day.year, day.month, day.day, 9).timestamp()
+    with open(log.day_path(day), 'ab' if append else 'wb') as f:
+        for offset, event, process, value in rows:
+            f.write(lat.ACTIVITY_RECORD.pack(nine + offset, event, process, value))
+    return log
+
+
+def random_rows(count, seed=0):
+    rng = np.random.default_rng(seed)
+    offsets = np.sort(rng.uniform(0, 9 * 3600, count))
+    events = rng.choice([lat.ACTIVITY_KEYS, lat.ACTIVITY_FOCUS, lat.ACTIVITY_REWARD, lat.ACTIVITY_IDLE,
+                         lat.ACTIVITY_ACTIVE], size=count, p=[0.8, 0.1, 0.04, 0.03, 0.03])
+    processes = rng.integers(1, len(STRINGS), count)
+    rows = []
+    for offset, event, process in zip(offsets, events, processes):
+        if event == lat.ACTIVITY_FOCUS:
+            rows.append((offset, event, process, float(process == 1)))
+        elif event == lat.ACTIVITY_KEYS:
+            rows.append((offset, event, 0, float(rng.integers(1, 12))))
+        else:
+            rows.append((offset, event, 0, 20.0 if event == lat.ACTIVITY_REWARD else 0.0))
+    return rows
+
+
+def test_day_rollup_totals(tmp_path):
+    log = write_day(tmp_path, DAY, [
+        (0, lat.ACTIVITY_FOCUS, 1, 1),
+        (30, lat.ACTIVITY_KEYS, 0, 50),
+        (60, lat.ACTIVITY_REWARD, 0, 20),
+        (100, lat.ACTIVITY_FOCUS, 2, 0),
+        (130, lat.ACTIVITY_FOCUS, 1, 1),
+        (200, lat.ACTIVITY_IDLE, 0, 0),
+        (500, lat.ACTIVITY_ACTIVE, 0, 0),
+        (520, lat.ACTIVITY_FOCUS, 3, 0),
+        (1000, lat.ACTIVITY_FOCUS, 1, 1),  # after a gap longer than max_gap
+    ])
+    rollup = lat.ActivityReport(log, use_cache=False).rollups()[0]
+    assert rollup['focused_seconds'] == 190
+    assert rollup['process_seconds'] == {'pycharm64.exe': 190, 'chrome.exe': 30}
+    assert (rollup['rewards'], rollup['reward_seconds'], rollup['idle_pauses'], rollup['keys']) == (1, 20, 1, 50)
+    assert rollup['longest_streak_seconds'] == 100
+    assert rollup['rate_histogram'][50] == 1
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 64, 1000, 1 << 20])
+def test_results_do_not_depend_on_the_chunk_size(tmp_path, chunk_size):
+    log = write_day(tmp_path, DAY, random_rows(3000))
+    expected = lat.ActivityReport(log, chunk_size=1 << 20, use_cache=False).rollups()[0]
+    rollup = lat.ActivityReport(log, chunk_size=chunk_size, use_cache=False).rollups()[0]
+    assert rollup.keys() == expected.keys()
+    for key, value in expected.items():
+        if isinstance(value, float):
+            assert rollup[key] == pytest.approx(value)
+        elif isinstance(value, dict):
+            assert rollup[key].keys() == value.keys()
+            assert list(rollup[key].values()) == pytest.approx(list(value.values()))
+        else:
+            assert rollup[key] == value
+
+
+def test_rollup_cache_is_used_until_the_day_file_grows(tmp_path):
+    log = write_day(tmp_path, DAY, random_rows(500))
+    report = lat.ActivityReport(log, chunk_size=64)
+    first_keys = report.rollups()[0]['keys']
+    cache_path = tmp_path / 'rollups' / f"{DAY:%Y%m%d}.json"
+    assert cache_path.exists()
+    # A cached rollup is read back as is, even if it no longer matches the records
+    cache_path.write_text(cache_path.read_text().replace('"idle_pauses"', '"cached": true, "idle_pauses"'))
+    assert report.rollups()[0]['cached']
+    write_day(tmp_path, DAY, [(9 * 3600 + 10, lat.ACTIVITY_KEYS, 0, 7)], append=True)
+    rollup = report.rollups()[0]
+    assert 'cached' not in rollup and rollup['keys'] == first_keys + 7
+    assert lat.ActivityReport(log, use_cache=False).rollups()[0] == rollup
+
+
+def test_today_is_never_cached(tmp_path):
+    log = write_day(tmp_path, date.today(), [(0, lat.ACTIVITY_KEYS, 0, 5)])
+    lat.ActivityReport(log).rollups()
+    assert not (tmp_path / 'rollups').exists()
+
+
+def test_totals_add_up_days(tmp_path):
+    write_day(tmp_path, DAY, random_rows(300, seed=1))
+    log = write_day(tmp_path, DAY + timedelta(days=1), random_rows(300, seed=2))
+    report = lat.ActivityReport(log, use_cache=False)
+    rollups = report.rollups()
+    totals = report.totals(rollups)
+    assert len(rollups) == 2
+    assert totals['keys'] == rollups[0]['keys'] + rollups[1]['keys']
+    assert totals['longest_streak_seconds'] == max(rollup['longest_streak_seconds'] for rollup in rollups)
+    assert set(totals['rate_percentiles']) == {50, 90, 99}
+    assert len(report.rollups(first_day=DAY + timedelta(days=1))) == 1
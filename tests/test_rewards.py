@@ -0,0 +1,88 @@
+import pytest
+
+import lazy_ass_timer as lat
+
+TARGETS = [lat.TargetRule('pycharm64.exe', 'exact', 0, 1.0), lat.TargetRule('code.exe', 'exact', 0, 1.0)]
+CTRL_S = (1, 's')
+
+
+class FakeClock:
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+def make_table(*rules, enter_seconds=0):
+    clock = FakeClock()
+    return lat.RewardTable([lat.RewardRule(*rule) for rule in rules], TARGETS, enter_seconds, clock), clock
+
+
+@pytest.mark.parametrize('text, chord', [
+    ('enter', (0, 'enter')),
+    ('Ctrl+S', (1, 's')),
+    ('ctrl + shift + f5', (3, 'f5')),
+    ('ctrl++', (1, '+')),
+    ('+', (0, '+')),
+])
+def test_parse_key_chord(text, chord):
+    assert lat.parse_key_chord(text) == chord
+
+
+@pytest.mark.parametrize('text', ['', 'ctrl', 'ctrl+', '++', 'a+b', 'ctrl+shift'])
+def test_parse_key_chord_rejects(text):
+    with pytest.raises(ValueError):
+        lat.parse_key_chord(text)
+
+
+def test_cooldown_suppresses_repeats():
+    table, clock = make_table(('ctrl+s', 5, '*', 10))
+    assert table.fire(CTRL_S, 0).seconds == 5
+    clock.now = 9.9
+    assert table.fire(CTRL_S, 0) is None
+    clock.now = 10
+    assert table.fire(CTRL_S, 0) is not None
+    assert (table.fired, table.suppressed) == (2, 1)
+
+
+def test_per_minute_cap():
+    table, clock = make_table(('ctrl+s', 5, '*', 0, 3))
+    fired = []
+    for second in range(0, 80, 10):
+        clock.now = second
+        fired.append(table.fire(CTRL_S, 0) is not None)
+    # Three in the first minute, then one more each time the oldest leaves the minute
+    assert fired == [True, True, True, False, False, False, True, True]
+
+
+def test_target_rules_beat_wildcard_rules():
+    table, clock = make_table(('ctrl+s', 5, '*'), ('ctrl+s', 20, 'code.exe'), ('ctrl+s', -5, None))
+    assert table.fire(CTRL_S, 0).seconds == 5
+    assert table.fire(CTRL_S, 1).seconds == 20
+    assert table.fire(CTRL_S, None).seconds == -5
+    assert table.outside_targets
+
+
+def test_enter_rules_override_the_enter_shortcut():
+    table, clock = make_table(enter_seconds=3)
+    assert table.fire(lat.ENTER_CHORD, 0).seconds == 3
+    assert table.fire(lat.ENTER_CHORD, None) is None
+    table, clock = make_table(('enter', 8, '*'), enter_seconds=3)
+    assert table.fire(lat.ENTER_CHORD, 1).seconds == 8
+
+
+def test_unknown_rule_target_is_rejected():
+    with pytest.raises(ValueError):
+        make_table(('ctrl+s', 5, 'vim.exe'))
+
+
+def test_reward_is_taken_off_the_countdown(make_controller):
+    controller, loop = make_controller({'reward_rules': [{'keys': 'ctrl+s', 'seconds': 30, 'cooldown_seconds': 60}],
+                                        'enter_shortcut_seconds': 0, 'default_timer_seconds': 600},
+                                       lat.ScriptedFocusProvider(['pycharm64.exe']))
+    controller.toggle_timer()
+    controller.on_key_chord(CTRL_S)
+    controller.on_key_chord(CTRL_S)
+    assert controller.engine.remaining() == 570
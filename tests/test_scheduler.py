@@ -0,0 +1,105 @@
+import lazy_ass_timer as lat
+
+
+class FakeClock:
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+def make_scheduler(slack=0.005):
+    clock = FakeClock()
+    armed = []
+    return lat.Scheduler(armed.append, clock, slack), clock, armed
+
+
+def run_at(scheduler, clock, now):
+    clock.now = now
+    scheduler.run_due()
+
+
+def test_periodic_jobs_align_to_their_interval():
+    scheduler, clock, armed = make_scheduler()
+    clock.now = 0.3
+    runs = []
+    job = scheduler.call_every(1, lambda: runs.append(clock.now))
+    assert job.deadline == 1 and armed == [0.7]
+    for now in (1.0, 2.25, 3.0):
+        run_at(scheduler, clock, now)
+    # A late run doesn't shift the grid
+    assert runs == [1.0, 2.25, 3.0] and job.deadline == 4
+
+
+def test_rescheduled_and_cancelled_jobs_leave_stale_entries_that_never_run():
+    scheduler, clock, armed = make_scheduler()
+    runs = []
+    job = scheduler.call_later(5, lambda: runs.append(clock.now))
+    scheduler.schedule(job, 10)
+    other = scheduler.call_later(3, lambda: runs.append('other'))
+    scheduler.cancel(other)
+    # Re-arming already dropped the stale entry that reached the top
+    assert len(scheduler._heap) == 2 and scheduler._stale == 1
+    run_at(scheduler, clock, 5)
+    assert runs == [] and scheduler.wakeups == 1
+    run_at(scheduler, clock, 10)
+    assert runs == [10] and not job.scheduled
+    assert not scheduler._heap and scheduler._stale == 0
+
+
+def test_stale_entries_are_compacted_once_they_outnumber_live_ones():
+    scheduler, clock, armed = make_scheduler()
+    job = scheduler.add_job('idle', lambda: None)
+    for delay in range(100):
+        scheduler.schedule(job, 1000 + delay)
+    assert len(scheduler._heap) <= 34
+    assert [entry for entry in scheduler._heap if entry[2] == job.generation][0][0] == 1099
+
+
+def test_only_the_earliest_deadline_arms_the_timer():
+    scheduler, clock, armed = make_scheduler()
+    scheduler.call_later(10, lambda: None)
+    scheduler.call_later(20, lambda: None)
+    scheduler.call_later(5, lambda: None)
+    assert armed == [10, 5]
+    # A job rescheduled from inside a callback is armed once, after the run
+    job = scheduler.add_job('again', None)
+    job.callback = lambda: scheduler.schedule(job, 1)
+    scheduler.schedule(job, 2)
+    run_at(scheduler, clock, 2)
+    assert armed == [10, 5, 2, 1]
+
+
+def test_low_power_moves_periodic_jobs_to_their_longer_interval():
+    scheduler, clock, armed = make_scheduler()
+    job = scheduler.call_every(1, lambda: None, low_power_interval=5)
+    once = scheduler.call_later(2.5, lambda: None)
+    clock.now = 1.5
+    scheduler.set_low_power(True)
+    assert job.deadline == 5 and once.deadline == 2.5
+    run_at(scheduler, clock, 5)
+    assert job.deadline == 10
+    clock.now = 6.2
+    scheduler.set_low_power(False)
+    assert job.deadline == 7 and armed[-1] == 7 - 6.2
+
+
+def test_slack_takes_jobs_due_just_after_an_early_wakeup():
+    scheduler, clock, armed = make_scheduler(slack=0.005)
+    runs = []
+    scheduler.call_later(1.003, lambda: runs.append('soon'))
+    scheduler.call_later(1.01, lambda: runs.append('later'))
+    run_at(scheduler, clock, 1.0)
+    assert runs == ['soon']
+
+
+def test_slack_does_not_rerun_a_job_queued_during_the_wakeup():
+    scheduler, clock, armed = make_scheduler(slack=0.005)
+    runs = []
+    job = scheduler.add_job('tick', None)
+    job.callback = lambda: runs.append(clock.now) or scheduler.schedule(job, 0.002)
+    scheduler.schedule(job, 1)
+    run_at(scheduler, clock, 1.0)
+    assert runs == [1.0] and job.deadline == 1.002
@@ -0,0 +1,64 @@
+import json
+import os
+
+import lazy_ass_timer as lat
+import lazy_ass_timer_sim as sim
+
+
+def make_controller(home):
+    loop = sim.VirtualLoop()
+    controller = lat.TimerController(loop, home=str(home), clock=loop.clock,
+                                     focus_provider=lat.ScriptedFocusProvider(),
+                                     input_backend=lat.ReplayInputBackend(), process_table=lat.FakeProcessTable(),
+                                     sound_player=lat.SoundPlayer(sink=lat.NullAudioSink()),
+                                     activity=sim.ActivityTally(loop.clock))
+    controller.start()
+    return controller, loop
+
+
+def write_settings(home, settings):
+    path = os.path.join(str(home), "pycharm_timer_settings.json")
+    with open(path, 'w') as f:
+        json.dump(settings, f)
+    with open(path) as f:
+        return path, f.read()
+
+
+def read(path):
+    with open(path) as f:
+        return f.read()
+
+
+def test_close_leaves_a_file_that_failed_to_load(tmp_path):
+    path, text = write_settings(tmp_path, {'targets': [{'pattern': 'idea64.exe'}], 'default_timer_seconds': 7200,
+                                           'idle_timeout_seconds': 0, 'enable_sounds': False})
+    controller, loop = make_controller(tmp_path)
+    assert controller.config.default_timer_seconds == lat.DEFAULT_SETTINGS['default_timer_seconds']
+    assert controller.settings_error is not None
+    controller.close()
+    assert read(path) == text
+
+
+def test_in_app_changes_never_write_defaults_over_a_broken_file(tmp_path):
+    path, text = write_settings(tmp_path, {'idle_timeout_seconds': 0})
+    controller, loop = make_controller(tmp_path)
+    controller.apply_settings({'enter_shortcut_seconds': 5})
+    controller.close()
+    assert read(path) == text
+
+
+def test_close_without_changes_does_not_rewrite(tmp_path):
+    path, text = write_settings(tmp_path, {'default_timer_seconds': 7200, 'enable_sounds': False})
+    controller, loop = make_controller(tmp_path)
+    assert controller.config.default_timer_seconds == 7200
+    controller.close()
+    assert read(path) == text
+
+
+def test_close_saves_a_pending_in_app_change(tmp_path):
+    path, text = write_settings(tmp_path, {'default_timer_seconds': 7200, 'enable_sounds': False})
+    controller, loop = make_controller(tmp_path)
+    controller.apply_settings({'enter_shortcut_seconds': 5})
+    controller.close()
+    saved = json.loads(read(path))
+    assert saved['enter_shortcut_seconds'] == 5 and saved['default_timer_seconds'] == 7200
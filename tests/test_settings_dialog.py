@@ -0,0 +1,42 @@
+import os
+
+import pytest
+
+import lazy_ass_timer as lat
+
+pytest.importorskip('PyQt5')
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from PyQt5.QtWidgets import QApplication
+
+import lazy_ass_timer_gui as gui
+
+
+@pytest.fixture(scope='module')
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.mark.parametrize('settings', [
+    {},
+    {'enter_shortcut_seconds': 0, 'idle_timeout_seconds': 90, 'default_timer_seconds': 7230,
+     'min_typing_rate': 12.345},
+    {'enter_shortcut_seconds': 3600, 'idle_timeout_seconds': 24 * 3600, 'default_timer_seconds': 100 * 3600,
+     'min_typing_rate': 1000},
+    {'idle_timeout_seconds': 1, 'default_timer_seconds': 0, 'min_typing_rate': 0.5},
+])
+def test_ok_without_edits_keeps_every_valid_value(app, settings):
+    config = lat.SettingsSnapshot({**lat.DEFAULT_SETTINGS, **settings})
+    dialog = gui.SettingsDialog(config.as_dict())
+    assert lat.SettingsSnapshot({**config.as_dict(), **dialog.get_settings()}) == config
+
+
+def test_edited_values_are_saved(app):
+    config = lat.SettingsSnapshot(lat.DEFAULT_SETTINGS)
+    dialog = gui.SettingsDialog(config.as_dict())
+    dialog.idle_seconds.setValue(45)
+    dialog.min_typing_rate.setValue(7.5)
+    dialog.timer_secs.setValue(30)
+    settings = dialog.get_settings()
+    assert settings['idle_timeout_seconds'] == 45
+    assert settings['min_typing_rate'] == 7.5
+    assert settings['default_timer_seconds'] == config.default_timer_seconds + 30
@@ -0,0 +1,41 @@
+from datetime import date
+
+import lazy_ass_timer_sim as sim
+
+FIRST_DAY = date(2026, 3, 2)
+
+
+def test_synthetic_events_are_fixed_by_the_seed():
+    events = sim.synthetic_events(3, seed=4, first_day=FIRST_DAY)
+    assert events == sim.synthetic_events(3, seed=4, first_day=FIRST_DAY)
+    assert events != sim.synthetic_events(3, seed=5, first_day=FIRST_DAY)
+    assert events == sorted(events, key=lambda event: event[0])
+    assert {date.fromtimestamp(event[0]) for event in events} == {date(2026, 3, day) for day in (2, 3, 4)}
+
+
+def test_replay_is_deterministic_for_a_seed():
+    events = sim.synthetic_events(3, seed=4, first_day=FIRST_DAY)
+    settings = {'default_timer_seconds': 3 * 3600, 'idle_timeout_seconds': 120}
+    days = sim.simulate(events, settings)
+    assert days == sim.simulate(events, settings)
+    assert [result.day for result in days] == [date(2026, 3, day) for day in (2, 3, 4)]
+    assert sum(result.auto_pauses for result in days) > 0
+    assert sum(result.rewards for result in days) > 0
+
+
+def test_settings_change_the_outcome():
+    events = sim.synthetic_events(2, seed=1, first_day=FIRST_DAY)
+    short = sim.summarize(sim.simulate(events, {'default_timer_seconds': 1800}))
+    long = sim.summarize(sim.simulate(events, {'default_timer_seconds': 100 * 3600}))
+    assert short['expired_days'] == 2 and long['expired_days'] == 0
+    assert short['median_time_to_zero'] is not None and long['median_time_to_zero'] is None
+
+
+def test_sweep_matches_single_runs_in_any_worker_count():
+    events = sim.synthetic_events(2, seed=2, first_day=FIRST_DAY)
+    grid = {'idle_timeout_seconds': [60, 300], 'enter_shortcut_seconds': [5]}
+    serial = sim.sweep(events, grid, workers=1)
+    assert [settings for settings, _ in serial] == [{'idle_timeout_seconds': 60, 'enter_shortcut_seconds': 5},
+                                                   {'idle_timeout_seconds': 300, 'enter_shortcut_seconds': 5}]
+    assert serial[0][1] == sim.summarize(sim.simulate(events, serial[0][0]))
+    assert sim.sweep(events, grid, workers=2) == serial
@@ -0,0 +1,32 @@
+import json
+import os
+import sys
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO, 'benchmarks'))
+import bench_startup
+
+RUNS = 3
+
+
+def startup_runs(home):
+    # Each run is a fresh interpreter, so modules other tests imported don't count
+    with open(os.path.join(home, 'pycharm_timer_settings.json'), 'w') as f:
+        json.dump({'enable_sounds': False, 'record_activity': False}, f)
+    return [bench_startup.run_once(home) for _ in range(RUNS)]
+
+
+def median(runs, key):
+    return sorted(run[key] for run in runs)[len(runs) // 2]
+
+
+def test_headless_path_stays_qt_free(tmp_path):
+    runs = startup_runs(str(tmp_path))
+    assert all(run['heavy_modules'] == [] for run in runs)
+
+
+def test_headless_startup_within_budget(tmp_path):
+    # Medians, the first run also pays for a cold disk cache
+    runs = startup_runs(str(tmp_path))
+    assert median(runs, 'import_ms') <= bench_startup.IMPORT_BUDGET_MS
+    assert median(runs, 'first_tick_ms') <= bench_startup.FIRST_TICK_BUDGET_MS
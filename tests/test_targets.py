@@ -0,0 +1,75 @@
+import re
+
+import pytest
+
+import lazy_ass_timer as lat
+
+
+def make_matcher(*lines):
+    return lat.TargetMatcher([lat.parse_target_rule(line) for line in lines])
+
+
+def test_rule_kinds_are_parsed_from_the_pattern():
+    assert lat.parse_target_rule('pycharm64.exe') == lat.TargetRule('pycharm64.exe', 'exact', 0, 1.0)
+    assert lat.parse_target_rule('idea*.exe 90') == lat.TargetRule('idea*.exe', 'glob', 5400, 1.0)
+    assert lat.parse_target_rule(r're:code(-insiders)?\.exe 30 0.5') == \
+        lat.TargetRule(r'code(-insiders)?\.exe', 'regex', 1800, 0.5)
+    with pytest.raises(re.error):
+        lat.parse_target_rule('re:(unclosed')
+
+
+@pytest.mark.parametrize('line', ['pycharm64.exe', 'idea*.exe 90', r're:code(-insiders)?\.exe 30 0.5',
+                                  'vim.exe 0 2'])
+def test_rules_round_trip_through_their_text_form(line):
+    rule = lat.parse_target_rule(line)
+    assert lat.parse_target_rule(lat.format_target_rule(rule)) == rule
+
+
+def test_earliest_rule_wins_across_kinds():
+    matcher = make_matcher('py*.exe', 'pycharm64.exe', r're:pycharm\d+\.exe')
+    assert matcher.match('pycharm64.exe') == 0
+    matcher = make_matcher(r're:pycharm\d+\.exe', 'py*.exe', 'pycharm64.exe')
+    assert matcher.match('pycharm64.exe') == 0
+    matcher = make_matcher('pycharm64.exe', r're:pycharm\d+\.exe', 'py*.exe')
+    assert matcher.match('pycharm64.exe') == 0
+    assert matcher.match('pycharm.exe') == 2
+    assert matcher.match('python.exe') == 2
+    assert matcher.match('chrome.exe') is None
+    assert matcher.match(None) is None and matcher.match('') is None
+
+
+def test_matching_ignores_case():
+    matcher = make_matcher('PyCharm64.exe', 'Code*.EXE', r're:vim\.exe')
+    assert matcher.match('pycharm64.EXE') == 0
+    assert matcher.match('code-insiders.exe') == 1
+    assert matcher.match('VIM.exe') == 2
+
+
+def test_regexes_match_the_whole_name():
+    matcher = make_matcher(r're:vim', 'code')
+    assert matcher.match('vim') == 0
+    assert matcher.match('vim.exe') is None and matcher.match('gvim') is None
+    assert matcher.match('code.exe') is None
+
+
+def test_memo_stays_within_its_bound():
+    matcher = lat.TargetMatcher([lat.parse_target_rule('*.exe')], memo_size=4)
+    for index in range(10):
+        assert matcher.match(f"p{index}.exe") == 0
+        assert len(matcher._memo) <= 4
+
+
+def test_time_is_accounted_per_target(make_controller):
+    focus = lat.ScriptedFocusProvider()
+    targets = [lat.parse_target_rule(line)._asdict() for line in ('pycharm64.exe', 'code*.exe 0 0.5')]
+    controller, loop = make_controller({'targets': targets, 'default_timer_seconds': 600}, focus)
+    controller.toggle_timer()
+    focus.set_focus('pycharm64.exe')
+    loop.advance(100)
+    focus.set_focus('code.exe')
+    loop.advance(300)
+    focus.set_focus('chrome.exe')
+    loop.advance(400)
+    engine = controller.engine
+    assert (engine.target_seconds(0), engine.target_seconds(1)) == (100, 200)
+    assert engine.remaining() == 400
@@ -0,0 +1,55 @@
+import lazy_ass_timer as lat
+
+TIMERS = [{'name': 'Break', 'seconds': 3600, 'count': 'away'},
+          {'name': 'Session', 'seconds': 3600, 'count': 'always'}]
+
+
+def remaining(controller):
+    return {timer.spec.name: timer.engine.remaining() for timer in controller.timers}
+
+
+def test_named_timers_count_by_their_mode(make_controller):
+    focus = lat.ScriptedFocusProvider(['pycharm64.exe'])
+    controller, loop = make_controller({'timers': TIMERS, 'default_timer_seconds': 600}, focus)
+    controller.toggle_timer()
+    loop.advance(100)
+    focus.set_focus('chrome.exe')
+    loop.advance(150)
+    assert controller.engine.remaining() == 500
+    assert remaining(controller) == {'Break': 3550, 'Session': 3450}
+
+
+def test_named_timers_pause_when_the_main_timer_runs_out(make_controller):
+    focus = lat.ScriptedFocusProvider(['pycharm64.exe'])
+    controller, loop = make_controller({'timers': TIMERS, 'default_timer_seconds': 60}, focus)
+    controller.toggle_timer()
+    loop.advance(61)
+    assert controller.engine.remaining() == 0 and not controller.engine.running
+    assert remaining(controller) == {'Break': 3600, 'Session': 3540}
+    assert not any(timer.engine.running for timer in controller.timers)
+    assert all(timer.job.deadline is None for timer in controller.timers)
+    loop.advance(1000)
+    assert remaining(controller) == {'Break': 3600, 'Session': 3540}
+    # A reset starts them over along with the main timer
+    controller.reset_timer()
+    controller.toggle_timer()
+    loop.advance(1010)
+    assert controller.engine.remaining() == 50
+    assert remaining(controller) == {'Break': 3600, 'Session': 3590}
+
+
+def test_named_timer_targets_follow_child_processes(make_controller):
+    focus = lat.ScriptedFocusProvider()
+    timers = [{'name': 'Docs', 'seconds': 3600, 'count': 'focused',
+               'targets': [lat.parse_target_rule('winword.exe')._asdict()]}]
+    controller, loop = make_controller({'timers': timers, 'include_child_processes': True}, focus)
+    table = controller.process_table
+    table.spawn(20, 4, 'winword.exe')
+    table.spawn(21, 20, 'splwow64.exe')
+    controller.toggle_timer()
+    focus.set_focus('splwow64.exe', pid=21)
+    loop.advance(100)
+    assert remaining(controller) == {'Docs': 3500}
+    controller.apply_settings({'include_child_processes': False})
+    loop.advance(200)
+    assert remaining(controller) == {'Docs': 3500}
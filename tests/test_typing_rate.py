@@ -0,0 +1,90 @@
+import random
+
+import lazy_ass_timer as lat
+
+
+class FakeClock:
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+def make_meter():
+    clock = FakeClock()
+    return lat.TypingRateMeter(clock=clock), clock
+
+
+def test_rates_per_window():
+    meter, clock = make_meter()
+    for second in range(60):
+        meter.add(2, second + 0.5)
+    # A window covers its last seconds including the current one
+    clock.now = 59.5
+    assert meter.rate(10) == 120 and meter.rate(60) == 120 and meter.rate(300) == 24
+    clock.now = 64.5
+    assert meter.rate(10) == 60 and meter.rate(60) == 110
+
+
+def test_gaps_longer_than_a_window_empty_it():
+    meter, clock = make_meter()
+    meter.add(30, 1)
+    clock.now = 200
+    assert meter.rate(10) == 0 and meter.rate(60) == 0 and meter.rate(300) == 6
+    clock.now = 2000
+    assert meter.rate(300) == 0
+    meter.add(5)
+    assert meter.rate(10) == 30
+
+
+def test_running_sums_match_a_recount():
+    # Irregular typing with gaps of every length, checked against counting the keys again
+    meter, clock = make_meter()
+    rng = random.Random(3)
+    keys = []
+    now = 0.0
+    for _ in range(1000):
+        now += rng.choice([0.1, 0.5, 1, 3, 15, 70, 400])
+        count = rng.randint(1, 9)
+        meter.add(count, now)
+        keys.append((int(now), count))
+        for window in lat.TYPING_RATE_WINDOWS:
+            expected = sum(count for second, count in keys if second > int(now) - window)
+            assert meter.rate(window, now) == expected * 60 / window
+
+
+def test_late_keys_count_toward_the_current_second():
+    meter, clock = make_meter()
+    meter.add(5, 100)
+    meter.add(5, 90)
+    assert meter.rate(10, 100) == 60
+
+
+def test_time_until_below():
+    meter, clock = make_meter()
+    for second in range(10):
+        meter.add(10, second)
+    # 100 keys in the last 10 s is 600 keys/min; at most 300 once 50 are gone, at 15 s
+    assert meter.time_until_below(10, 300, now=9.25) == 5.75
+    assert meter.time_until_below(10, 1000, now=9.25) == 0
+    assert meter.time_until_below(10, 1, now=9.25) == 9.75
+
+
+def test_countdown_only_runs_while_typing_fast_enough(make_controller):
+    focus = lat.ScriptedFocusProvider(['pycharm64.exe'])
+    controller, loop = make_controller({'min_typing_rate': 60, 'typing_rate_window': 10,
+                                        'default_timer_seconds': 600, 'idle_timeout_seconds': 3600}, focus)
+    controller.toggle_timer()
+    loop.advance(100)
+    assert controller.engine.gated and controller.engine.remaining() == 600
+    # 2 keys a second; the gate opens once the 10 s window holds 10 keys, at 104
+    for second in range(100, 130):
+        controller.on_input_batch(lat.InputBatch(2, 0, 0, second, second, 0))
+        loop.advance(second + 1)
+    assert not controller.engine.gated and controller.engine.remaining() == 574
+    # Typing stops at 129; the window drops below 10 keys when second 125 leaves it, at 135
+    loop.advance(200)
+    assert controller.engine.gated and controller.engine.remaining() == 569
+    assert controller.gate_job.deadline is None
@@ -0,0 +1,63 @@
+import os
+import time
+
+import pytest
+
+import lazy_ass_timer as lat
+import lazy_ass_timer_sim as sim
+
+pytest.importorskip('PyQt5')
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from PyQt5.QtGui import QExposeEvent, QRegion
+from PyQt5.QtWidgets import QApplication
+
+import lazy_ass_timer_gui as gui
+
+
+@pytest.fixture(scope='module')
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def window(app, tmp_path):
+    config = lat.SettingsSnapshot({**lat.DEFAULT_SETTINGS, 'enable_sounds': False, 'record_activity': False,
+                                   'control_server': False, 'collect_metrics': True})
+    controller = lat.TimerController(gui.QtLoop(), home=str(tmp_path), config=config, persist=False,
+                                     focus_provider=lat.ScriptedFocusProvider(['explorer.exe']),
+                                     input_backend=lat.ReplayInputBackend(),
+                                     process_table=lat.FakeProcessTable(),
+                                     sound_player=lat.SoundPlayer(sink=lat.NullAudioSink()),
+                                     activity=sim.ActivityTally(time.monotonic))
+    window = gui.TimerWindow(controller)
+    window.show()
+    app.processEvents()
+    yield window
+    window.close()
+
+
+def test_render_counters_are_in_the_stats_and_metrics(window):
+    before = window.controller.stats()['view']
+    assert before['renders'] > 0 and not before['suspended']
+    window.controller.set_remaining(1234)
+    stats = window.controller.stats()
+    # Only the time display changed
+    assert stats['view']['renders'] == before['renders'] + 1
+    assert stats['view']['repaints'] == before['repaints'] + 1
+    assert stats['metrics']['lazy_timer_view_repaints_total'] == stats['view']['repaints']
+
+
+def test_an_unexposed_window_renders_nothing(window, app):
+    handle = window.windowHandle()
+    # Offscreen windows are never covered, so pretend the platform said this one is
+    handle.isExposed = lambda: False
+    QApplication.sendEvent(handle, QExposeEvent(QRegion()))
+    renders = window.renderer.renders
+    window.controller.set_remaining(1000)
+    assert window.renderer.suspended and window.renderer.renders == renders
+    assert not window.controller.view_visible
+    del handle.isExposed
+    QApplication.sendEvent(handle, QExposeEvent(QRegion(0, 0, 10, 10)))
+    assert not window.renderer.suspended and window.renderer.renders == renders + 1
+    assert window.renderer.last.time_text == window.controller.time_text()
+